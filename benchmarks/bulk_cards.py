@@ -0,0 +1,30 @@
+"""Compare adding cards one by one with adding them in bulk.
+
+Usage:
+    python benchmarks/bulk_cards.py [number of cards]
+"""
+import sys
+import timeit
+
+from tinycards.model import Deck
+
+
+def main(num_cards=100000, repeat=3):
+    pairs = [('front %d' % i, 'back %d' % i) for i in range(num_cards)]
+
+    def add_one_by_one():
+        deck = Deck('Benchmark Deck')
+        for pair in pairs:
+            deck.add_card(pair)
+
+    def add_in_bulk():
+        Deck('Benchmark Deck').add_cards(pairs)
+
+    for name, add in (('add_card loop', add_one_by_one),
+                      ('add_cards', add_in_bulk)):
+        seconds = min(timeit.repeat(add, number=1, repeat=repeat))
+        print('%-14s %9.0f cards/s' % (name, num_cards / seconds))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
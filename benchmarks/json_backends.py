@@ -0,0 +1,57 @@
+"""Benchmark encoding and decoding large decks with all JSON backends.
+
+Usage:
+    python benchmarks/json_backends.py [number of cards]
+"""
+import sys
+import timeit
+
+from tinycards.model import Deck
+from tinycards.networking import json_codec, json_converter
+from tinycards.networking.json_stream import iter_object_members
+
+
+def build_payloads(num_cards):
+    """Build the PATCH payload and the expanded GET response of a deck."""
+    deck = Deck('Benchmark Deck')
+    for i in range(num_cards):
+        deck.add_card(('front word %d' % i, 'back word %d' % i))
+    payload = json_converter.deck_to_json(deck)
+
+    cards = []
+    for card in json_converter.deck_to_json(deck)['cards']:
+        for side_id, side in enumerate(card['sides']):
+            side['id'] = side_id
+            for concept in side['concepts']:
+                concept.update(id='c', createdAt=0, updatedAt=0)
+                concept['fact']['id'] = 'f'
+        card['id'] = 'card'
+        cards.append(card)
+    response = dict(payload, id='abc', compactId='abc', slug='benchmark',
+                    imageUrl=None, cards=cards)
+    return payload, json_codec.dumps(response).encode('utf-8')
+
+
+def main(num_cards=10000, repeat=5):
+    payload, response = build_payloads(num_cards)
+    print('%d cards, response size %d bytes' % (num_cards, len(response)))
+    for name in json_codec.BACKENDS:
+        json_codec.use_backend(name)
+        encode = min(timeit.repeat(lambda: json_codec.dumps(payload),
+                                   number=1, repeat=repeat))
+        decode = min(timeit.repeat(lambda: json_codec.loads(response),
+                                   number=1, repeat=repeat))
+        print('%-8s encode %7.2f ms   decode %7.2f ms'
+              % (name, encode * 1000, decode * 1000))
+    json_codec.use_backend()
+
+    # Streamed responses are always decoded with the json module.
+    chunks = [response[i:i + 65536] for i in range(0, len(response), 65536)]
+    stream = min(timeit.repeat(
+        lambda: list(iter_object_members(chunks, ['cards'])),
+        number=1, repeat=repeat))
+    print('%-8s stream %7.2f ms' % ('json', stream * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
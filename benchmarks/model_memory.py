@@ -0,0 +1,127 @@
+"""Measure the memory used by model objects decoded from API responses.
+
+Decks and trendables are decoded twice: with the model classes, which keep
+their attributes in `__slots__`, and with subclasses which keep them in an
+instance `__dict__` instead, as a baseline.
+
+Usage:
+    python benchmarks/model_memory.py [number of cards] [number of trends]
+"""
+import gc
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+from tinycards.model import (Card, ColumnarCardList, Concept, Deck, Fact,
+                             Side, Trendable, TrendableData)
+from tinycards.networking import json_codec, json_converter
+
+
+def card_json(index):
+    json_data = json_converter.card_to_json(Card('front %d' % index,
+                                                 'back %d' % index))
+    json_data['id'] = 'card-%d' % index
+    for side_id, side in enumerate(json_data['sides']):
+        side['id'] = '%d-%d' % (index, side_id)
+        for concept in side['concepts']:
+            concept.update(id='concept', createdAt=0, updatedAt=0)
+            concept['fact']['id'] = 'fact'
+    return json_data
+
+
+def trendable_json(index):
+    data = {
+        'blacklistedQuestionTypes': [['PRODUCTION'], ['PRODUCTION']],
+        'blacklistedSideIndices': [], 'cardCount': 10,
+        'compactId': 'c%d' % index, 'coverImageUrl': None, 'createdAt': 0,
+        'deckGroups': [], 'description': 'A deck', 'enabled': True,
+        'favoriteCount': 1, 'fromLanguage': 'en', 'fullname': 'Someone',
+        'gradingModes': ['NO_TYPOS', 'NO_TYPOS'], 'hashes': {},
+        'id': 'deck-%d' % index, 'imageUrl': None, 'name': 'Deck',
+        'picture': None, 'private': False, 'shareable': False,
+        'slug': 'deck', 'tagIds': [], 'ttsLanguages': ['en', 'de'],
+        'uiLanguage': 'en', 'updatedAt': 0, 'userId': 1,
+        'username': 'someone',
+    }
+    return {'id': data['id'], 'type': 'DECK', 'data': data}
+
+
+def unslotted(cls):
+    """Create a subclass of a model class without `__slots__`.
+
+    Class attributes named like the slots hide the slot descriptors, so all
+    attributes end up in the instance `__dict__`.
+    """
+    names = {name: None for klass in cls.__mro__
+             for name in klass.__dict__.get('__slots__', ())}
+    return type(cls.__name__, (cls,), names)
+
+
+@contextmanager
+def unslotted_model():
+    """Let the JSON converter build unslotted model objects."""
+    originals = {cls.__name__: cls for cls in (Card, Concept, Fact, Side,
+                                               Trendable, TrendableData)}
+    for name, cls in originals.items():
+        setattr(json_converter, name, unslotted(cls))
+    try:
+        yield
+    finally:
+        for name, cls in originals.items():
+            setattr(json_converter, name, cls)
+
+
+def measure(build):
+    """Get the bytes still allocated by the objects `build()` returns."""
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def main(num_cards=50000, num_trends=50000):
+    # Decode the responses while measuring, like the API wrappers do.
+    raw_cards = [json_codec.dumps(card_json(i)) for i in range(num_cards)]
+    raw_trends = [json_codec.dumps(trendable_json(i))
+                  for i in range(num_trends)]
+
+    def build_deck():
+        cards = [json_converter.json_to_card(json_codec.loads(c))
+                 for c in raw_cards]
+        return Deck('Benchmark Deck', cards=cards)
+
+    def build_columnar_deck():
+        deck = Deck('Benchmark Deck', cards=ColumnarCardList())
+        for i in range(num_cards):
+            deck.add_card(('front %d' % i, 'back %d' % i))
+        return deck
+
+    def build_trends():
+        return [json_converter.json_to_trendable(json_codec.loads(t))
+                for t in raw_trends]
+
+    deck_size = measure(build_deck)
+    columnar_size = measure(build_columnar_deck)
+    trends_size = measure(build_trends)
+    with unslotted_model():
+        dict_deck_size = measure(build_deck)
+        dict_trends_size = measure(build_trends)
+    print('deck with %d cards' % num_cards)
+    for label, size in (('__dict__', dict_deck_size),
+                        ('__slots__', deck_size),
+                        ('columnar', columnar_size)):
+        print('  %-10s %7.1f MB (%d bytes per card)'
+              % (label, size / 1e6, size / num_cards))
+    print('%d trendables' % num_trends)
+    for label, size in (('__dict__', dict_trends_size),
+                        ('__slots__', trends_size)):
+        print('  %-10s %7.1f MB (%d bytes per trendable)'
+              % (label, size / 1e6, size / num_trends))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
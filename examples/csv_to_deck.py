@@ -1,5 +1,4 @@
 """Example script for the Tinycards Python API that creates decks from CSV."""
-import csv
 from getpass import getpass
 import os
 
@@ -17,17 +16,12 @@ def csv_to_deck(csv_path):
     deck = Deck('French Words')
     deck = tinycards.create_deck(deck)
 
-    # Extract data from CSV file.
-    word_pairs = []
-    with open(csv_path, 'r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            current_word_pair = (row['front'], row['back'])
-            word_pairs.append(current_word_pair)
-
-    # Populate deck with cards from CSV data.
-    for pair in word_pairs:
-        deck.add_card(pair)
+    # Stream cards from the CSV file into the deck, skipping invalid rows.
+    with open(csv_path, 'r', newline='') as csv_file:
+        report = deck.add_cards_from_csv(csv_file)
+    print(report)
+    for line_number, reason in report.bad_rows:
+        print('Skipped line %s: %s' % (line_number, reason))
 
     # Save changes to Tinycards.
     tinycards.update_deck(deck)
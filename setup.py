@@ -17,6 +17,11 @@ setup(
         'retrying==1.3.3',
         'typer>=0.3.0'
     ],
+    extras_require={
+        'async': ['aiohttp>=3.6'],
+        'images': ['Pillow>=7.0'],
+        'pyarrow': ['pyarrow>=7.0'],
+    },
     zip_safe=False,
     entry_points={
         'console_scripts': [
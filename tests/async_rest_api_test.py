@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import unittest
+
+from tinycards.client import AsyncTinycards
+from tinycards.model import Deck
+from tinycards.networking import AsyncRestApi
+from tinycards.networking import async_rest_api
+from tinycards.networking.error import PartialResultError
+
+from fake_server import (FakeTinycardsServer, card_json, deck_json,
+                         login_route)
+
+
+def run_until_complete(coroutine):
+    """Run a coroutine in a new event loop, like `asyncio.run()` (3.7+)."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def path_to(filename):
+    current_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.abspath(os.path.join(current_dir, filename))
+
+
+@unittest.skipIf(async_rest_api.aiohttp is None, 'aiohttp is not installed')
+class AsyncRestApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        login_route(self.server)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _client(self):
+        data_source = AsyncRestApi(api_url=self.server.url)
+        return AsyncTinycards(silent=True, data_source=data_source)
+
+    def test_login_and_get_deck(self):
+        self.server.json_route('GET', 'decks/abc', deck_json(
+            'abc', cards=[card_json('card-1', 'front', 'back')]))
+
+        async def run():
+            async with self._client() as client:
+                return client.user_id, await client.get_deck('abc')
+
+        user_id, deck = run_until_complete(run())
+
+        self.assertEqual(1, user_id)
+        self.assertIsInstance(deck, Deck)
+        self.assertEqual('abc', deck.id)
+        self.assertEqual('front', deck.cards[0].front.concepts[0].fact.text)
+        request = self.server.requests_to('decks/abc')[0]
+        self.assertEqual('jwt_token=test-token', request.headers['Cookie'])
+        self.assertEqual(['true'], request.query['expand'])
+
+    def test_get_decks_reports_failed_decks(self):
+        self.server.json_route('GET', 'decks', {
+            'decks': [deck_json('a'), deck_json('b'), deck_json('c')]
+        })
+        self.server.json_route('GET', 'decks/a', deck_json('a', cards=[]))
+        self.server.json_route('GET', 'decks/c', deck_json('c', cards=[]))
+
+        async def run():
+            async with self._client() as client:
+                return await client.get_decks()
+
+        with self.assertRaises(PartialResultError) as context:
+            run_until_complete(run())
+
+        self.assertEqual(['a', 'c'],
+                         [d.id for d in context.exception.results])
+        self.assertEqual(['b'], list(context.exception.failures))
+
+    def test_update_deck_sends_json_patch(self):
+        self.server.json_route('PATCH', 'decks/abc', deck_json('abc'))
+        self.server.json_route('GET', 'decks/abc', deck_json('abc', cards=[]))
+        deck = Deck('Test Deck', deck_id='abc')
+        deck.add_card(('front', 'back'))
+
+        async def run():
+            async with self._client() as client:
+                return await client.update_deck(deck)
+
+        updated_deck = run_until_complete(run())
+
+        self.assertEqual('abc', updated_deck.id)
+        patch = self.server.requests_to('decks/abc')[0]
+        self.assertEqual('PATCH', patch.method)
+        self.assertEqual('Test Deck', patch.json()['name'])
+
+    def test_cover_is_encoded_outside_the_event_loop(self):
+        self.server.json_route('POST', 'decks', deck_json('abc'))
+        threads = []
+
+        class Preprocessor(object):
+            def process(self, img, mime_type):
+                threads.append(threading.current_thread())
+                return None
+
+        async def run():
+            async with self._client() as client:
+                client.data_source.cover_preprocessor = Preprocessor()
+                return await client.create_deck(
+                    Deck('Test Deck', cover=path_to('test_logo_red.png')))
+
+        created_deck = run_until_complete(run())
+
+        self.assertEqual('abc', created_deck.id)
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(threading.main_thread(), threads[0])
+        post = self.server.requests_to('decks')[0]
+        self.assertIn(b'name="imageFile"', post.body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+
+from tinycards.model import (Card, ColumnarCardList, Deck, DeferredCardList,
+                             LazyCardList)
+from tinycards.networking import json_converter
+
+
+class DeferredCardListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loads = 0
+        self.cards = [Card('front 1', 'back 1'), Card('front 2', 'back 2')]
+
+    def _load(self):
+        self.loads += 1
+        return self.cards
+
+    def test_loads_once_on_first_access(self):
+        card_list = DeferredCardList(self._load)
+
+        self.assertFalse(card_list.loaded)
+        self.assertEqual('<cards not loaded yet>', repr(card_list))
+        self.assertEqual(2, len(card_list))
+        self.assertEqual(self.cards[1], card_list[-1])
+        self.assertEqual(self.cards, list(card_list))
+        self.assertEqual(1, self.loads)
+
+    def test_behaves_like_a_list(self):
+        card_list = DeferredCardList(self._load)
+        new_card = Card('front 3', 'back 3')
+
+        card_list.append(new_card)
+        del card_list[0]
+
+        self.assertEqual([self.cards[1], new_card], card_list)
+        self.assertEqual([new_card], card_list[1:])
+
+    def test_known_fingerprint_does_not_load(self):
+        deck = Deck('Test Deck', cards=self.cards)
+        deck.cards = DeferredCardList(self._load, deck.cards_fingerprint())
+        deck.mark_clean()
+
+        self.assertFalse(deck.is_dirty())
+        self.assertEqual(0, self.loads)
+        deck.cards.append(Card('front 3', 'back 3'))
+        self.assertTrue(deck.is_dirty())
+
+
+class LazyCardListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.raw_cards = [json_converter.card_to_json(Card('front %d' % i,
+                                                           'back %d' % i))
+                          for i in range(5)]
+        for i, raw_card in enumerate(self.raw_cards):
+            raw_card['id'] = 'card-%d' % i
+            for side_id, side in enumerate(raw_card['sides']):
+                side['id'] = side_id
+                for concept in side['concepts']:
+                    concept.update(id='c', createdAt=0, updatedAt=0)
+                    concept['fact']['id'] = 'f'
+        self.card_list = LazyCardList(self.raw_cards,
+                                      json_converter.json_to_card,
+                                      json_converter.json_to_card_content)
+
+    def test_converts_cards_on_first_access(self):
+        self.assertEqual(5, len(self.card_list))
+        self.assertEqual(0, self.card_list.converted)
+
+        first_card = self.card_list[0]
+
+        self.assertEqual('card-0', first_card.id)
+        self.assertIs(first_card, self.card_list[0])
+        self.assertEqual('card-4', self.card_list[-1].id)
+        self.assertEqual(2, self.card_list.converted)
+
+    def test_behaves_like_a_list(self):
+        new_card = Card('front new', 'back new')
+
+        self.card_list.insert(1, new_card)
+        del self.card_list[0]
+
+        self.assertEqual(5, len(self.card_list))
+        self.assertIs(new_card, self.card_list[0])
+        self.assertEqual(['card-1', 'card-2'],
+                         [c.id for c in self.card_list[1:3]])
+        self.assertEqual(['card-4', 'card-3'],
+                         [c.id for c in self.card_list[:2:-1]])
+        self.assertEqual(5, len(list(self.card_list)))
+        with self.assertRaises(IndexError):
+            self.card_list[5]
+
+    def test_contents_match_converted_cards(self):
+        contents = list(self.card_list.contents())
+
+        self.assertEqual(0, self.card_list.converted)
+        self.assertEqual([c.content() for c in self.card_list], contents)
+
+    def test_clean_check_does_not_convert_cards(self):
+        deck = Deck('Test Deck', cards=self.card_list)
+        deck.mark_clean()
+
+        self.assertFalse(deck.is_dirty())
+        self.assertEqual(0, self.card_list.converted)
+
+        self.card_list[2].front.concepts[0].fact.text = 'changed'
+        self.assertTrue(deck.is_dirty())
+
+    def test_decoded_deck_hashes_cards_lazily(self):
+        contents = []
+
+        def content(raw_card):
+            contents.append(raw_card['id'])
+            return json_converter.json_to_card_content(raw_card)
+
+        card_list = LazyCardList(self.raw_cards, json_converter.json_to_card,
+                                 content)
+        deck = Deck('Test Deck', cards=card_list)
+        deck.mark_clean()
+
+        self.assertFalse(deck.is_dirty())
+        self.assertEqual([], contents)
+
+        card_list[2].front.concepts[0].fact.text = 'changed'
+        self.assertTrue(deck.is_dirty())
+        card_list[2].front.concepts[0].fact.text = 'front 2'
+        self.assertFalse(deck.is_dirty())
+        del card_list[0]
+        self.assertTrue(deck.is_dirty())
+
+
+class ColumnarCardListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.card_list = ColumnarCardList(['front %d' % i for i in range(4)],
+                                          ['back %d' % i for i in range(4)],
+                                          ['card-%d' % i for i in range(4)],
+                                          [1000 * i + 1 for i in range(4)])
+
+    def test_builds_cards_on_access(self):
+        card = self.card_list[1]
+
+        self.assertEqual('card-1', card.id)
+        self.assertEqual(1001, card.creation_timestamp)
+        self.assertEqual('back 1', card.back.concepts[0].fact.text)
+        self.assertIs(card, self.card_list[1])
+        self.assertEqual(1, self.card_list.materialized)
+
+    def test_behaves_like_a_list(self):
+        new_card = Card('front new', 'back new')
+
+        self.card_list.append(new_card)
+        self.card_list.append_text('front text', 'back text')
+        del self.card_list[0]
+        self.card_list[0:2] = [self.card_list[1]]
+
+        self.assertEqual(['card-2', 'card-3', new_card.id],
+                         [c.id for c in self.card_list[:3]])
+        self.assertEqual('front text',
+                         self.card_list[-1].front.concepts[0].fact.text)
+
+    def test_serializes_like_cards(self):
+        changed = self.card_list[2]
+        changed.front.concepts[0].fact.text = 'changed'
+        plain_list = [Card('front %d' % i, 'back %d' % i,
+                           creation_timestamp=1000 * i + 1)
+                      for i in range(4)]
+        plain_list[2] = changed
+
+        self.assertEqual(json_converter.cards_to_json(plain_list),
+                         json_converter.cards_to_json(self.card_list))
+        self.assertEqual([c.content() for c in plain_list],
+                         list(self.card_list.contents()))
+        self.assertEqual(1, self.card_list.materialized)
+
+    def test_deck_adds_text_cards_to_columns(self):
+        deck = Deck('Test Deck', cards=ColumnarCardList())
+
+        deck.add_card(('front', 'back'))
+        deck.mark_clean()
+
+        self.assertFalse(deck.is_dirty())
+        self.assertEqual(0, deck.cards.materialized)
+        self.assertEqual('back', deck.cards[0].back.concepts[0].fact.text)
+
+
+if __name__ == '__main__':
+    unittest.main()
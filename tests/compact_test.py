@@ -0,0 +1,40 @@
+import pickle
+import unittest
+
+from tinycards.model import Card, Deck, Fact
+
+
+class CompactModelTest(unittest.TestCase):
+
+    def test_models_have_no_instance_dict(self):
+        card = Card('front', 'back')
+
+        for obj in (card, card.front, card.front.concepts[0],
+                    card.front.concepts[0].fact, Deck('Test Deck')):
+            self.assertFalse(hasattr(obj, '__dict__'), type(obj))
+
+    def test_str_lists_public_attributes_in_order(self):
+        fact = Fact('text', fact_id='f1', image_url='https://example.org')
+
+        self.assertEqual("{'id': 'f1', 'text': 'text', 'type': 'TEXT',"
+                         " 'image_url': 'https://example.org',"
+                         " 'tts_url': None}", str(fact))
+        self.assertNotIn('_server_fingerprint', str(Deck('Test Deck')))
+
+    def test_repeated_values_are_interned(self):
+        first = Deck('First', tts_languages=['en', ''.join(['d', 'e'])])
+        second = Deck('Second', tts_languages=['en', ''.join(['d', 'e'])])
+
+        self.assertIs(first.tts_languages[1], second.tts_languages[1])
+
+    def test_models_can_be_pickled(self):
+        deck = Deck('Test Deck')
+        deck.add_card(('front', 'back'))
+
+        copied = pickle.loads(pickle.dumps(deck))
+
+        self.assertEqual(str(deck), str(copied))
+
+
+if __name__ == '__main__':
+    unittest.main()
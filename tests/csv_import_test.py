@@ -0,0 +1,69 @@
+import unittest
+from io import StringIO
+
+from tinycards.model import ColumnarCardList, Deck
+from tinycards.model.csv_import import CsvImportReport, iter_csv_chunks
+
+
+class CsvImportTest(unittest.TestCase):
+
+    def test_rows_are_read_in_chunks(self):
+        csv_data = StringIO('front,back\n' + ''.join(
+            'front %d,back %d\n' % (i, i) for i in range(25)))
+        report = CsvImportReport()
+
+        chunks = list(iter_csv_chunks(csv_data, report, chunk_size=10))
+
+        self.assertEqual([10, 10, 5], [len(chunk) for chunk in chunks])
+        self.assertEqual(('front 24', 'back 24'), chunks[-1][-1])
+        self.assertEqual(25, report.added)
+
+    def test_rows_are_accepted_like_dict_reader(self):
+        csv_data = StringIO('id,front,back\n'
+                            '1,front 1,back 1\n'
+                            '2,front 2\n'
+                            '3,,back 3\n'
+                            '4,front 4,back 4,extra\n'
+                            '5,"front\n5",back 5\n')
+        test_deck = Deck('Test Deck')
+
+        report = test_deck.add_cards_from_csv(csv_data)
+
+        self.assertEqual(4, report.added)
+        self.assertEqual(1, report.bad_row_count)
+        self.assertEqual([(3, 'expected 3 fields, saw 2')], report.bad_rows)
+        self.assertEqual(['front 1', '', 'front 4', 'front\n5'],
+                         [card.front.concepts[0].fact.text
+                          for card in test_deck.cards])
+
+    def test_bad_row_list_is_bounded(self):
+        csv_data = StringIO('front,back\n' + 'only one field\n' * 50)
+
+        report = Deck('Test Deck').add_cards_from_csv(csv_data,
+                                                      max_bad_rows=5)
+
+        self.assertEqual(50, report.bad_row_count)
+        self.assertEqual(5, len(report.bad_rows))
+
+    def test_tsv_into_columnar_deck(self):
+        csv_data = StringIO('back\tfront\nBaum\ttree\n')
+        test_deck = Deck('Test Deck', cards=ColumnarCardList())
+
+        test_deck.add_cards_from_csv(csv_data, delimiter='\t')
+
+        self.assertEqual(0, test_deck.cards.materialized)
+        self.assertEqual('tree',
+                         test_deck.cards[0].front.concepts[0].fact.text)
+
+    def test_missing_column_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Deck('Test Deck').add_cards_from_csv(StringIO('a,b\n1,2\n'))
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaises(ValueError):
+            list(iter_csv_chunks(StringIO(''), CsvImportReport(),
+                                 engine='polars'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+
+from tinycards import Tinycards
+from tinycards.client.deck_index import DeckIndex
+from tinycards.model import Deck
+from tinycards.networking import RestApi
+
+from fake_server import FakeTinycardsServer, deck_json, login_route
+
+
+def _deck(deck_id, title, slug=None, compact_id=None):
+    deck = Deck(title)
+    deck.id = deck_id
+    deck.slug = slug
+    deck.compact_id = compact_id
+    return deck
+
+
+class DeckIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DeckIndex([_deck('a', 'Animals', 'animals', 'ca'),
+                                _deck('b', 'Houses', 'houses', 'cb'),
+                                _deck('c', 'Houses', 'houses-2', 'cc')])
+
+    def test_lookups(self):
+        self.assertEqual(3, len(self.index))
+        self.assertEqual(['a'], self.index.ids_by_title('Animals'))
+        self.assertEqual(['b', 'c'], self.index.ids_by_title('Houses'))
+        self.assertEqual([], self.index.ids_by_title('Missing'))
+        self.assertEqual('c', self.index.id_by_slug('houses-2'))
+        self.assertEqual('a', self.index.id_by_compact_id('ca'))
+
+    def test_add_replaces_changed_deck(self):
+        self.index.add(_deck('a', 'Pets', 'pets', 'ca'))
+
+        self.assertEqual([], self.index.ids_by_title('Animals'))
+        self.assertEqual(['a'], self.index.ids_by_title('Pets'))
+        self.assertIsNone(self.index.id_by_slug('animals'))
+        self.assertEqual('a', self.index.id_by_compact_id('ca'))
+
+    def test_remove(self):
+        self.index.remove('b')
+        self.index.remove('unknown')
+
+        self.assertNotIn('b', self.index)
+        self.assertEqual(['c'], self.index.ids_by_title('Houses'))
+        self.assertIsNone(self.index.id_by_compact_id('cb'))
+
+
+class FindDeckByTitleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        login_route(self.server)
+        self.server.json_route('GET', 'decks', {'decks': [
+            deck_json('deck-1', 'Animals'),
+            deck_json('deck-2', 'Houses'),
+        ]})
+        for deck_id, title in (('deck-1', 'Animals'), ('deck-2', 'Houses'),
+                               ('deck-3', 'Plants')):
+            self.server.json_route('GET', 'decks/' + deck_id,
+                                   deck_json(deck_id, title, cards=[]))
+        self.server.json_route('POST', 'decks',
+                               deck_json('deck-3', 'Plants'))
+        self.server.json_route('DELETE', 'decks/deck-1',
+                               deck_json('deck-1', 'Animals'))
+        self.client = Tinycards(silent=True,
+                                data_source=RestApi(api_url=self.server.url))
+        del self.server.requests[:]
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def _listings(self):
+        return len([r for r in self.server.requests_to('decks')
+                    if r.method == 'GET'])
+
+    def test_deck_list_is_fetched_once(self):
+        for _ in range(3):
+            self.assertEqual('deck-2',
+                             self.client.find_deck_by_title('Houses').id)
+        self.assertIsNone(self.client.find_deck_by_title('Missing'))
+
+        self.assertEqual(1, self._listings())
+        self.assertEqual(3, len(self.server.requests_to('decks/deck-2')))
+
+    def test_find_decks_by_titles(self):
+        decks = self.client.find_decks_by_titles(['Animals', 'Houses',
+                                                  'Missing'])
+
+        self.assertEqual('deck-1', decks['Animals'].id)
+        self.assertEqual('deck-2', decks['Houses'].id)
+        self.assertIsNone(decks['Missing'])
+        self.assertEqual(1, self._listings())
+
+    def test_find_by_slug_and_compact_id(self):
+        self.assertEqual('deck-1',
+                         self.client.find_deck_by_slug('animals').id)
+        self.assertEqual('deck-2',
+                         self.client.find_deck_by_compact_id('cdeck-2').id)
+        self.assertIsNone(self.client.find_deck_by_slug('missing'))
+
+    def test_index_follows_create_and_delete(self):
+        self.client.find_deck_by_title('Animals')
+
+        self.client.create_deck(Deck('Plants'))
+        self.client.delete_deck('deck-1')
+
+        self.assertEqual('deck-3', self.client.find_deck_by_title('Plants').id)
+        self.assertIsNone(self.client.find_deck_by_title('Animals'))
+        self.assertEqual(1, self._listings())
+
+    def test_duplicate_titles_are_rejected(self):
+        self.client.deck_index.add(_deck('deck-4', 'Houses'))
+
+        with self.assertRaises(ValueError):
+            self.client.find_deck_by_title('Houses')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
+import uuid
 from io import StringIO
 
-from tinycards.model import Deck
+from tinycards.model import ColumnarCardList, Deck
+from tinycards.model.card import random_ids, text_cards
 
 
 class DeckTest(unittest.TestCase):
@@ -40,6 +42,68 @@ class DeckTest(unittest.TestCase):
                               slug='test')
                          .shareable_link)
 
+    def test_add_cards_in_bulk(self):
+        test_deck = Deck('Test Deck')
+        pairs = [('front %d' % i, 'back %d' % i) for i in range(2500)]
+
+        test_deck.add_cards(iter(pairs))
+
+        self.assertEqual(2500, len(test_deck.cards))
+        self.assertEqual(pairs, [(c.front.concepts[0].fact.text,
+                                  c.back.concepts[0].fact.text)
+                                 for c in test_deck.cards])
+        ids = [c.id for c in test_deck.cards] \
+            + [c.front.concepts[0].fact.id for c in test_deck.cards]
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_add_cards_to_columnar_deck(self):
+        test_deck = Deck('Test Deck', cards=ColumnarCardList())
+
+        test_deck.add_cards([('front', 'back')])
+
+        self.assertEqual(0, test_deck.cards.materialized)
+        self.assertEqual('front',
+                         test_deck.cards[0].front.concepts[0].fact.text)
+
+    def test_add_cards_rejects_invalid_pairs(self):
+        for pairs in ([('front',)], [('front', None)]):
+            with self.assertRaises(ValueError):
+                list(text_cards(pairs))
+
+    def test_random_ids_look_like_uuid4(self):
+        for card_id in random_ids(100):
+            self.assertEqual(str(uuid.UUID(card_id)), card_id)
+            self.assertEqual(4, uuid.UUID(card_id).version)
+            self.assertEqual(uuid.RFC_4122, uuid.UUID(card_id).variant)
+
+    def test_new_deck_is_dirty(self):
+        self.assertTrue(Deck('New deck').is_dirty())
+
+    def test_changes_make_clean_deck_dirty(self):
+        test_deck = Deck('Test Deck')
+        test_deck.add_card(('front word', 'back word'))
+        test_deck.mark_clean()
+        self.assertFalse(test_deck.is_dirty())
+
+        test_deck.cards[0].back.concepts[0].fact.text = 'other word'
+        self.assertTrue(test_deck.is_dirty())
+        test_deck.mark_clean()
+
+        test_deck.tts_languages.append('de')
+        self.assertTrue(test_deck.is_dirty())
+        test_deck.mark_clean()
+
+        test_deck.add_card(('another', 'card'))
+        self.assertTrue(test_deck.is_dirty())
+
+    def test_fingerprint_ignores_ids(self):
+        test_deck = Deck('Test Deck')
+        test_deck.add_card(('front word', 'back word'))
+        fingerprint = test_deck.fingerprint()
+
+        test_deck.cards[0].id = 'server-id'
+        self.assertEqual(fingerprint, test_deck.fingerprint())
+
 
 if __name__ == '__main__':
     unittest.main()
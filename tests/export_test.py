@@ -0,0 +1,89 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from tinycards.client import Tinycards
+from tinycards.client.export import write_cards
+from tinycards.model import Card, Concept, Fact, Side
+from tinycards.networking import RestApi
+
+from fake_server import (FakeTinycardsServer, card_json, deck_json,
+                         login_route)
+
+
+class WriteCardsTest(unittest.TestCase):
+
+    def setUp(self):
+        multi_concept_side = Side(concepts=[
+            Concept(Fact('first')),
+            Concept(Fact(fact_type='IMAGE',
+                         image_url='https://example.org/i.png')),
+        ])
+        self.cards = [Card('front 1', 'back 1', card_id='card-1'),
+                      Card(multi_concept_side, 'back 2', card_id='card-2')]
+
+    def test_csv_joins_concepts(self):
+        sink = io.StringIO()
+
+        count = write_cards(iter(self.cards), sink, concept_separator='; ')
+
+        self.assertEqual(2, count)
+        rows = list(csv.reader(io.StringIO(sink.getvalue())))
+        self.assertEqual([['front', 'back'], ['front 1', 'back 1'],
+                          ['first; https://example.org/i.png', 'back 2']],
+                         rows)
+
+    def test_jsonl_keeps_all_facts(self):
+        sink = io.BytesIO()
+
+        write_cards(self.cards, sink, format='jsonl')
+
+        lines = sink.getvalue().decode('utf-8').splitlines()
+        self.assertEqual(2, len(lines))
+        second = json.loads(lines[1])
+        self.assertEqual('card-2', second['id'])
+        self.assertEqual(['TEXT', 'IMAGE'],
+                         [fact['type'] for fact in second['front']])
+        self.assertEqual('https://example.org/i.png',
+                         second['front'][1]['image_url'])
+
+    def test_compressed_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cards.csv.gz')
+
+            write_cards(self.cards, path)
+
+            with gzip.open(path, 'rt', encoding='utf-8') as csv_file:
+                self.assertEqual('front,back', csv_file.readline().strip())
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            write_cards(self.cards, io.StringIO(), format='xml')
+
+
+class ExportDeckTest(unittest.TestCase):
+
+    def test_cards_are_exported_from_stream(self):
+        with FakeTinycardsServer() as server:
+            login_route(server)
+            cards = [card_json('card-%d' % i, 'front %d' % i, 'back %d' % i)
+                     for i in range(100)]
+            server.json_route('GET', 'decks/abc',
+                              deck_json('abc', cards=cards))
+            sink = io.StringIO()
+
+            with Tinycards(silent=True,
+                           data_source=RestApi(api_url=server.url)) as client:
+                count = client.export_deck('abc', sink)
+
+        self.assertEqual(100, count)
+        self.assertEqual('front 99,back 99',
+                         sink.getvalue().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+"""A local stand-in for the Tinycards API used by the unit tests."""
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+API_PATH = '/api/1/'
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """Handles each request in its own thread.
+
+    Same as `http.server.ThreadingHTTPServer`, which requires Python 3.7.
+    """
+
+    daemon_threads = True
+
+
+class FakeRequest(object):
+    """A request received by the fake server."""
+
+    def __init__(self, method, path, query, headers, body, client_port):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.client_port = client_port
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8'))
+
+
+class FakeTinycardsServer(object):
+    """Serves canned responses for the routes registered on it.
+
+    Handlers are registered per method and path (relative to the API root)
+    and receive a `FakeRequest`. They return a tuple of status code, headers
+    and body, where dicts and lists are sent as JSON.
+
+    Example:
+        >>> with FakeTinycardsServer() as server:
+        >>>     server.route('GET', 'users/1', lambda req: (200, {}, {}))
+        >>>     api = RestApi(api_url=server.url)
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._httpd = _ThreadingHTTPServer(('127.0.0.1', 0),
+                                           self._make_handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return 'http://%s:%d%s' % (host, port, API_PATH)
+
+    def route(self, method, path, handler):
+        """Register a handler for the given method and API path."""
+        self.routes[(method, path)] = handler
+
+    def json_route(self, method, path, json_data, status=200):
+        """Register a handler which always returns the same JSON body."""
+        self.route(method, path, lambda request: (status, {}, json_data))
+
+    def requests_to(self, path):
+        """Get all received requests for the given API path."""
+        with self._lock:
+            return [r for r in self.requests if r.path == path]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handle(self, handler, method):
+        split_url = urlsplit(handler.path)
+        path = split_url.path[len(API_PATH):]
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        request = FakeRequest(method, path, parse_qs(split_url.query),
+                              handler.headers, body,
+                              handler.client_address[1])
+        with self._lock:
+            self.requests.append(request)
+
+        route = self.routes.get((method, path))
+        if route is None:
+            status, headers, payload = 404, {}, {'error': 'Not found'}
+        else:
+            status, headers, payload = route(request)
+
+        if isinstance(payload, (dict, list)):
+            payload = json.dumps(payload)
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        handler.send_response(status)
+        if 'Content-Type' not in headers:
+            handler.send_header('Content-Type', 'application/json')
+        for k, v in headers.items():
+            handler.send_header(k, v)
+        if headers.get('Transfer-Encoding') == 'chunked':
+            # Send the body without announcing its length.
+            handler.end_headers()
+            handler.wfile.write(b'%x\r\n%s\r\n0\r\n\r\n'
+                                % (len(payload), payload))
+            return
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._handle(self, 'GET')
+
+            def do_POST(self):
+                server._handle(self, 'POST')
+
+            def do_PATCH(self):
+                server._handle(self, 'PATCH')
+
+            def do_DELETE(self):
+                server._handle(self, 'DELETE')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def deck_json(deck_id, name='Test Deck', cards=None, **fields):
+    """Build the JSON representation of a deck as returned by Tinycards."""
+    json_data = {
+        'id': deck_id,
+        'name': name,
+        'description': None,
+        'compactId': 'c' + deck_id,
+        'slug': name.lower().replace(' ', '-'),
+        'private': False,
+        'shareable': False,
+        'blacklistedSideIndices': [],
+        'blacklistedQuestionTypes': [],
+        'gradingModes': [],
+        'ttsLanguages': [],
+        'imageUrl': 'https://example.org/default.png',
+        'coverImageUrl': None,
+    }
+    if cards is not None:
+        json_data['cards'] = cards
+    json_data.update(fields)
+    return json_data
+
+
+def card_json(card_id, front, back):
+    """Build the JSON representation of a simple text card."""
+    def side_json(side_id, text):
+        return {
+            'id': side_id,
+            'concepts': [{
+                'id': side_id + '-concept',
+                'createdAt': 1500000000,
+                'updatedAt': 1500000000,
+                'fact': {'id': side_id + '-fact', 'type': 'TEXT',
+                         'text': text}
+            }]
+        }
+
+    return {'id': card_id,
+            'sides': [side_json(card_id + '-front', front),
+                      side_json(card_id + '-back', back)]}
+
+
+def login_route(server, user_id=1, jwt='test-token'):
+    """Register a successful login route on the given server."""
+    server.route('POST', 'login', lambda request: (
+        200,
+        {'Set-Cookie': 'jwt_token=%s; Path=/' % jwt},
+        {'id': user_id, 'username': 'test', 'email': 'test@example.org'}
+    ))
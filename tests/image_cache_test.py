@@ -0,0 +1,178 @@
+import io
+import os
+import tempfile
+import unittest
+
+from tinycards.model import Deck
+from tinycards.networking import ImageCache, RestApi
+from tinycards.networking.form_utils import open_cover
+
+from fake_server import FakeTinycardsServer, deck_json
+
+
+def path_to(filename):
+    current_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.abspath(os.path.join(current_dir, filename))
+
+
+def read_image(filename):
+    with open(path_to(filename), 'rb') as img:
+        return img.read()
+
+
+class ImageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ImageCache(self._temp_dir.name, max_bytes=1000)
+
+    def tearDown(self):
+        self.cache.close()
+        self._temp_dir.cleanup()
+
+    def _cached_digest(self, url):
+        cached = self.cache.open(url)
+        if cached is None:
+            return None
+        cached[0].close()
+        return cached[2]
+
+    def test_put_and_open(self):
+        img = io.BytesIO(b'x' * 100)
+
+        digest = self.cache.put(img, 'image/png', 'https://example.org/a')
+
+        self.assertEqual(0, img.tell())
+        cached, mime_type, cached_digest = self.cache.open(
+            'https://example.org/a')
+        with cached:
+            self.assertEqual(b'x' * 100, cached.read())
+        self.assertEqual((digest, 'image/png'), (cached_digest, mime_type))
+        self.assertIsNone(self.cache.open('https://example.org/b'))
+
+    def test_same_content_is_stored_once(self):
+        self.cache.put(io.BytesIO(b'x' * 100), 'image/png', 'https://a')
+        self.cache.put(io.BytesIO(b'x' * 100), 'image/png', 'https://b')
+
+        self.assertEqual(100, self.cache.size)
+        self.assertEqual(self._cached_digest('https://a'),
+                         self._cached_digest('https://b'))
+
+    def test_least_recently_used_images_are_evicted(self):
+        for i in range(3):
+            self.cache.put(io.BytesIO(bytes([i]) * 400), 'image/png',
+                           'https://example.org/%d' % i)
+
+        self.assertLessEqual(self.cache.size, 1000)
+        self.assertIsNone(self._cached_digest('https://example.org/0'))
+        self.assertIsNotNone(self._cached_digest('https://example.org/2'))
+
+    @unittest.skipIf(os.name == 'nt', 'opened files cannot be deleted')
+    def test_opened_image_survives_eviction(self):
+        self.cache.put(io.BytesIO(b'a' * 600), 'image/png', 'https://a')
+        cached, _, _ = self.cache.open('https://a')
+
+        with cached:
+            self.cache.put(io.BytesIO(b'b' * 600), 'image/png', 'https://b')
+
+            self.assertIsNone(self.cache.open('https://a'))
+            self.assertEqual(b'a' * 600, cached.read())
+
+    def test_cover_image_urls_are_remembered(self):
+        self.cache.set_cover_image_url('abc', 'https://example.org/c.png')
+
+        self.assertEqual('https://example.org/c.png',
+                         self.cache.get_cover_image_url('abc'))
+        self.assertIsNone(self.cache.get_cover_image_url('def'))
+
+
+class CoverUploadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        self.server.route('GET', 'images/blue', lambda request: (
+            200, {'Content-Type': 'image/jpeg'},
+            read_image('test_logo_blue.jpg')))
+        self.server.json_route('POST', 'decks', deck_json(
+            'abc', coverImageUrl='https://example.org/uploaded.jpg'))
+        self.server.json_route('PATCH', 'decks/abc', deck_json(
+            'abc', coverImageUrl='https://example.org/uploaded.jpg'))
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ImageCache(self._temp_dir.name)
+        self.api = RestApi(api_url=self.server.url, image_cache=self.cache)
+
+    def tearDown(self):
+        self.api.close()
+        self.cache.close()
+        self.server.stop()
+        self._temp_dir.cleanup()
+
+    def test_downloaded_covers_are_cached(self):
+        url = self.server.url + 'images/blue'
+        for _ in range(2):
+            with open_cover(url, self.cache) as cover:
+                self.assertEqual('image/jpeg', cover.mime_type)
+                self.assertEqual(read_image('test_logo_blue.jpg'),
+                                 cover.file.read())
+
+        self.assertEqual(1, len(self.server.requests_to('images/blue')))
+
+    def test_local_cover_file_is_closed(self):
+        with open_cover(path_to('test_logo_red.png')) as cover:
+            pass
+
+        self.assertTrue(cover.file.closed)
+
+    def test_same_cover_is_uploaded_once(self):
+        for _ in range(2):
+            self.api.create_deck(Deck('Test Deck',
+                                      cover=path_to('test_logo_red.png')))
+        deck = Deck('Test Deck', cover=self.server.url + 'images/blue')
+        deck.id = 'abc'
+        self.api.update_deck(deck, 1, refresh='local', force=True)
+
+        first, second = self.server.requests_to('decks')
+        self.assertIn(b'name="imageFile"', first.body)
+        self.assertNotIn(b'name="imageFile"', second.body)
+        self.assertIn(b'https://example.org/uploaded.jpg', second.body)
+        # A different image is uploaded as well.
+        patch = self.server.requests_to('decks/abc')[0]
+        self.assertIn(b'name="imageFile"', patch.body)
+
+    def test_uploaded_cover_is_reused_by_update(self):
+        self.api.create_deck(Deck('Test Deck',
+                                  cover=path_to('test_logo_red.png')))
+        deck = Deck('Test Deck', cover=path_to('test_logo_red.png'))
+        deck.id = 'abc'
+
+        self.api.update_deck(deck, 1, refresh='local', force=True)
+
+        patch = self.server.requests_to('decks/abc')[0]
+        self.assertEqual('application/json', patch.headers['Content-Type'])
+        self.assertEqual('https://example.org/uploaded.jpg',
+                         patch.json()['coverImageUrl'])
+
+    def test_preprocessed_cover_is_uploaded(self):
+        processed = []
+
+        class Preprocessor(object):
+            def process(self, img, mime_type):
+                processed.append(io.BytesIO(b'downscaled'))
+                return processed[-1]
+
+        self.api.cover_preprocessor = Preprocessor()
+        for _ in range(2):
+            self.api.create_deck(Deck('Test Deck',
+                                      cover=path_to('test_logo_red.png')))
+
+        first, second = self.server.requests_to('decks')
+        self.assertIn(b'downscaled', first.body)
+        self.assertNotIn(read_image('test_logo_red.png'), first.body)
+        # The original image is recognized again.
+        self.assertNotIn(b'name="imageFile"', second.body)
+        self.assertEqual(1, len(processed))
+        self.assertTrue(processed[0].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
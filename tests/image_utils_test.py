@@ -1,8 +1,16 @@
+import io
 import os
+import tempfile
 import unittest
-from tinycards.networking.image_utils import (get_image, mime_type_from_bytes,
+from tempfile import SpooledTemporaryFile
+
+from tinycards.networking.form_utils import CoverImage, to_multipart_form
+from tinycards.networking.image_utils import (Image, CoverPreprocessor,
+                                              get_image, mime_type_from_bytes,
                                               mime_type_from_path)
 
+from fake_server import FakeTinycardsServer
+
 
 DEFAULT_COVER_URL = ('https://s3.amazonaws.com/tinycards/image/'
                      + '16cb6cbcb086ae0f622d1cfb7553a096')
@@ -33,6 +41,99 @@ class ImageUtilsTest(unittest.TestCase):
         self.assertEqual('image/png', mime_type)
 
 
+class StreamedImageTest(unittest.TestCase):
+
+    def setUp(self):
+        with open(path_to('test_logo_red.png'), 'rb') as img:
+            self.png = img.read()
+        self.server = FakeTinycardsServer().start()
+        # Served as JSON, so the type is sniffed from the first bytes.
+        self.server.route('GET', 'cover', lambda request: (200, {},
+                                                           self.png))
+        self.url = self.server.url + 'cover'
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_small_image_is_kept_in_memory(self):
+        img, mime_type = get_image(self.url)
+        with img:
+            self.assertEqual('image/png', mime_type)
+            self.assertFalse(img._rolled)
+            self.assertEqual(self.png, img.read())
+
+    def test_large_image_is_spooled_to_disk(self):
+        img, _ = get_image(self.url, spool_size=100)
+        with img:
+            self.assertTrue(img._rolled)
+            self.assertEqual(self.png, img.read())
+
+    def test_too_large_image_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'larger than 100 bytes'):
+            get_image(self.url, max_size=100)
+
+    def test_multipart_form_streams_spooled_file(self):
+        img = SpooledTemporaryFile(max_size=len(self.png) + 1)
+        img.write(self.png)
+        img.seek(0)
+
+        form = to_multipart_form({'name': 'Test'},
+                                 cover=CoverImage(img, 'image/png', None))
+        body = form.to_string()
+
+        self.assertFalse(img._rolled)
+        self.assertIn(self.png, body)
+        self.assertEqual(len(body), form.len)
+
+
+class CoverPreprocessorTest(unittest.TestCase):
+
+    @unittest.skipIf(Image is None, 'requires Pillow')
+    def test_large_images_are_downscaled(self):
+        for image_format, mime_type in (('JPEG', 'image/jpeg'),
+                                        ('PNG', 'image/png')):
+            original = io.BytesIO()
+            Image.effect_noise((800, 600), 64).save(original, image_format)
+            original.seek(0)
+
+            with CoverPreprocessor(max_dimension=200,
+                                   max_workers=1) as preprocessor:
+                processed = preprocessor.process(original, mime_type)
+
+            self.assertEqual(0, original.tell())
+            self.assertEqual(mime_type,
+                             mime_type_from_bytes(processed.getvalue()))
+            with Image.open(processed) as img:
+                self.assertEqual((200, 150), img.size)
+
+    @unittest.skipIf(Image is None, 'requires Pillow')
+    def test_files_on_disk_are_processed_by_workers(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'cover.jpg')
+            Image.effect_noise((800, 600), 64).convert('RGB').save(path)
+
+            with open(path, 'rb') as original, \
+                    CoverPreprocessor(max_dimension=200,
+                                      max_workers=1) as preprocessor:
+                processed = preprocessor.process(original, 'image/jpeg')
+
+                self.assertEqual(0, original.tell())
+
+        with Image.open(processed) as img:
+            self.assertEqual((200, 150), img.size)
+
+    @unittest.skipIf(Image is None, 'requires Pillow')
+    def test_small_images_are_kept(self):
+        with open(path_to('test_logo_red.png'), 'rb') as img:
+            with CoverPreprocessor(max_workers=0) as preprocessor:
+                self.assertIsNone(preprocessor.process(img, 'image/png'))
+
+    @unittest.skipIf(Image is not None, 'Pillow is installed')
+    def test_pillow_is_required(self):
+        with self.assertRaises(ImportError):
+            CoverPreprocessor()
+
+
 def path_to(filename):
     current_dir = os.path.dirname(os.path.realpath(__file__))
     return os.path.abspath(os.path.join(current_dir, filename))
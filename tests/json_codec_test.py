@@ -0,0 +1,32 @@
+import unittest
+
+from tinycards.networking import json_codec
+
+
+class JsonCodecTest(unittest.TestCase):
+
+    def tearDown(self):
+        json_codec.use_backend()
+
+    def test_fastest_backend_is_default(self):
+        self.assertEqual(next(iter(json_codec.BACKENDS)), json_codec.backend)
+
+    def test_all_backends_round_trip(self):
+        data = {'name': 'Café', 'url': 'https://example.org/a.png',
+                'cards': [{'id': 1, 'private': False, 'text': None}]}
+        for name in json_codec.BACKENDS:
+            json_codec.use_backend(name)
+
+            encoded = json_codec.dumps(data)
+
+            self.assertIsInstance(encoded, str)
+            self.assertEqual(data, json_codec.loads(encoded))
+            self.assertEqual(data, json_codec.loads(encoded.encode('utf-8')))
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            json_codec.use_backend('simplejson')
+
+
+if __name__ == '__main__':
+    unittest.main()
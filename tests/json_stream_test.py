@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from tinycards.networking.json_stream import JsonObjectStream
+from tinycards.networking.json_stream import iter_object_members
+
+
+DOCUMENT = {
+    'id': 'abc',
+    'name': 'Café ☕',
+    'rating': -12.5e-1,
+    'private': False,
+    'description': None,
+    'cards': [{'id': 1, 'sides': [[], {}]}, {'id': 22}],
+    'gradingModes': [],
+    'count': 1234,
+}
+
+
+class JsonStreamTest(unittest.TestCase):
+
+    def test_members_are_decoded(self):
+        data = json.dumps(DOCUMENT).encode('utf-8')
+
+        members = list(iter_object_members([data]))
+
+        self.assertEqual(list(DOCUMENT.items()), members)
+
+    def test_array_elements_are_streamed(self):
+        data = json.dumps(DOCUMENT).encode('utf-8')
+
+        members = list(iter_object_members([data], ['cards', 'gradingModes']))
+
+        self.assertEqual([('cards', {'id': 1, 'sides': [[], {}]}),
+                          ('cards', {'id': 22})],
+                         [m for m in members if m[0] == 'cards'])
+        self.assertNotIn('gradingModes', [key for key, _ in members])
+
+    def test_chunks_can_be_split_anywhere(self):
+        data = json.dumps(DOCUMENT, indent=1).encode('utf-8')
+        expected = list(iter_object_members([data], ['cards']))
+
+        for split in range(1, len(data)):
+            members = list(iter_object_members([data[:split], data[split:]],
+                                               ['cards']))
+            self.assertEqual(expected, members, split)
+
+    def test_members_are_returned_before_end_of_data(self):
+        stream = JsonObjectStream(['cards'])
+
+        self.assertEqual([], stream.feed(b'{"cards": [{"id": 1'))
+        self.assertEqual([('cards', {'id': 1})], stream.feed(b'}, {"id"'))
+        self.assertEqual([('cards', {'id': 2})], stream.feed(b': 2}]}'))
+        self.assertEqual([], stream.close())
+
+    def test_invalid_data_is_rejected(self):
+        for data in (b'[1, 2]', b'{"a": 1', b'{"a" 1}', b'{"a": 1}}',
+                     b'{"a": tru}'):
+            with self.assertRaises(ValueError):
+                list(iter_object_members([data]))
+
+
+if __name__ == '__main__':
+    unittest.main()
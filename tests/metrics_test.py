@@ -0,0 +1,136 @@
+import itertools
+import json
+import unittest
+from urllib.request import urlopen
+
+from tinycards.model import Deck
+from tinycards.networking import MetricsRegistry, RestApi, RetryPolicy
+from tinycards.networking.metrics import Histogram, endpoint_of
+
+from fake_server import FakeTinycardsServer, card_json, deck_json
+
+API_URL = 'https://tinycards.duolingo.com/api/1/'
+
+
+class EndpointOfTest(unittest.TestCase):
+
+    def test_ids_are_replaced(self):
+        self.assertEqual('GET decks/{id}',
+                         endpoint_of('GET', API_URL + 'decks/abc', API_URL))
+        self.assertEqual('DELETE users/{id}/favorites/{id}',
+                         endpoint_of('DELETE',
+                                     API_URL + 'users/1/favorites/xyz',
+                                     API_URL))
+        self.assertEqual('POST login',
+                         endpoint_of('POST', API_URL + 'login', API_URL))
+
+    def test_expand_parameter_is_kept(self):
+        self.assertEqual('GET decks/{id}?expand=true',
+                         endpoint_of('GET', API_URL + 'decks/abc', API_URL,
+                                     {'expand': 'true', 'other': 1}))
+
+
+class HistogramTest(unittest.TestCase):
+
+    def test_observations_are_bucketed(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        self.assertEqual([(0.1, 2), (1.0, 3), (float('inf'), 4)],
+                         histogram.cumulative_counts())
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(2.65, histogram.sum)
+
+
+class RestApiMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        self.server.json_route('GET', 'decks/abc', deck_json(
+            'abc', cards=[card_json('card-1', 'tree', 'Baum')]))
+        self.server.json_route('POST', 'decks', deck_json('new'))
+        failures = itertools.count()
+        self.server.route('GET', 'users/1/favorites', lambda request: (
+            (503, {}, {}) if next(failures) < 1
+            else (200, {}, {'favorites': []})))
+        self.metrics = MetricsRegistry()
+        self.api = RestApi(api_url=self.server.url, metrics=self.metrics,
+                           retry_policy=RetryPolicy(backoff_factor=0))
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+
+    def test_requests_are_recorded_per_endpoint(self):
+        self.api.get_deck('abc', 1)
+        self.api.get_deck('abc', 1)
+        self.api.get_deck('abc', 1, include_cards=False)
+
+        expanded = self.metrics.endpoints['GET decks/{id}?expand=true']
+        self.assertEqual(2, expanded.requests)
+        self.assertEqual({200: 2}, dict(expanded.statuses))
+        self.assertEqual(2, expanded.latency.count)
+        self.assertGreater(expanded.response_bytes, 0)
+        self.assertEqual(2, expanded.conversion.count)
+        self.assertEqual(1, self.metrics.endpoints['GET decks/{id}'].requests)
+
+    def test_streamed_responses_without_length_are_measured(self):
+        deck = deck_json('chunked', cards=[card_json('card-1', 'tree', 'Baum'),
+                                           card_json('card-2', 'house',
+                                                     'Haus')])
+        body = json.dumps(deck).encode('utf-8')
+        self.server.route('GET', 'decks/chunked', lambda request: (
+            200, {'Transfer-Encoding': 'chunked'}, body))
+
+        cards = list(self.api.iter_deck_cards('chunked'))
+
+        self.assertEqual(2, len(cards))
+        expanded = self.metrics.endpoints['GET decks/{id}?expand=true']
+        self.assertEqual(len(body), expanded.response_bytes)
+        self.assertEqual(1, expanded.conversion.count)
+
+    def test_retries_and_statuses_are_recorded(self):
+        self.api.get_favorites(1)
+
+        favorites = self.metrics.endpoints['GET users/{id}/favorites']
+        self.assertEqual({503: 1, 200: 1}, dict(favorites.statuses))
+        self.assertEqual(1, favorites.retries)
+
+    def test_request_bytes_are_recorded(self):
+        self.api.create_deck(Deck('Test Deck'))
+
+        created = self.metrics.endpoints['POST decks']
+        self.assertGreater(created.request_bytes, 0)
+        self.assertEqual(1, created.conversion.count)
+
+    def test_prometheus_exposition(self):
+        self.api.get_deck('abc', 1)
+        server = self.metrics.start_http_server()
+        try:
+            url = 'http://127.0.0.1:%d/metrics' % server.server_address[1]
+            with urlopen(url) as response:
+                text = response.read().decode('utf-8')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        endpoint = 'endpoint="GET decks/{id}?expand=true"'
+        self.assertIn('tinycards_requests_total{%s,status="200"} 1'
+                      % endpoint, text)
+        self.assertIn('tinycards_request_duration_seconds_bucket{%s,'
+                      'le="+Inf"} 1' % endpoint, text)
+        self.assertIn('tinycards_conversion_duration_seconds_count{%s} 1'
+                      % endpoint, text)
+        self.assertIn('# TYPE tinycards_response_bytes_total counter', text)
+
+    def test_nothing_is_recorded_without_registry(self):
+        self.api.metrics = None
+
+        self.api.get_deck('abc', 1)
+
+        self.assertEqual({}, self.metrics.endpoints)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import tempfile
+import unittest
+
+from tinycards.client.mirror import DeckMirror
+from tinycards.networking import RestApi
+from tinycards.networking.error import PartialResultError
+
+from fake_server import FakeTinycardsServer, card_json, deck_json
+
+USER_JSON = {
+    'creationDate': 1500000000,
+    'email': 'test@example.org',
+    'fullname': 'Test User',
+    'id': 1,
+    'learningLanguage': 'de',
+    'picture': 'https://example.org/picture.png',
+    'subscribed': False,
+    'subscriberCount': 0,
+    'subscriptionCount': 0,
+    'uiLanguage': 'en',
+    'username': 'test',
+}
+
+
+class DeckMirrorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        self.previews = {
+            'deck-1': deck_json('deck-1', 'Animals', updatedAt=1),
+            'deck-2': deck_json('deck-2', 'Houses', updatedAt=1),
+        }
+        self.server.route('GET', 'decks', lambda request: (
+            200, {}, {'decks': list(self.previews.values())}))
+        for deck_id in ('deck-1', 'deck-2'):
+            self._route_deck(deck_id, 'tree', 'Baum')
+        self.server.json_route('GET', 'users/1', USER_JSON)
+        self.server.json_route('GET', 'users/1/favorites',
+                               {'favorites': []})
+        self.api = RestApi(api_url=self.server.url)
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.mirror = DeckMirror(
+            os.path.join(self._temp_dir.name, 'mirror.sqlite'), self.api, 1)
+
+    def tearDown(self):
+        self.mirror.close()
+        self.api.close()
+        self.server.stop()
+        self._temp_dir.cleanup()
+
+    def _route_deck(self, deck_id, front, back, status=200):
+        preview = self.previews[deck_id]
+        self.server.json_route(
+            'GET', 'decks/' + deck_id,
+            deck_json(deck_id, preview['name'],
+                      cards=[card_json(deck_id + '-card', front, back)],
+                      updatedAt=preview['updatedAt']),
+            status=status)
+
+    def _deck_requests(self):
+        return [r.path for r in self.server.requests
+                if r.path.startswith('decks/')]
+
+    def test_refresh_fetches_all_decks_initially(self):
+        stats = self.mirror.refresh()
+
+        self.assertEqual({'fetched': 2, 'unchanged': 0, 'deleted': 0},
+                         stats)
+        deck = self.mirror.get_deck('deck-1')
+        self.assertEqual('Animals', deck.title)
+        self.assertEqual('tree', deck.cards[0].front.concepts[0].fact.text)
+        self.assertEqual('test', self.mirror.get_user_info().username)
+        self.assertEqual([], self.mirror.get_favorites())
+
+    def test_refresh_only_fetches_changed_decks(self):
+        self.mirror.refresh()
+        self.previews['deck-2']['updatedAt'] = 2
+        self._route_deck('deck-2', 'house', 'Haus')
+        del self.server.requests[:]
+
+        stats = self.mirror.refresh()
+
+        self.assertEqual({'fetched': 1, 'unchanged': 1, 'deleted': 0},
+                         stats)
+        self.assertEqual(['decks/deck-2'], self._deck_requests())
+        card = self.mirror.get_deck('deck-2').cards[0]
+        self.assertEqual('house', card.front.concepts[0].fact.text)
+
+    def test_decks_keep_the_order_of_the_account(self):
+        self.mirror.refresh()
+        # Storing deck-1 again must not move it behind deck-2.
+        self.previews['deck-1']['updatedAt'] = 2
+        self._route_deck('deck-1', 'cat', 'Katze')
+        self.mirror.refresh()
+        self.assertEqual(['deck-1', 'deck-2'],
+                         [d.id for d in self.mirror.get_decks()])
+
+        self.previews = {'deck-2': self.previews['deck-2'],
+                         'deck-1': self.previews['deck-1']}
+        self.mirror.refresh()
+        self.assertEqual(['deck-2', 'deck-1'],
+                         [d.id for d in self.mirror.get_decks()])
+
+    def test_refresh_deletes_removed_decks(self):
+        self.mirror.refresh()
+        del self.previews['deck-1']
+
+        stats = self.mirror.refresh()
+
+        self.assertEqual({'fetched': 0, 'unchanged': 1, 'deleted': 1},
+                         stats)
+        self.assertIsNone(self.mirror.get_deck('deck-1'))
+        self.assertEqual(0, self.mirror.connection.execute(
+            "SELECT COUNT(*) FROM cards WHERE deck_id = 'deck-1'"
+        ).fetchone()[0])
+
+    def test_partial_refresh_keeps_fetched_decks(self):
+        self._route_deck('deck-2', 'tree', 'Baum', status=500)
+
+        with self.assertRaises(PartialResultError):
+            self.mirror.refresh()
+
+        self.assertIsNotNone(self.mirror.get_deck('deck-1'))
+        self.assertIsNone(self.mirror.get_deck('deck-2'))
+
+    def test_reads_send_no_requests(self):
+        self.mirror.refresh()
+        del self.server.requests[:]
+
+        self.assertEqual(['deck-1', 'deck-2'],
+                         [d.id for d in self.mirror.get_decks()])
+        self.assertEqual([], self.mirror.get_decks(False)[0].cards)
+        self.assertEqual('deck-2',
+                         self.mirror.find_deck_by_title('Houses').id)
+        self.assertIsNone(self.mirror.find_deck_by_title('Missing'))
+        self.mirror.get_user_info()
+        self.assertEqual([], self.server.requests)
+
+    def test_cards_can_be_queried_with_sql(self):
+        self.mirror.refresh()
+
+        rows = self.mirror.connection.execute(
+            'SELECT deck_id, front, back FROM cards ORDER BY deck_id'
+        ).fetchall()
+
+        self.assertEqual([('deck-1', 'tree', 'Baum'),
+                          ('deck-2', 'tree', 'Baum')], rows)
+
+    def test_cards_are_stored_without_converting(self):
+        self.mirror.refresh()
+
+        deck = self.mirror.get_deck('deck-1')
+
+        self.assertEqual(0, deck.cards.converted)
+        self.assertFalse(deck.is_dirty())
+        self.assertEqual('Baum', deck.cards[0].back.concepts[0].fact.text)
+
+    def test_decks_without_cards_skip_reading_cards(self):
+        self.mirror.refresh()
+        with self.mirror.connection:
+            self.mirror.connection.execute("UPDATE decks SET cards = x'00'")
+
+        decks = self.mirror.get_decks(include_cards=False)
+
+        self.assertEqual(['Animals', 'Houses'], [d.title for d in decks])
+        self.assertEqual([], decks[0].cards)
+
+    def test_mirror_persists_across_instances(self):
+        self.mirror.refresh()
+        path = os.path.join(self._temp_dir.name, 'mirror.sqlite')
+
+        with DeckMirror(path, self.api, 1) as mirror:
+            self.assertEqual('Animals', mirror.get_deck('deck-1').title)
+
+
+if __name__ == '__main__':
+    unittest.main()
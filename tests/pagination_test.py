@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import unittest
+
+from tinycards.networking import RestApi
+from tinycards.networking.pagination import aiter_pages, iter_pages
+
+from fake_server import FakeTinycardsServer
+
+
+def make_pages(num_pages, page_size):
+    return [['item-%d-%d' % (p, i) for i in range(page_size)]
+            for p in range(num_pages)]
+
+
+class IterPagesTest(unittest.TestCase):
+
+    def test_yields_all_items_until_empty_page(self):
+        pages = make_pages(3, 2)
+        fetched = []
+
+        def fetch_page(page):
+            fetched.append(page)
+            return pages[page] if page < len(pages) else []
+
+        items = list(iter_pages(fetch_page))
+
+        self.assertEqual(sum(pages, []), items)
+        self.assertEqual([0, 1, 2, 3], fetched)
+
+    def test_stops_at_max_items_without_fetching_more(self):
+        pages = make_pages(5, 3)
+        fetched = []
+
+        def fetch_page(page):
+            fetched.append(page)
+            return pages[page]
+
+        items = list(iter_pages(fetch_page, start_page=1, max_items=4))
+
+        self.assertEqual(pages[1] + pages[2][:1], items)
+        self.assertEqual([1, 2], fetched)
+
+    def test_prefetches_next_page_while_consuming(self):
+        pages = make_pages(2, 2)
+        next_page_requested = threading.Event()
+
+        def fetch_page(page):
+            if page == 1:
+                next_page_requested.set()
+            return pages[page] if page < len(pages) else []
+
+        iterator = iter_pages(fetch_page)
+        self.assertEqual('item-0-0', next(iterator))
+
+        self.assertTrue(next_page_requested.wait(timeout=5))
+        self.assertEqual(['item-0-1', 'item-1-0', 'item-1-1'],
+                         list(iterator))
+
+    def test_async_iteration(self):
+        pages = make_pages(3, 2)
+
+        async def fetch_page(page):
+            return pages[page] if page < len(pages) else []
+
+        async def collect(**kwargs):
+            return [item async for item in aiter_pages(fetch_page, **kwargs)]
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        self.assertEqual(sum(pages, []), loop.run_until_complete(collect()))
+        self.assertEqual(pages[0] + pages[1][:1],
+                         loop.run_until_complete(collect(max_items=3)))
+
+
+class RestApiPaginationTest(unittest.TestCase):
+
+    def test_iter_search_requests_consecutive_pages(self):
+        def handler(request):
+            page = int(request.query['page'][0])
+            if page >= 2:
+                return 200, {}, {'searchables': []}
+            return 200, {}, {'searchables': [
+                {'id': 'r%d' % page, 'type': 'DECK',
+                 'data': {'id': 'd%d' % page, 'name': 'Deck %d' % page,
+                          'description': ''}}
+            ]}
+
+        with FakeTinycardsServer() as server:
+            server.route('GET', 'searchables', handler)
+            with RestApi(api_url=server.url) as api:
+                results = list(api.iter_search('french', limit=1))
+
+        self.assertEqual(['d0', 'd1'], [r.data.id for r in results])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from tinycards.networking import RateLimiter, RestApi, TokenBucket
+from tinycards.networking.rate_limiter import (LOGIN, READ, SEARCH, WRITE,
+                                               family_of)
+
+from fake_server import FakeTinycardsServer, deck_json
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_bursts_up_to_capacity_then_waits(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        self.assertEqual(0, bucket.reserve())
+        self.assertEqual(0, bucket.reserve())
+        self.assertAlmostEqual(0.1, bucket.reserve(), delta=0.01)
+        self.assertAlmostEqual(0.2, bucket.reserve(), delta=0.01)
+
+    def test_rejects_non_positive_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_limits_threads_sharing_a_bucket(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        def acquire_many():
+            for _ in range(5):
+                bucket.acquire()
+
+        threads = [threading.Thread(target=acquire_many) for _ in range(4)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # 20 tokens at 50 per second, minus the initial one.
+        self.assertGreaterEqual(time.monotonic() - start, 19 / 50.0 - 0.01)
+
+    def test_acquire_async_does_not_block_the_loop(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(ticker(), *[bucket.acquire_async()
+                                             for _ in range(3)])
+
+        loop = asyncio.new_event_loop()
+        start = time.monotonic()
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.1 - 0.01)
+        self.assertEqual(5, len(ticks))
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_family_of(self):
+        url = 'https://tinycards.duolingo.com/api/1/'
+        self.assertEqual(LOGIN, family_of('POST', url + 'login'))
+        self.assertEqual(SEARCH, family_of('GET', url + 'searchables'))
+        self.assertEqual(READ, family_of('GET', url + 'decks/abc'))
+        self.assertEqual(WRITE, family_of('PATCH', url + 'decks/abc'))
+
+    def test_unlimited_families_are_not_throttled(self):
+        limiter = RateLimiter(writes=1)
+
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.acquire(READ)
+
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_limiter_is_shared_between_clients(self):
+        limiter = RateLimiter(reads=TokenBucket(rate=20, capacity=1))
+        with FakeTinycardsServer() as server:
+            server.json_route('GET', 'decks/abc', deck_json('abc'))
+            apis = [RestApi(api_url=server.url, rate_limiter=limiter)
+                    for _ in range(2)]
+
+            start = time.monotonic()
+            for _ in range(3):
+                for api in apis:
+                    api.get_deck('abc', 1)
+            elapsed = time.monotonic() - start
+
+            for api in apis:
+                api.close()
+
+        # Six requests at 20 per second, minus the initial token.
+        self.assertGreaterEqual(elapsed, 5 / 20.0 - 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import os
+import tempfile
+import time
+import unittest
+
+from tinycards.model import Deck
+from tinycards.networking import (MemoryCacheBackend, ResponseCache, RestApi,
+                                  SqliteCacheBackend)
+
+from fake_server import FakeTinycardsServer, card_json, deck_json
+
+
+class CacheBackendTest(unittest.TestCase):
+
+    def _test_backend(self, backend):
+        backend.set('a/', b'1', 10)
+        backend.set('b/', b'2', 20)
+        self.assertEqual((b'1', 10), tuple(backend.get('a/')))
+        # 'a/' was used more recently than 'b/', so 'b/' gets evicted.
+        backend.set('c/', b'3', 30)
+        self.assertIsNone(backend.get('b/'))
+        self.assertEqual(2, len(backend))
+
+        backend.set('ab/', b'4', 40)
+        backend.delete_prefix('a/')
+        self.assertIsNone(backend.get('a/'))
+        self.assertEqual((b'4', 40), tuple(backend.get('ab/')))
+
+        backend.clear()
+        self.assertEqual(0, len(backend))
+
+    def test_memory_backend(self):
+        self._test_backend(MemoryCacheBackend(max_entries=2))
+
+    def test_sqlite_backend(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'cache.sqlite')
+            backend = SqliteCacheBackend(path, max_entries=2)
+            self._test_backend(backend)
+
+            backend.set('persisted/', b'5', 50)
+            backend.close()
+            reopened = SqliteCacheBackend(path)
+            self.assertEqual((b'5', 50), tuple(reopened.get('persisted/')))
+            reopened.close()
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_entries_expire_per_endpoint(self):
+        cache = ResponseCache(ttls={'search': 0.05, 'get_deck': 0},
+                              default_ttl=60)
+        cache.set('search', ('french',), ['result'])
+        cache.set('get_deck', ('abc',), Deck('Not cached'))
+        cache.set('get_trends', (), ['trend'])
+
+        self.assertEqual(['result'], cache.get('search', 'french'))
+        self.assertIsNone(cache.get('get_deck', 'abc'))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('search', 'french'))
+        self.assertEqual(['trend'], cache.get('get_trends'))
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(2, cache.misses)
+
+    def test_hits_return_fresh_objects(self):
+        cache = ResponseCache()
+        cache.set('get_deck', ('abc',), Deck('Cached'))
+
+        first = cache.get('get_deck', 'abc')
+        first.title = 'Modified'
+
+        self.assertEqual('Cached', cache.get('get_deck', 'abc').title)
+
+
+class RestApiCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        self.server.json_route('GET', 'decks/abc', deck_json('abc', cards=[]))
+        self.cache = ResponseCache()
+        self.api = RestApi(api_url=self.server.url, cache=self.cache)
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+
+    def test_reads_are_served_from_cache(self):
+        self.api.get_deck('abc', 1)
+        deck = self.api.get_deck('abc', 1)
+
+        self.assertEqual('abc', deck.id)
+        self.assertEqual(1, len(self.server.requests_to('decks/abc')))
+        self.assertEqual({'hits': 1, 'misses': 1, 'revalidations': 0,
+                          'entries': 1},
+                         self.cache.stats)
+
+    def test_writes_invalidate_affected_entries(self):
+        self.server.json_route('PATCH', 'decks/abc', deck_json('abc'))
+        self.server.json_route('DELETE', 'decks/abc', deck_json('abc'))
+        self.api.get_deck('abc', 1)
+        self.api.get_deck('abc', 1, include_cards=False)
+
+        self.api.update_deck(Deck('Test Deck', deck_id='abc'), 1)
+        # The update itself re-fetches the deck and caches it again.
+        self.api.get_deck('abc', 1)
+        self.api.delete_deck('abc')
+        self.api.get_deck('abc', 1)
+
+        gets = [r for r in self.server.requests_to('decks/abc')
+                if r.method == 'GET']
+        self.assertEqual(4, len(gets))
+
+    def test_favorite_changes_invalidate_favorites(self):
+        self.server.json_route('GET', 'users/1/favorites', {'favorites': []})
+        self.server.json_route('DELETE', 'users/1/favorites/fav',
+                               {'removedFavoriteId': 'fav'})
+        self.api.get_favorites(1)
+        self.api.get_favorites(1)
+        self.api.remove_favorite(1, 'fav')
+        self.api.get_favorites(1)
+
+        self.assertEqual(2, len(self.server.requests_to('users/1/favorites')))
+
+
+class ConditionalRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        self.deck = deck_json('abc', cards=[card_json('card', 'a', 'b')])
+        self.api = RestApi(api_url=self.server.url,
+                           conditional_requests=True)
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+
+    def _etag_handler(self, request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            return 304, {'ETag': '"v1"'}, b''
+        return 200, {'ETag': '"v1"'}, self.deck
+
+    def test_unchanged_deck_is_not_downloaded_again(self):
+        self.server.route('GET', 'decks/abc', self._etag_handler)
+
+        first = self.api.get_deck('abc', 1)
+        second = self.api.get_deck('abc', 1)
+
+        self.assertEqual('a', second.cards[0].front.concepts[0].fact.text)
+        self.assertIsNot(first, second)
+        requests = self.server.requests_to('decks/abc')
+        self.assertEqual(2, len(requests))
+        self.assertIsNone(requests[0].headers.get('If-None-Match'))
+        self.assertEqual('"v1"', requests[1].headers['If-None-Match'])
+        self.assertEqual(1, self.api.cache.revalidations)
+
+    def test_last_modified_is_sent_back(self):
+        last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+        def handler(request):
+            if request.headers.get('If-Modified-Since') == last_modified:
+                return 304, {}, b''
+            return 200, {'Last-Modified': last_modified}, {
+                'creationDate': 0, 'email': 'test@example.org',
+                'fullname': 'Test', 'id': 1, 'learningLanguage': 'fr',
+                'picture': '', 'subscribed': False, 'subscriberCount': 0,
+                'subscriptionCount': 0, 'uiLanguage': 'en',
+                'username': 'test'}
+
+        self.server.route('GET', 'users/1', handler)
+
+        self.api.get_user_info(1)
+        user = self.api.get_user_info(1)
+
+        self.assertEqual('test', user.username)
+        self.assertEqual(1, self.api.cache.revalidations)
+
+    def test_server_ignoring_validators_gets_plain_requests(self):
+        self.server.route('GET', 'decks/abc',
+                          lambda request: (200, {'ETag': '"v1"'}, self.deck))
+
+        self.api.get_deck('abc', 1)
+        self.deck['name'] = 'Changed'
+        deck = self.api.get_deck('abc', 1)
+
+        self.assertEqual('Changed', deck.title)
+        self.assertEqual(0, self.api.cache.revalidations)
+
+    def test_responses_without_validators_are_not_kept(self):
+        self.server.json_route('GET', 'decks/abc', self.deck)
+
+        self.api.get_deck('abc', 1)
+        self.api.get_deck('abc', 1)
+
+        requests = self.server.requests_to('decks/abc')
+        self.assertIsNone(requests[1].headers.get('If-None-Match'))
+        self.assertEqual(0, len(self.api.cache.backend))
+
+
+if __name__ == '__main__':
+    unittest.main()
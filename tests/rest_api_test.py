@@ -0,0 +1,235 @@
+import json
+import threading
+import unittest
+
+from tinycards.client import Tinycards
+from tinycards.model import Deck
+from tinycards.networking import RestApi, json_codec
+from tinycards.networking.error import PartialResultError
+
+from fake_server import (FakeTinycardsServer, card_json, deck_json,
+                         login_route)
+
+
+class RestApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        login_route(self.server)
+        self.api = RestApi(api_url=self.server.url)
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+
+    def test_login_stores_jwt_in_session_cookies(self):
+        user_id = self.api.login('test', 'secret', silent=True)
+
+        self.assertEqual(1, user_id)
+        self.assertEqual('test-token', self.api.jwt)
+        self.assertEqual('test-token',
+                         self.api.session.cookies.get('jwt_token'))
+
+    def test_requests_reuse_pooled_connection(self):
+        self.server.json_route('GET', 'decks/abc', deck_json('abc'))
+        self.api.jwt = 'abc-token'
+
+        for _ in range(3):
+            self.api.get_deck('abc', 1)
+
+        received = self.server.requests_to('decks/abc')
+        self.assertEqual(3, len(received))
+        self.assertEqual(1, len(set(r.client_port for r in received)))
+        for request in received:
+            self.assertEqual('jwt_token=abc-token', request.headers['Cookie'])
+            self.assertEqual('https://tinycards.duolingo.com/',
+                             request.headers['Referer'])
+
+    def test_deck_cards_are_streamed(self):
+        cards = [card_json('card-%d' % i, 'front', 'back') for i in range(50)]
+        self.server.json_route('GET', 'decks/abc',
+                               deck_json('abc', cards=cards))
+
+        streamed = self.api.iter_deck_cards('abc')
+        deck = self.api.get_deck('abc', 1)
+
+        self.assertEqual([c['id'] for c in cards],
+                         [c.id for c in streamed])
+        self.assertEqual([c['id'] for c in cards], [c.id for c in deck.cards])
+        self.assertEqual('back', deck.cards[-1].back.concepts[0].fact.text)
+        self.assertEqual({'expand': ['true']},
+                         self.server.requests_to('decks/abc')[0].query)
+
+    def test_keep_alive_can_be_disabled(self):
+        self.server.json_route('GET', 'decks/abc', deck_json('abc'))
+        with RestApi(api_url=self.server.url, keep_alive=False) as api:
+            api.get_deck('abc', 1)
+            api.get_deck('abc', 1)
+
+        received = self.server.requests_to('decks/abc')
+        self.assertEqual('close', received[0].headers['Connection'])
+        self.assertEqual(2, len(set(r.client_port for r in received)))
+
+    def test_client_closes_data_source(self):
+        with Tinycards(silent=True, data_source=self.api) as client:
+            self.assertEqual(1, client.user_id)
+        # A closed session drops all pooled connections.
+        adapter = self.api.session.get_adapter(self.server.url)
+        self.assertEqual(0, len(adapter.poolmanager.pools))
+
+
+class GetDecksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        self.deck_ids = ['deck-%d' % i for i in range(6)]
+        self.server.json_route('GET', 'decks', {
+            'decks': [deck_json(deck_id) for deck_id in self.deck_ids]
+        })
+        self.api = RestApi(api_url=self.server.url)
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+
+    def test_hydration_keeps_original_order(self):
+        for deck_id in self.deck_ids:
+            self.server.json_route('GET', 'decks/' + deck_id,
+                                   deck_json(deck_id, cards=[]))
+
+        decks = self.api.get_decks(1, max_workers=3)
+
+        self.assertEqual(self.deck_ids, [d.id for d in decks])
+        for request in self.server.requests_to('decks/deck-0'):
+            self.assertEqual(['true'], request.query['expand'])
+
+    def test_hydration_fetches_decks_concurrently(self):
+        # Every deck request blocks until three of them arrived at once.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def handler(request):
+            barrier.wait()
+            deck_id = request.path.split('/')[-1]
+            return 200, {}, deck_json(deck_id, cards=[])
+
+        for deck_id in self.deck_ids:
+            self.server.route('GET', 'decks/' + deck_id, handler)
+
+        decks = self.api.get_decks(1, max_workers=3)
+
+        self.assertEqual(6, len(decks))
+
+    def test_hydration_reports_failed_decks(self):
+        for deck_id in self.deck_ids:
+            if deck_id != 'deck-2':
+                self.server.json_route('GET', 'decks/' + deck_id,
+                                       deck_json(deck_id, cards=[]))
+
+        with self.assertRaises(PartialResultError) as context:
+            self.api.get_decks(1)
+
+        error = context.exception
+        self.assertEqual(['deck-0', 'deck-1', 'deck-3', 'deck-4', 'deck-5'],
+                         [d.id for d in error.results])
+        self.assertEqual(['deck-2'], list(error.failures))
+        self.assertIsInstance(error.failures['deck-2'], ValueError)
+
+
+class UpdateDeckTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        self.server.json_route('PATCH', 'decks/abc', deck_json(
+            'abc', name='Updated', coverImageUrl='https://example.org/c.png'))
+        self.server.json_route('GET', 'decks/abc', deck_json(
+            'abc', name='Updated',
+            cards=[card_json('server-card', 'front', 'back')]))
+        self.api = RestApi(api_url=self.server.url)
+        self.deck = Deck('Updated', deck_id='abc')
+        self.deck.add_card(('front', 'back'))
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+
+    def _methods_sent(self):
+        return [r.method for r in self.server.requests_to('decks/abc')]
+
+    def test_full_refresh_fetches_updated_deck(self):
+        updated_deck = self.api.update_deck(self.deck, 1)
+
+        self.assertEqual(['PATCH', 'GET'], self._methods_sent())
+        self.assertEqual('server-card', updated_deck.cards[0].id)
+
+    def test_local_refresh_skips_extra_request(self):
+        updated_deck = self.api.update_deck(self.deck, 1, refresh='local')
+
+        self.assertEqual(['PATCH'], self._methods_sent())
+        self.assertEqual('abc', updated_deck.id)
+        self.assertEqual('https://example.org/c.png',
+                         updated_deck.cover_image_url)
+        self.assertEqual([c.id for c in self.deck.cards],
+                         [c.id for c in updated_deck.cards])
+
+    def test_lazy_refresh_fetches_cards_on_access(self):
+        updated_deck = self.api.update_deck(self.deck, 1, refresh='lazy')
+
+        self.assertEqual('Updated', updated_deck.title)
+        self.assertEqual(['PATCH'], self._methods_sent())
+
+        self.assertEqual(1, len(updated_deck.cards))
+        self.assertEqual('server-card', updated_deck.cards[0].id)
+        self.assertEqual(['PATCH', 'GET'], self._methods_sent())
+
+    def test_lazy_refresh_checks_changes_without_fetching(self):
+        updated_deck = self.api.update_deck(self.deck, 1, refresh='lazy')
+
+        self.assertFalse(updated_deck.is_dirty())
+        self.assertIs(updated_deck, self.api.update_deck(updated_deck, 1))
+        self.assertEqual(['PATCH'], self._methods_sent())
+
+    def test_unchanged_deck_is_not_sent(self):
+        deck = self.api.update_deck(self.deck, 1, refresh='local')
+
+        self.assertIs(deck, self.api.update_deck(deck, 1))
+        self.assertEqual(['PATCH'], self._methods_sent())
+
+        self.api.update_deck(deck, 1, refresh='local', force=True)
+        self.assertEqual(['PATCH', 'PATCH'], self._methods_sent())
+
+    def test_sent_deck_is_clean(self):
+        self.api.update_deck(self.deck, 1, refresh='local')
+        self.api.update_deck(self.deck, 1, refresh='local')
+
+        self.assertEqual(['PATCH'], self._methods_sent())
+
+    def test_fetched_deck_is_clean(self):
+        deck = self.api.get_deck('abc', 1)
+        self.assertFalse(deck.is_dirty())
+
+        deck.add_card(('new', 'card'))
+        self.api.update_deck(deck, 1, refresh='local')
+        self.assertEqual(['GET', 'PATCH'], self._methods_sent())
+
+    def test_non_ascii_text_is_sent_as_utf8(self):
+        self.addCleanup(json_codec.use_backend)
+        deck = Deck('Café', deck_id='abc')
+        deck.add_card(('日本', 'é'))
+        for name in json_codec.BACKENDS:
+            json_codec.use_backend(name)
+
+            self.api.update_deck(deck, 1, refresh='local', force=True)
+
+            patch = self.server.requests_to('decks/abc')[-1]
+            self.assertEqual('Café', patch.json()['name'], name)
+            card = json.loads(patch.json()['cards'])[0]
+            self.assertEqual('日本', card['sides'][0]['concepts'][0]['fact']
+                             ['text'], name)
+
+    def test_unknown_refresh_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.api.update_deck(self.deck, 1, refresh='never')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import time
+import unittest
+from email.utils import formatdate
+
+from tinycards.networking import RestApi
+from tinycards.networking.retry_policy import (RetryPolicy, RetryStats,
+                                               parse_retry_after)
+
+from fake_server import FakeTinycardsServer, deck_json
+
+
+def failing_handler(failures, status=503, headers=None):
+    """Fail the given number of times before returning a deck."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= failures:
+            return status, headers or {}, {'error': 'Try again'}
+        return 200, {}, deck_json('abc')
+
+    return handler
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_backoff_grows_exponentially(self):
+        policy = RetryPolicy(backoff_factor=0.5, max_backoff=3, jitter=False)
+
+        self.assertEqual([0.5, 1, 2, 3, 3],
+                         [policy.backoff(n) for n in range(1, 6)])
+
+    def test_backoff_with_jitter_stays_within_bounds(self):
+        policy = RetryPolicy(backoff_factor=1)
+
+        for _ in range(100):
+            self.assertTrue(0 <= policy.backoff(3) <= 4)
+
+    def test_backoff_honors_retry_after(self):
+        policy = RetryPolicy(max_retry_after=60)
+
+        self.assertEqual(7, policy.backoff(1, '7'))
+        self.assertIsNone(policy.backoff(1, '3600'))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(120, parse_retry_after('120'))
+        http_date = formatdate(time.time() + 30, usegmt=True)
+        self.assertTrue(25 < parse_retry_after(http_date) <= 30)
+        self.assertIsNone(parse_retry_after('soon'))
+
+    def test_only_idempotent_methods_are_retried_by_default(self):
+        policy = RetryPolicy()
+
+        self.assertTrue(policy.is_retryable('GET', 503))
+        self.assertTrue(policy.is_retryable('DELETE'))
+        self.assertFalse(policy.is_retryable('POST', 503))
+        self.assertFalse(policy.is_retryable('GET', 404))
+
+    def test_budget_limits_retries(self):
+        stats = RetryStats(RetryPolicy(budget_initial=1, budget_ratio=0.5))
+
+        self.assertTrue(stats.try_retry())
+        self.assertFalse(stats.try_retry())
+        stats.record_request()
+        stats.record_request()
+        self.assertTrue(stats.try_retry())
+        self.assertEqual(2, stats.retries)
+        self.assertEqual(1, stats.gave_up)
+
+
+class RestApiRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        policy = RetryPolicy(backoff_factor=0.01)
+        self.api = RestApi(api_url=self.server.url, retry_policy=policy)
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+
+    def test_transient_errors_are_retried(self):
+        self.server.route('GET', 'decks/abc', failing_handler(2))
+
+        deck = self.api.get_deck('abc', 1)
+
+        self.assertEqual('abc', deck.id)
+        self.assertEqual(3, len(self.server.requests_to('decks/abc')))
+        self.assertEqual(2, self.api.retry_stats.retries)
+
+    def test_gives_up_after_max_attempts(self):
+        self.server.route('GET', 'decks/abc', failing_handler(10))
+
+        with self.assertRaises(ValueError):
+            self.api.get_deck('abc', 1)
+
+        self.assertEqual(4, len(self.server.requests_to('decks/abc')))
+        self.assertEqual(1, self.api.retry_stats.gave_up)
+
+    def test_non_idempotent_requests_are_not_retried(self):
+        self.server.route('POST', 'users/1/favorites', failing_handler(1))
+
+        with self.assertRaises(KeyError):
+            self.api.add_favorite(1, 'abc')
+
+        self.assertEqual(1, len(self.server.requests_to('users/1/favorites')))
+
+    def test_retry_after_is_honored(self):
+        self.server.route('GET', 'decks/abc', failing_handler(
+            1, status=429, headers={'Retry-After': '1'}))
+
+        start = time.time()
+        self.api.get_deck('abc', 1)
+
+        self.assertGreaterEqual(time.time() - start, 1)
+        self.assertEqual(1, self.api.retry_stats.retries)
+
+
+if __name__ == '__main__':
+    unittest.main()
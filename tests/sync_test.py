@@ -0,0 +1,137 @@
+import itertools
+import os
+import tempfile
+import unittest
+
+from tinycards.client.sync import MANIFEST_NAME, load_manifest, sync_directory
+from tinycards.networking import RestApi
+
+from fake_server import FakeTinycardsServer, deck_json
+
+
+class SyncDirectoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeTinycardsServer().start()
+        deck_ids = itertools.count(1)
+        self.server.route('POST', 'decks', lambda request: (
+            200, {}, deck_json('deck-%d' % next(deck_ids))))
+        for deck_id in ('deck-1', 'deck-2', 'deck-3'):
+            self.server.json_route('GET', 'decks/' + deck_id, deck_json(
+                deck_id, 'Renamed', description='Kept', private=True,
+                shareable=True,
+                coverImageUrl='https://example.org/cover.png'))
+            self.server.json_route('PATCH', 'decks/' + deck_id,
+                                   deck_json(deck_id))
+            self.server.json_route('DELETE', 'decks/' + deck_id,
+                                   deck_json(deck_id))
+        self.api = RestApi(api_url=self.server.url)
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self._temp_dir.name
+        os.mkdir(os.path.join(self.directory, 'sub'))
+        self._write('words.csv', 'front,back\ntree,Baum\n')
+        self._write('sub/more.tsv', 'front\tback\nhouse\tHaus\n')
+
+    def tearDown(self):
+        self.api.close()
+        self.server.stop()
+        self._temp_dir.cleanup()
+
+    def _write(self, name, content):
+        with open(os.path.join(self.directory, name), 'w') as f:
+            f.write(content)
+
+    def _sync(self, **kwargs):
+        return sync_directory(self.api, 1, self.directory, **kwargs)
+
+    def _writes(self):
+        return [(r.method, r.path) for r in self.server.requests
+                if r.method != 'GET']
+
+    def test_new_files_are_created(self):
+        report = self._sync()
+
+        self.assertEqual(['sub/more.tsv', 'words.csv'], report.created)
+        self.assertEqual(2, self._writes().count(('POST', 'decks')))
+        self.assertEqual(4, len(self._writes()))
+        manifest = load_manifest(os.path.join(self.directory,
+                                              MANIFEST_NAME))
+        self.assertEqual({'deck-1', 'deck-2'},
+                         {entry['deck_id'] for entry in manifest.values()})
+
+    def test_unchanged_tree_sends_no_requests(self):
+        self._sync()
+        sent = len(self.server.requests)
+
+        report = self._sync()
+
+        self.assertEqual(['sub/more.tsv', 'words.csv'],
+                         sorted(report.unchanged))
+        self.assertEqual(sent, len(self.server.requests))
+
+    def test_changed_file_is_updated(self):
+        self._sync()
+        deck_id = load_manifest(os.path.join(
+            self.directory, MANIFEST_NAME))['words.csv']['deck_id']
+        self._write('words.csv', 'front,back\ntree,Baum\ncat,Katze\n')
+        sent = len(self._writes())
+
+        report = self._sync()
+
+        self.assertEqual(['words.csv'], report.updated)
+        self.assertEqual([('PATCH', 'decks/' + deck_id)],
+                         self._writes()[sent:])
+        patch = self.server.requests_to('decks/' + deck_id)[-1].json()
+        self.assertIn('Katze', patch['cards'])
+        # Only the cards are replaced, the settings of the deck are kept.
+        self.assertEqual('Renamed', patch['name'])
+        self.assertEqual('Kept', patch['description'])
+        self.assertTrue(patch['private'])
+        self.assertTrue(patch['shareable'])
+        self.assertEqual('https://example.org/cover.png',
+                         patch['coverImageUrl'])
+
+    def test_decks_are_titled_after_relative_paths(self):
+        os.mkdir(os.path.join(self.directory, 'other'))
+        self._write('other/more.csv', 'front,back\ncat,Katze\n')
+
+        report = self._sync()
+
+        self.assertEqual(['other/more.csv', 'sub/more.tsv', 'words.csv'],
+                         report.created)
+        # New decks are sent as multipart forms.
+        bodies = b''.join(request.body for request in self.server.requests
+                          if (request.method, request.path)
+                          == ('POST', 'decks'))
+        self.assertIn(b'\r\n\r\nother/more\r\n', bodies)
+        self.assertIn(b'\r\n\r\nsub/more\r\n', bodies)
+
+    def test_colliding_titles_fail(self):
+        self._sync()
+        self._write('words.tsv', 'front\tback\ncat\tKatze\n')
+        sent = len(self._writes())
+
+        report = self._sync(orphans='delete')
+
+        self.assertEqual(['words.csv', 'words.tsv'], sorted(report.failed))
+        self.assertIsInstance(report.failed['words.tsv'], ValueError)
+        self.assertIn("'words'", str(report.failed['words.tsv']))
+        self.assertEqual([], report.deleted)
+        self.assertEqual([], self._writes()[sent:])
+
+    def test_orphans_are_skipped_or_deleted(self):
+        self._sync()
+        os.remove(os.path.join(self.directory, 'words.csv'))
+
+        report = self._sync()
+        self.assertEqual(['words.csv'], report.orphaned)
+        self.assertNotIn('DELETE', [method for method, _ in self._writes()])
+
+        report = self._sync(orphans='delete')
+        self.assertEqual(['words.csv'], report.deleted)
+        self.assertEqual(1, [m for m, _ in self._writes()].count('DELETE'))
+        self.assertEqual([], self._sync(orphans='delete').deleted)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,4 @@
-from tinycards.client import Tinycards
+from tinycards.client import AsyncTinycards, Tinycards
 from tinycards.model import Card, Deck
 
-__all__ = ['Card', 'Deck', 'Tinycards']
+__all__ = ['AsyncTinycards', 'Card', 'Deck', 'Tinycards']
@@ -1,4 +1,5 @@
+from .async_tinycards import AsyncTinycards
 from .tinycards import Tinycards
 
 
-__all__ = ['Tinycards']
+__all__ = ['AsyncTinycards', 'Tinycards']
@@ -0,0 +1,207 @@
+from tinycards.networking import AsyncRestApi
+
+
+class AsyncTinycards(object):
+    """The asyncio entry point to the Tinycards Python API.
+
+    Mirrors the Tinycards class, but all API methods are coroutines. Since
+    logging in requires a request, it happens when entering the client as an
+    async context manager or when awaiting `login()` explicitly.
+
+    Example:
+        >>> import tinycards
+        >>> async with tinycards.AsyncTinycards() as tinycards_api:
+        >>>     decks = await tinycards_api.get_decks()
+
+    Args:
+        identifier (str): The Tinycards identifier to use for logging in.
+            Will be taken from ENV if not specified:
+            .. envvar:: TINYCARDS_IDENTIFIER
+        password (str): The user's password to login to Tinycards.
+            Will be taken from ENV if not specified.
+            .. envvar:: TINYCARDS_PASSWORD
+        silent (bool): Does not output the 'Logged in as ...' message
+            when set to True. Defaults to False.
+        data_source (AsyncRestApi): Optional, pre-configured AsyncRestApi
+            instance to send all requests through.
+    """
+
+    def __init__(self,
+                 identifier=None,
+                 password=None,
+                 silent=False,
+                 data_source=None):
+        """Initialize a new instance of the AsyncTinycards class."""
+        self.data_source = data_source or AsyncRestApi()
+        self.user_id = None
+        self._credentials = (identifier, password, silent)
+
+    async def login(self):
+        """Log in with the credentials given on construction.
+
+        Returns:
+            int: The ID of the logged in user.
+
+        """
+        self.user_id = await self.data_source.login(*self._credentials)
+
+        return self.user_id
+
+    async def close(self):
+        """Release all network resources held by the client."""
+        await self.data_source.close()
+
+    async def __aenter__(self):
+        if self.user_id is None:
+            await self.login()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # --- Read user info.
+
+    async def get_user_info(self):
+        """Get info data about the currently logged in user."""
+        user_info = await self.data_source.get_user_info(self.user_id)
+
+        return user_info
+
+    # --- Get trends.
+
+    async def get_trends(self, types=None, limit=10, page=0,
+                         from_language='en'):
+        """Get Tinycards trends for the current user."""
+        if not types:
+            types = ['DECK', 'DECK_GROUP']
+
+        trendables = await self.data_source.get_trends(types, limit, page,
+                                                       from_language)
+
+        return trendables
+
+    def iter_trends(self, types=None, limit=10, from_language='en',
+                    start_page=0, max_items=None):
+        """Lazily iterate over Tinycards trends with `async for`."""
+        return self.data_source.iter_trends(types, limit, from_language,
+                                            start_page, max_items)
+
+    # --- Subscriptions
+
+    async def subscribe(self, user_id):
+        """Subscribe to the given user."""
+        added_subscription = await self.data_source.subscribe(user_id)
+
+        return added_subscription
+
+    async def unsubscribe(self, user_id):
+        """Unsubscribe the given user."""
+        removed_subscription = await self.data_source.unsubscribe(user_id)
+
+        return removed_subscription
+
+    # --- Deck CRUD
+
+    async def get_decks(self, include_cards=True, max_workers=None):
+        """Get all Decks for the currently logged in user."""
+        deck_previews = await self.data_source.get_decks(self.user_id,
+                                                         not include_cards,
+                                                         max_workers)
+
+        return deck_previews
+
+    async def get_deck(self, deck_id, include_cards=True):
+        """Get the Deck with the given ID."""
+        deck = await self.data_source.get_deck(deck_id, self.user_id,
+                                               include_cards)
+
+        return deck
+
+    async def find_deck_by_title(self, deck_title):
+        """Find an existing deck by its name if it exists.
+
+        Throws an exception if multiple decks with the same title exist.
+        """
+        all_decks = await self.get_decks(False)
+        found = [d for d in all_decks if d.title == deck_title]
+        if len(found) == 0:
+            return None
+        elif len(found) == 1:
+            return await self.get_deck(found[0].id)
+        else:
+            raise ValueError("Multiple decks with title '%s' found"
+                             % deck_title)
+
+    async def create_deck(self, deck):
+        """Create a new Deck for the currently logged in user."""
+        created_deck = await self.data_source.create_deck(deck)
+
+        return created_deck
+
+    async def update_deck(self, deck, refresh='full', force=False):
+        """Update an existing deck.
+
+        Pass refresh='local' to build the returned deck from the given deck's
+        cards instead of fetching it again. Unchanged decks are returned as
+        is, unless `force` is set to True.
+        """
+        updated_deck = await self.data_source.update_deck(deck, self.user_id,
+                                                          refresh, force)
+
+        return updated_deck
+
+    async def delete_deck(self, deck_id):
+        """Delete an existing deck."""
+        deleted_deck = await self.data_source.delete_deck(deck_id)
+
+        return deleted_deck
+
+    # --- Favorites CR(U)D
+
+    async def get_favorites(self, user_id=None):
+        """Get all favorites for the given user."""
+        if not user_id:
+            user_id = self.user_id
+
+        favorite_decks = await self.data_source.get_favorites(user_id)
+
+        return favorite_decks
+
+    async def add_favorite(self, deck_id):
+        """Add a deck to the current user's favorites."""
+        added_deck = await self.data_source.add_favorite(self.user_id,
+                                                         deck_id)
+
+        return added_deck
+
+    async def remove_favorite(self, favorite_id):
+        """Remove a deck from the current user's favorites."""
+        removed_favorite_id = await self.data_source.remove_favorite(
+            self.user_id, favorite_id)
+
+        return removed_favorite_id
+
+    # --- Search
+
+    async def search(self,
+                     query,
+                     use_fuzzy_search=True,
+                     types=None,
+                     limit=10,
+                     page=0):
+        """Searches for decks, deck groups, or users on Tinycards."""
+        trendables = await self.data_source.search(query, use_fuzzy_search,
+                                                   types, limit, page)
+
+        return trendables
+
+    def iter_search(self,
+                    query,
+                    use_fuzzy_search=True,
+                    types=None,
+                    limit=10,
+                    start_page=0,
+                    max_items=None):
+        """Lazily iterate over search results with `async for`."""
+        return self.data_source.iter_search(query, use_fuzzy_search, types,
+                                            limit, start_page, max_items)
@@ -5,6 +5,7 @@ from pathlib import Path
 import typer
 
 from tinycards.client import Tinycards
+from tinycards.client.sync import sync_directory
 from tinycards.model import Deck
 from tinycards.networking import RestApi
 
@@ -53,7 +54,9 @@ def logout():
 
 def _list_decks():
     api, user_id = _get_api_from_env()
-    decks = api.get_decks(user_id)
+    # Only titles are listed, so there is no need to fetch any cards.
+    with api:
+        decks = api.get_decks(user_id, no_cards=True)
     if decks:
         for d in decks:
             print(d.title)
@@ -74,5 +77,21 @@ def decks(action: str, deck_name: str = typer.Argument(None)):
         _create_deck(deck_name)
 
 
+@app.command()
+def sync(directory: Path, orphans: str = 'skip', workers: int = 4):
+    """Upload new and changed CSV/TSV files in DIRECTORY as decks."""
+    api, user_id = _get_api_from_env()
+    with api:
+        report = sync_directory(api, user_id, directory, orphans=orphans,
+                                max_workers=workers)
+    print(report)
+    for name, error in sorted(report.failed.items()):
+        print("Failed to sync %s: %s" % (name, error))
+    for name, import_report in sorted(report.bad_rows.items()):
+        print("%s: %s" % (name, import_report))
+    if report.failed:
+        sys.exit(1)
+
+
 if __name__ == '__main__':
     app()
@@ -0,0 +1,73 @@
+"""In-memory index to look up the IDs of decks by title, slug or compact ID."""
+import threading
+
+
+class DeckIndex(object):
+    """Maps the titles, slugs and compact IDs of decks to their IDs.
+
+    The index is built from a deck listing and kept up to date with `add()`
+    and `remove()` whenever decks are created, updated or deleted through
+    the same client. Changes made elsewhere (e.g. on the website) are only
+    picked up when the index is built again.
+
+    Args:
+        decks (list): Deck (previews) to build the index from.
+    """
+
+    def __init__(self, decks=()):
+        """Initialize a new instance of the DeckIndex class."""
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._by_title = {}
+        self._by_slug = {}
+        self._by_compact_id = {}
+        for deck in decks:
+            self.add(deck)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, deck_id):
+        return deck_id in self._keys
+
+    def _remove(self, deck_id):
+        title, slug, compact_id = self._keys.pop(deck_id)
+        ids = self._by_title[title]
+        ids.remove(deck_id)
+        if not ids:
+            del self._by_title[title]
+        if self._by_slug.get(slug) == deck_id:
+            del self._by_slug[slug]
+        if self._by_compact_id.get(compact_id) == deck_id:
+            del self._by_compact_id[compact_id]
+
+    def add(self, deck):
+        """Add a deck, or update the entry of a deck which changed."""
+        with self._lock:
+            if deck.id in self._keys:
+                self._remove(deck.id)
+            self._keys[deck.id] = (deck.title, deck.slug, deck.compact_id)
+            self._by_title.setdefault(deck.title, []).append(deck.id)
+            if deck.slug is not None:
+                self._by_slug[deck.slug] = deck.id
+            if deck.compact_id is not None:
+                self._by_compact_id[deck.compact_id] = deck.id
+
+    def remove(self, deck_id):
+        """Remove a deck from the index if it is part of it."""
+        with self._lock:
+            if deck_id in self._keys:
+                self._remove(deck_id)
+
+    def ids_by_title(self, title):
+        """Get the IDs of all decks with the given title."""
+        with self._lock:
+            return list(self._by_title.get(title, ()))
+
+    def id_by_slug(self, slug):
+        """Get the ID of the deck with the given slug, or None."""
+        return self._by_slug.get(slug)
+
+    def id_by_compact_id(self, compact_id):
+        """Get the ID of the deck with the given compact ID, or None."""
+        return self._by_compact_id.get(compact_id)
@@ -0,0 +1,97 @@
+"""Streaming export of cards to CSV and JSON Lines files."""
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import os
+from contextlib import contextmanager
+
+from tinycards.networking import json_codec
+
+CSV = 'csv'
+JSONL = 'jsonl'
+FORMATS = (CSV, JSONL)
+
+# Compression used for sink paths with these extensions.
+_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+
+@contextmanager
+def open_sink(sink):
+    """Open a path or file object for writing text.
+
+    Args:
+        sink: A path, a text file or a binary file (e.g. a `gzip.GzipFile`).
+            Paths ending in '.gz', '.bz2' or '.xz' are compressed
+            accordingly.
+    """
+    if isinstance(sink, (str, os.PathLike)):
+        opener = _OPENERS.get(os.path.splitext(os.fspath(sink))[1], open)
+        with opener(sink, 'wt', encoding='utf-8', newline='') as text_file:
+            yield text_file
+    elif isinstance(sink, io.TextIOBase):
+        yield sink
+    else:
+        text_file = io.TextIOWrapper(sink, encoding='utf-8', newline='')
+        try:
+            yield text_file
+        finally:
+            text_file.flush()
+            # Leave closing the binary file to the caller.
+            text_file.detach()
+
+
+def _fact_value(fact):
+    return fact.text if fact.text is not None else fact.image_url
+
+
+def side_text(side, concept_separator='\n'):
+    """Join the texts (or image URLs) of all concepts of a side."""
+    return concept_separator.join(_fact_value(c.fact) or ''
+                                  for c in side.concepts)
+
+
+def side_to_facts(side):
+    """Get the facts of all concepts of a side as a list of dicts."""
+    return [{'type': c.fact.type, 'text': c.fact.text,
+             'image_url': c.fact.image_url} for c in side.concepts]
+
+
+def write_cards(cards, sink, format=CSV, concept_separator='\n'):
+    """Write cards to a sink one at a time.
+
+    Args:
+        cards (iterable): The cards to write, e.g. a generator which yields
+            them while they are downloaded.
+        sink: A path or file object, see `open_sink`.
+        format (str): 'csv' for 'front' and 'back' columns as written by
+            `Deck.save_cards_to_csv`, or 'jsonl' for one JSON object with
+            the ID and all facts of both sides per line.
+        concept_separator (str): Joins the concepts of a side in CSV files.
+
+    Returns:
+        int: The number of cards written.
+    """
+    if format not in FORMATS:
+        raise ValueError("'format' must be one of %s" % ', '.join(FORMATS))
+
+    count = 0
+    with open_sink(sink) as text_file:
+        if format == CSV:
+            writer = csv.writer(text_file)
+            writer.writerow(['front', 'back'])
+            for card in cards:
+                writer.writerow([side_text(card.front, concept_separator),
+                                 side_text(card.back, concept_separator)])
+                count += 1
+        else:
+            for card in cards:
+                text_file.write(json_codec.dumps({
+                    'id': card.id,
+                    'front': side_to_facts(card.front),
+                    'back': side_to_facts(card.back),
+                }))
+                text_file.write('\n')
+                count += 1
+    return count
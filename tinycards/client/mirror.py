@@ -0,0 +1,258 @@
+"""Local SQLite copy of the decks, favorites and profile of an account."""
+import copy
+import pickle
+import sqlite3
+import threading
+
+from tinycards.model import LazyCardList
+from tinycards.networking.error import PartialResultError
+
+
+def _dumps(obj):
+    return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+def _content_text(side_content, concept_separator='\n'):
+    """Like `export.side_text`, for one side of a `Card.content()` tuple."""
+    return concept_separator.join(
+        (text if text is not None else image_url) or ''
+        for _, text, image_url in side_content)
+
+
+def _card_rows(deck):
+    """Get the rows of the 'cards' table without converting lazy cards."""
+    cards = deck.cards
+    if isinstance(cards, LazyCardList):
+        ids, contents = cards.ids(), cards.contents()
+    else:
+        ids = (card.id for card in cards)
+        contents = (card.content() for card in cards)
+    return [(deck.id, position, card_id, _content_text(front),
+             _content_text(back))
+            for position, (card_id, (front, back))
+            in enumerate(zip(ids, contents))]
+
+
+class DeckMirror(object):
+    """Keeps a local SQLite copy of an account.
+
+    `refresh()` lists the account's decks and only fetches those (with all
+    their cards) which are new or whose 'updatedAt' changed since the last
+    refresh. All read methods are answered from the local copy without any
+    network round trip.
+
+    Decks and their cards are pickled separately, so decks can be read
+    without their cards. Cards which have not been accessed are stored in
+    their raw form. Besides the pickled objects, the 'cards' table holds the
+    texts of all cards, so it can be queried with SQL through the
+    `connection` attribute.
+    Only point this at files written by this class: objects are stored
+    pickled.
+
+    Example:
+        >>> mirror = tinycards_api.mirror('account.sqlite')
+        >>> mirror.refresh()
+        >>> mirror.find_deck_by_title('French Words')
+
+    Args:
+        path (str): Path of the SQLite database file.
+        data_source (RestApi): The API used to refresh the mirror.
+        user_id (int): ID of the mirrored user.
+    """
+
+    def __init__(self, path, data_source, user_id):
+        """Initialize a new instance of the DeckMirror class."""
+        self.data_source = data_source
+        self.user_id = user_id
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.executescript(
+                'CREATE TABLE IF NOT EXISTS decks ('
+                ' id TEXT PRIMARY KEY,'
+                ' position INTEGER,'
+                ' title TEXT,'
+                ' slug TEXT,'
+                ' compact_id TEXT,'
+                ' updated_at TEXT,'
+                ' deck BLOB NOT NULL,'
+                ' cards BLOB);'
+                'CREATE INDEX IF NOT EXISTS decks_title ON decks (title);'
+                'CREATE TABLE IF NOT EXISTS cards ('
+                ' deck_id TEXT NOT NULL,'
+                ' position INTEGER NOT NULL,'
+                ' id TEXT,'
+                ' front TEXT,'
+                ' back TEXT,'
+                ' PRIMARY KEY (deck_id, position));'
+                'CREATE TABLE IF NOT EXISTS objects ('
+                ' name TEXT PRIMARY KEY,'
+                ' data BLOB NOT NULL);'
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Refresh
+
+    def _stored_versions(self):
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT id, updated_at FROM decks').fetchall()
+        return dict(rows)
+
+    def _store_deck(self, deck, position, updated_at):
+        cards = _card_rows(deck)
+        cards_data = _dumps(deck.cards)
+        without_cards = copy.copy(deck)
+        without_cards.cards = []
+        # Decks are marked clean again when they are loaded with cards.
+        without_cards.mark_clean()
+        data = _dumps(without_cards)
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO decks'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (deck.id, position, deck.title, deck.slug, deck.compact_id,
+                 updated_at, data, cards_data))
+            self.connection.execute('DELETE FROM cards WHERE deck_id = ?',
+                                    (deck.id,))
+            self.connection.executemany(
+                'INSERT INTO cards VALUES (?, ?, ?, ?, ?)', cards)
+
+    def _store_positions(self, positions):
+        with self._lock, self.connection:
+            self.connection.executemany(
+                'UPDATE decks SET position = ? WHERE id = ?',
+                [(position, deck_id)
+                 for deck_id, position in positions.items()])
+
+    def _delete_decks(self, deck_ids):
+        with self._lock, self.connection:
+            for deck_id in deck_ids:
+                self.connection.execute('DELETE FROM decks WHERE id = ?',
+                                        (deck_id,))
+                self.connection.execute(
+                    'DELETE FROM cards WHERE deck_id = ?', (deck_id,))
+
+    def _store_object(self, name, obj):
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO objects VALUES (?, ?)',
+                (name, _dumps(obj)))
+
+    def refresh(self, max_workers=None):
+        """Bring the mirror up to date with the account.
+
+        Decks whose 'updatedAt' did not change are kept as they are. Decks
+        without an 'updatedAt' value are always fetched again.
+
+        Args:
+            max_workers (int): Maximum number of decks to fetch concurrently.
+
+        Returns:
+            dict: The number of 'fetched', 'unchanged' and 'deleted' decks.
+
+        Raises:
+            PartialResultError: If some decks could not be fetched. All
+                other decks have been stored nevertheless.
+
+        """
+        previews = self.data_source.get_decks(self.user_id, no_cards=True)
+        versions = {d.id: (str(d.update_timestamp)
+                           if d.update_timestamp is not None else None)
+                    for d in previews}
+        positions = {d.id: position for position, d in enumerate(previews)}
+        stored = self._stored_versions()
+        changed = [deck_id for deck_id, version in versions.items()
+                   if version is None or stored.get(deck_id) != version]
+
+        error = None
+        try:
+            decks = self.data_source.get_decks_by_ids(changed, self.user_id,
+                                                      max_workers)
+        except PartialResultError as e:
+            decks, error = e.results, e
+        for deck in decks:
+            self._store_deck(deck, positions[deck.id], versions[deck.id])
+        # Keep the order of the account's decks, which might have changed
+        # for unchanged decks as well.
+        self._store_positions(positions)
+        deleted = [deck_id for deck_id in stored if deck_id not in versions]
+        self._delete_decks(deleted)
+
+        self._store_object('favorites',
+                           self.data_source.get_favorites(self.user_id))
+        self._store_object('user_info',
+                           self.data_source.get_user_info(self.user_id))
+        if error is not None:
+            raise error
+
+        return {'fetched': len(decks),
+                'unchanged': len(versions) - len(changed),
+                'deleted': len(deleted)}
+
+    # --- Read from the mirror
+
+    def _load_object(self, name):
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT data FROM objects WHERE name = ?', (name,)).fetchone()
+        return pickle.loads(row[0]) if row is not None else None
+
+    def _load_decks(self, where='', params=(), include_cards=True):
+        columns = 'deck, cards' if include_cards else 'deck, NULL'
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT ' + columns + ' FROM decks ' + where
+                + ' ORDER BY position', params).fetchall()
+        decks = []
+        for deck_data, cards_data in rows:
+            deck = pickle.loads(deck_data)
+            if include_cards:
+                deck.cards = pickle.loads(cards_data)
+                deck.mark_clean()
+            else:
+                deck.cards = []
+            decks.append(deck)
+        return decks
+
+    def get_user_info(self):
+        """Get the mirrored User object, or None before the first refresh."""
+        return self._load_object('user_info')
+
+    def get_favorites(self):
+        """Get the mirrored list of favorites."""
+        return self._load_object('favorites') or []
+
+    def get_decks(self, include_cards=True):
+        """Get all mirrored decks.
+
+        Args:
+            include_cards (bool): Only include the cards of the decks when
+                set to True (as by default). Otherwise, the cards are not
+                even read from the database.
+        """
+        return self._load_decks(include_cards=include_cards)
+
+    def get_deck(self, deck_id):
+        """Get the mirrored deck with the given ID, or None."""
+        decks = self._load_decks('WHERE id = ?', (deck_id,))
+        return decks[0] if decks else None
+
+    def find_deck_by_title(self, deck_title):
+        """Find a mirrored deck by its title.
+
+        Throws an exception if multiple decks with the same title exist.
+        """
+        found = self._load_decks('WHERE title = ?', (deck_title,))
+        if len(found) > 1:
+            raise ValueError("Multiple decks with title '%s' found"
+                             % deck_title)
+        return found[0] if found else None
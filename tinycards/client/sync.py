@@ -0,0 +1,234 @@
+"""Sync a directory of CSV and TSV files to the decks of an account."""
+import copy
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from tinycards.model import ColumnarCardList, Deck
+
+MANIFEST_NAME = '.tinycards-sync.json'
+MANIFEST_VERSION = 1
+
+# What to do with decks whose files have been removed.
+ORPHANS_SKIP = 'skip'
+ORPHANS_DELETE = 'delete'
+ORPHAN_POLICIES = (ORPHANS_SKIP, ORPHANS_DELETE)
+
+# Field delimiter per file extension.
+DELIMITERS = {'.csv': ',', '.tsv': '\t'}
+
+
+class SyncReport(object):
+    """Outcome of a directory sync.
+
+    All attributes are lists of file paths relative to the synced directory,
+    except `failed`, which maps paths to the exceptions raised for them, and
+    `bad_rows`, which maps paths to the CsvImportReport of files with
+    skipped rows.
+    """
+
+    def __init__(self):
+        """Initialize a new instance of the SyncReport class."""
+        self.created = []
+        self.updated = []
+        self.unchanged = []
+        self.deleted = []
+        self.orphaned = []
+        self.failed = {}
+        self.bad_rows = {}
+
+    def __str__(self):
+        return ('%d created, %d updated, %d unchanged, %d deleted,'
+                ' %d orphaned, %d failed'
+                % (len(self.created), len(self.updated),
+                   len(self.unchanged), len(self.deleted),
+                   len(self.orphaned), len(self.failed)))
+
+
+def file_hash(path):
+    """Get the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path):
+    """Load the deck entries of a manifest, or none if it does not exist.
+
+    Returns:
+        dict: Maps file paths (relative to the synced directory) to dicts
+            with the 'deck_id' and 'hash' of the last synced content.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError('Unsupported manifest version: %s'
+                         % manifest.get('version'))
+    return manifest['decks']
+
+
+def save_manifest(path, decks):
+    """Atomically write the deck entries of a manifest."""
+    temp_path = '%s.tmp' % path
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'decks': decks}, f,
+                  indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def deck_title(name):
+    """Get the title of the deck for a file path relative to the synced
+    directory, which is the path without its extension.
+    """
+    return Path(name).with_suffix('').as_posix()
+
+
+def _upload(data_source, user_id, path, title, deck_id):
+    """Create or update the deck for a file.
+
+    A new deck is titled `title`. An existing deck keeps its title and other
+    settings from the server and only gets its cards replaced.
+
+    Returns:
+        tuple: The ID of the deck and the CsvImportReport of the file.
+    """
+    cards_deck = Deck(title, cards=ColumnarCardList())
+    with open(path, 'r', encoding='utf-8', newline='') as csv_file:
+        import_report = cards_deck.add_cards_from_csv(
+            csv_file, delimiter=DELIMITERS[path.suffix.lower()])
+    if deck_id is None:
+        # Like examples/csv_to_deck.py, create an empty deck first and add
+        # the cards with an update.
+        deck = data_source.create_deck(Deck(title))
+        deck_id = deck.id
+    else:
+        try:
+            # Copy the deck, as it might be shared with the cache.
+            deck = copy.copy(data_source.get_deck(deck_id, user_id,
+                                                  include_cards=False))
+        except Exception as e:
+            e.deck_id = deck_id
+            raise
+    deck.cards = cards_deck.cards
+    try:
+        data_source.update_deck(deck, user_id, refresh='local', force=True)
+    except Exception as e:
+        # Let the caller remember the deck, so it is not created again.
+        e.deck_id = deck_id
+        raise
+    return deck_id, import_report
+
+
+def sync_directory(data_source, user_id, directory, manifest_path=None,
+                   orphans=ORPHANS_SKIP, max_workers=4):
+    """Upload new and changed CSV and TSV files of a directory as decks.
+
+    Every '.csv' and '.tsv' file below the directory is mapped to a deck
+    titled after its path without extension, e.g. 'verbs/irregular' for
+    'verbs/irregular.csv'. Files whose titles collide, like 'words.csv' and
+    'words.tsv', fail with a ValueError. Decks which already exist keep
+    their title, description, visibility and cover; only their cards are
+    replaced. A manifest stores the content hash and deck
+    ID of each synced file, so files which did not change since the last
+    sync are skipped without sending any request.
+
+    Args:
+        data_source (RestApi): The API to send requests through.
+        user_id (int): ID of the user owning the decks.
+        directory (str): The directory to sync.
+        manifest_path (str): Where to keep the manifest. Defaults to
+            '.tinycards-sync.json' inside the directory.
+        orphans (str): What to do with decks whose files have been removed:
+            'skip' (default) to leave them alone or 'delete' to delete them.
+        max_workers (int): Maximum number of decks uploaded concurrently.
+
+    Returns:
+        SyncReport: What has been done for each file.
+
+    """
+    if orphans not in ORPHAN_POLICIES:
+        raise ValueError("'orphans' must be one of %s"
+                         % ', '.join(ORPHAN_POLICIES))
+    directory = Path(directory)
+    if manifest_path is None:
+        manifest_path = directory / MANIFEST_NAME
+    manifest = load_manifest(manifest_path)
+    report = SyncReport()
+
+    files = {}
+    for path in sorted(directory.rglob('*')):
+        if path.suffix.lower() in DELIMITERS and path.is_file():
+            files[path.relative_to(directory).as_posix()] = path
+
+    names_by_title = {}
+    for name in files:
+        names_by_title.setdefault(deck_title(name), []).append(name)
+    for title, names in names_by_title.items():
+        if len(names) > 1:
+            for name in names:
+                report.failed[name] = ValueError(
+                    'Files %s would be synced to decks with the same title'
+                    " '%s'" % (', '.join(names), title))
+
+    changed = {}
+    for name, path in files.items():
+        if name in report.failed:
+            continue
+        content_hash = file_hash(path)
+        entry = manifest.get(name)
+        if entry is not None and entry['hash'] == content_hash:
+            report.unchanged.append(name)
+        else:
+            changed[name] = content_hash
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for name in changed:
+            entry = manifest.get(name)
+            deck_id = entry['deck_id'] if entry else None
+            future = executor.submit(_upload, data_source, user_id,
+                                     files[name], deck_title(name), deck_id)
+            futures[future] = name
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                deck_id, import_report = future.result()
+            except Exception as e:
+                report.failed[name] = e
+                if getattr(e, 'deck_id', None) and name not in manifest:
+                    # Created, but not filled: retry the update next time.
+                    manifest[name] = {'deck_id': e.deck_id, 'hash': None}
+                    save_manifest(manifest_path, manifest)
+                continue
+            (report.updated if name in manifest
+             else report.created).append(name)
+            if import_report.bad_row_count:
+                report.bad_rows[name] = import_report
+            manifest[name] = {'deck_id': deck_id, 'hash': changed[name]}
+            # Save progress right away so decks are never created twice.
+            save_manifest(manifest_path, manifest)
+
+    for name in sorted(set(manifest) - set(files)):
+        if orphans == ORPHANS_DELETE:
+            try:
+                data_source.delete_deck(manifest[name]['deck_id'])
+            except Exception as e:
+                report.failed[name] = e
+                continue
+            del manifest[name]
+            report.deleted.append(name)
+        else:
+            report.orphaned.append(name)
+
+    if report.deleted or not os.path.exists(manifest_path):
+        save_manifest(manifest_path, manifest)
+    report.created.sort()
+    report.updated.sort()
+    return report
@@ -1,5 +1,10 @@
 from tinycards.networking import RestApi
 
+from .deck_index import DeckIndex
+from .export import write_cards
+from .mirror import DeckMirror
+from .sync import sync_directory
+
 
 class Tinycards(object):
     """The entry point class to the Tinycards Python API.
@@ -18,15 +23,30 @@ class Tinycards(object):
             .. envvar:: TINYCARDS_PASSWORD
         silent (bool): Does not output the 'Logged in as ...' message
             when set to True. Defaults to False.
+        data_source (RestApi): Optional, pre-configured RestApi instance to
+            send all requests through (e.g., to tune its connection pool).
+            A default one is created if not specified.
     """
 
     def __init__(self,
                  identifier=None,
                  password=None,
-                 silent=False):
+                 silent=False,
+                 data_source=None):
         """Initialize a new instance of the Tinycards class."""
-        self.data_source = RestApi()
+        self.data_source = data_source or RestApi()
         self.user_id = self.data_source.login(identifier, password, silent)
+        self._deck_index = None
+
+    def close(self):
+        """Release all network resources held by the client."""
+        self.data_source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     # --- Read user info.
 
@@ -65,6 +85,32 @@ class Tinycards(object):
 
         return trendables
 
+    def iter_trends(self, types=None, limit=10, from_language='en',
+                    start_page=0, max_items=None):
+        """Lazily iterate over Tinycards trends, page by page.
+
+        While the trends of one page are consumed, the next page is already
+        fetched in the background. Iteration stops at the first empty page.
+
+        Example:
+            >>> for trendable in tinycards_api.iter_trends(max_items=500):
+            >>>     print(trendable.data.name)
+
+        Args:
+            types (list): What entities to retrieve.
+                Can be DECK, DECK_GROUP or USER.
+            limit: Number of results to fetch per page.
+            from_language: The language used for learning.
+            start_page: The first page to fetch (zero-indexed).
+            max_items: Maximum number of results to yield. Unlimited if not
+                specified.
+
+        Returns: A generator of Trendable objects.
+
+        """
+        return self.data_source.iter_trends(types, limit, from_language,
+                                            start_page, max_items)
+
     # --- Subscriptions
 
     def subscribe(self, user_id):
@@ -95,15 +141,27 @@ class Tinycards(object):
 
     # --- Deck CRUD
 
-    def get_decks(self, include_cards=True):
+    def get_decks(self, include_cards=True, max_workers=None):
         """Get all Decks for the currently logged in user.
 
+        Args:
+            include_cards (bool): Only include the cards of the decks when
+                set to True (as by default).
+            max_workers (int): Maximum number of decks to fetch concurrently
+                when including cards.
+
         Returns:
             list: The list of retrieved decks.
 
+        Raises:
+            PartialResultError: If some of the decks could not be retrieved.
+
         """
         deck_previews = self.data_source.get_decks(self.user_id,
-                                                   not include_cards)
+                                                   not include_cards,
+                                                   max_workers)
+        # A complete listing comes for free, so use it to rebuild the index.
+        self._deck_index = DeckIndex(deck_previews)
 
         return deck_previews
 
@@ -123,10 +181,119 @@ class Tinycards(object):
 
         return deck
 
+    def iter_deck_cards(self, deck_id):
+        """Lazily iterate over the cards of the Deck with the given ID.
+
+        Cards are yielded while the deck is still being downloaded, without
+        keeping the whole deck in memory.
+
+        Args:
+            deck_id (str): The ID of the deck whose cards to retrieve.
+
+        Yields:
+            Card: The cards of the deck, in order.
+
+        """
+        return self.data_source.iter_deck_cards(deck_id)
+
+    def export_deck(self, deck_id, sink, format='csv',
+                    concept_separator='\n'):
+        """Export the cards of a deck while it is downloaded.
+
+        Cards are written as soon as they have been decoded, so decks of any
+        size can be exported with constant memory.
+
+        Example:
+            >>> tinycards_api.export_deck(deck_id, 'cards.jsonl.gz', 'jsonl')
+
+        Args:
+            deck_id (str): The ID of the deck to export.
+            sink: Path or file object to write to. Paths ending in '.gz',
+                '.bz2' or '.xz' are compressed accordingly.
+            format (str): 'csv' for 'front' and 'back' columns, or 'jsonl'
+                for one JSON object with all facts of a card per line.
+            concept_separator (str): Joins the concepts of sides with more
+                than one concept in CSV files.
+
+        Returns:
+            int: The number of exported cards.
+
+        """
+        return write_cards(self.iter_deck_cards(deck_id), sink, format,
+                           concept_separator)
+
+    def sync_directory(self, directory, manifest_path=None, orphans='skip',
+                       max_workers=4):
+        """Upload new and changed CSV and TSV files of a directory as decks.
+
+        Files are mapped to decks titled after their paths without
+        extension. Existing decks keep their settings and only get their
+        cards replaced. Unchanged files are detected with a local manifest
+        and cause no requests at all.
+
+        Args:
+            directory (str): The directory to sync.
+            manifest_path (str): Where to keep the manifest. Defaults to
+                '.tinycards-sync.json' inside the directory.
+            orphans (str): What to do with decks whose files have been
+                removed: 'skip' (default) or 'delete'.
+            max_workers (int): Maximum number of decks uploaded concurrently.
+
+        Returns:
+            SyncReport: What has been done for each file.
+
+        """
+        try:
+            return sync_directory(self.data_source, self.user_id, directory,
+                                  manifest_path, orphans, max_workers)
+        finally:
+            # Decks have been created and deleted behind the index's back.
+            self._deck_index = None
+
+    def mirror(self, path):
+        """Open a local SQLite copy of the user's decks, cards and profile.
+
+        Call `refresh()` on the returned mirror to fetch the decks which
+        changed since the last refresh. Its read methods never send requests.
+
+        Args:
+            path (str): Path of the SQLite database file.
+
+        Returns:
+            DeckMirror: The mirror, which should be closed after use.
+
+        """
+        return DeckMirror(path, self.data_source, self.user_id)
+
+    @property
+    def deck_index(self):
+        """DeckIndex: Index of the user's decks by title, slug and compact ID.
+
+        Built from a deck listing on first use and kept up to date by
+        `create_deck()`, `update_deck()` and `delete_deck()`.
+        """
+        if self._deck_index is None:
+            self.get_decks(False)
+        return self._deck_index
+
+    def refresh_deck_index(self):
+        """Rebuild the deck index, e.g. after decks were changed elsewhere."""
+        self._deck_index = None
+        return self.deck_index
+
+    def _deck_id_by_title(self, deck_title):
+        deck_ids = self.deck_index.ids_by_title(deck_title)
+        if len(deck_ids) > 1:
+            raise ValueError("Multiple decks with title '%s' found"
+                             % deck_title)
+        return deck_ids[0] if deck_ids else None
+
     def find_deck_by_title(self, deck_title):
         """Find an existing deck by its name if it exists.
 
         Throws an exception if multiple decks with the same title exist.
+        Titles are looked up in the deck index, so only the first lookup
+        needs to list all decks.
 
         Args:
             deck_title (str): The title of the deck to retrieve.
@@ -135,15 +302,58 @@ class Tinycards(object):
             Deck: The retrieved deck if found. None otherwise.
 
         """
-        all_decks = self.get_decks(False)
-        found = [d for d in all_decks if d.title == deck_title]
-        if len(found) == 0:
+        deck_id = self._deck_id_by_title(deck_title)
+        if deck_id is None:
             return None
-        elif len(found) == 1:
-            return self.get_deck(found[0].id)
-        else:
-            raise ValueError("Multiple decks with title '%s' found"
-                             % deck_title)
+        return self.get_deck(deck_id)
+
+    def find_decks_by_titles(self, deck_titles, max_workers=None):
+        """Find several existing decks by their names at once.
+
+        Throws an exception if multiple decks with one of the titles exist.
+
+        Args:
+            deck_titles (list): The titles of the decks to retrieve.
+            max_workers (int): Maximum number of decks to fetch concurrently.
+
+        Returns:
+            dict: Maps each title to the retrieved Deck, or None if no deck
+                with this title exists.
+
+        Raises:
+            PartialResultError: If some of the decks could not be retrieved.
+
+        """
+        deck_ids = {title: self._deck_id_by_title(title)
+                    for title in deck_titles}
+        found = {deck_id for deck_id in deck_ids.values()
+                 if deck_id is not None}
+        decks = self.data_source.get_decks_by_ids(list(found), self.user_id,
+                                                  max_workers)
+        decks_by_id = {deck.id: deck for deck in decks}
+
+        return {title: decks_by_id.get(deck_id)
+                for title, deck_id in deck_ids.items()}
+
+    def find_deck_by_slug(self, slug):
+        """Find an existing deck by its slug.
+
+        Returns:
+            Deck: The retrieved deck if found. None otherwise.
+
+        """
+        deck_id = self.deck_index.id_by_slug(slug)
+        return self.get_deck(deck_id) if deck_id is not None else None
+
+    def find_deck_by_compact_id(self, compact_id):
+        """Find an existing deck by its compact ID.
+
+        Returns:
+            Deck: The retrieved deck if found. None otherwise.
+
+        """
+        deck_id = self.deck_index.id_by_compact_id(compact_id)
+        return self.get_deck(deck_id) if deck_id is not None else None
 
     def create_deck(self, deck):
         """Create a new Deck for the currently logged in user.
@@ -156,20 +366,36 @@ class Tinycards(object):
 
         """
         created_deck = self.data_source.create_deck(deck)
+        if self._deck_index is not None:
+            self._deck_index.add(created_deck)
 
         return created_deck
 
-    def update_deck(self, deck):
+    def update_deck(self, deck, refresh='full', force=False):
         """Update an existing deck.
 
+        Nothing is sent if the deck did not change since it was retrieved
+        (see `Deck.is_dirty()`), in which case it is returned as is.
+
         Args:
             deck (Deck): The Deck object to update.
+            refresh (str): How to build the returned deck:
+                - 'full' (default): Fetch the whole updated deck with an
+                    extra request.
+                - 'local': Take the cards from the given deck, which saves
+                    the extra request.
+                - 'lazy': Only fetch the cards once they are first accessed
+                    on the returned deck.
+            force (bool): Send the update even if the deck did not change.
 
         Returns:
             Deck: The updated Deck object if update was successful.
 
         """
-        updated_deck = self.data_source.update_deck(deck, self.user_id)
+        updated_deck = self.data_source.update_deck(deck, self.user_id,
+                                                    refresh, force)
+        if self._deck_index is not None:
+            self._deck_index.add(updated_deck)
 
         return updated_deck
 
@@ -184,6 +410,8 @@ class Tinycards(object):
 
         """
         deleted_deck = self.data_source.delete_deck(deck_id)
+        if self._deck_index is not None:
+            self._deck_index.remove(deck_id)
 
         return deleted_deck
 
@@ -261,3 +489,31 @@ class Tinycards(object):
                                              limit, page)
 
         return trendables
+
+    def iter_search(self,
+                    query,
+                    use_fuzzy_search=True,
+                    types=None,
+                    limit=10,
+                    start_page=0,
+                    max_items=None):
+        """Lazily iterate over search results, page by page.
+
+        While the results of one page are consumed, the next page is already
+        fetched in the background. Iteration stops at the first empty page.
+
+        Args:
+            query (str): The used search term(s).
+            use_fuzzy_search (bool): Whether or not to use fuzzy search.
+            types (list): What entity to search for. Can be DECK, DECK_GROUP
+                or USER.
+            limit: Number of results to fetch per page.
+            start_page: The first page to fetch (zero-indexed).
+            max_items: Maximum number of results to yield. Unlimited if not
+                specified.
+
+        Returns: A generator of Trendable objects.
+
+        """
+        return self.data_source.iter_search(query, use_fuzzy_search, types,
+                                            limit, start_page, max_items)
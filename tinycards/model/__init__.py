@@ -1,4 +1,6 @@
 from .card import Card
+from .card_list import ColumnarCardList, DeferredCardList
+from .card_list import LazyCardList
 from .concept import Concept
 from .deck import Deck
 from .fact import Fact
@@ -10,5 +12,6 @@ from .trendable_data import TrendableData
 from .user import User
 
 
-__all__ = ['Card', 'Concept', 'Deck', 'Fact', 'Favorite', 'SearchableData',
-           'Side', 'Trendable', 'TrendableData', 'User']
+__all__ = ['Card', 'ColumnarCardList', 'Concept', 'Deck', 'DeferredCardList',
+           'Fact', 'Favorite', 'LazyCardList', 'SearchableData', 'Side',
+           'Trendable', 'TrendableData', 'User']
@@ -1,9 +1,16 @@
+import os
+from itertools import islice
+from time import time
 from uuid import uuid4
 
+from .compact import public_attributes
 from .concept import Concept
 from .fact import Fact
 from .side import Side
 
+# Number of cards whose IDs are generated at once by `text_cards`.
+BATCH_SIZE = 1024
+
 
 def current_timestamp():
     """Get current time in milliseconds.
@@ -11,13 +18,72 @@ def current_timestamp():
     While Python usually works in seconds, JavaScript uses milliseconds and
     we want to be compatible.
     """
-    from time import time
     return int(time()) * 1000
 
 
+def random_hex_ids(count):
+    """Generate random version 4 UUIDs as 32 digit hex strings.
+
+    Reads the random bytes for all IDs at once, which is much faster than
+    calling `uuid4()` for each of them.
+    """
+    digits = os.urandom(16 * count).hex()
+    ids = []
+    for start in range(0, 32 * count, 32):
+        digits_id = digits[start:start + 32]
+        # Set the version (4) and variant (RFC 4122) bits like uuid4().
+        ids.append(digits_id[:12] + '4' + digits_id[13:16]
+                   + '89ab'[int(digits_id[16], 16) & 3] + digits_id[17:])
+    return ids
+
+
+def random_ids(count):
+    """Generate random version 4 UUIDs formatted like `str(uuid4())`."""
+    return ['%s-%s-%s-%s-%s' % (i[:8], i[8:12], i[12:16], i[16:20], i[20:])
+            for i in random_hex_ids(count)]
+
+
+def text_cards(pairs):
+    """Build cards with a single text fact per side in bulk.
+
+    Equivalent to calling `Card(front, back)` for each pair, but the IDs of
+    all entities are generated in batches and all cards of a batch share one
+    creation timestamp.
+
+    Args:
+        pairs (iterable): (front text, back text) tuples.
+
+    Yields:
+        Card: One card per pair, in order.
+    """
+    pairs = iter(pairs)
+    while True:
+        batch = list(islice(pairs, BATCH_SIZE))
+        if not batch:
+            return
+        now = time()
+        timestamp = int(now) * 1000
+        # Each card consists of 2 sides, 2 concepts and 2 facts.
+        ids = iter(random_ids(5 * len(batch)))
+        fact_ids = iter(random_hex_ids(2 * len(batch)))
+        for pair in batch:
+            if not isinstance(pair, tuple) or len(pair) != 2:
+                raise ValueError("Invalid card used as argument")
+            sides = []
+            for text in pair:
+                if not isinstance(text, str):
+                    raise ValueError("Card texts must be strings")
+                fact = Fact(text, fact_id=next(fact_ids), fact_type='TEXT')
+                concept = Concept(fact, next(ids), now, now)
+                sides.append(Side(next(ids), [concept]))
+            yield Card(sides[0], sides[1], next(ids), timestamp)
+
+
 class Card(object):
     """Data class for an Tinycards card entity."""
 
+    __slots__ = ('id', 'creation_timestamp', 'front', 'back')
+
     def __init__(self,
                  front,
                  back,
@@ -44,8 +110,18 @@ class Card(object):
         else:
             raise ValueError("Back property can only be of type Side")
 
+    def content(self):
+        """Get the facts of both sides as (type, text, image_url) tuples.
+
+        Returns:
+            tuple: One tuple per side, holding one tuple per concept.
+        """
+        return tuple(tuple((c.fact.type, c.fact.text, c.fact.image_url)
+                           for c in side.concepts)
+                     for side in (self.front, self.back))
+
     def __str__(self):
-        return str(self.__dict__)
+        return str(public_attributes(self))
 
     def __repr__(self):
         return self.__str__()
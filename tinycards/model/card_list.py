@@ -0,0 +1,389 @@
+import hashlib
+from array import array
+from collections.abc import MutableSequence
+
+from .card import Card, current_timestamp
+
+
+def contents_fingerprint(contents):
+    """Compute a hash over card contents, see `Card.content()`.
+
+    Returns:
+        str: The hex digest of the contents.
+
+    """
+    digest = hashlib.sha1()
+    for content in contents:
+        digest.update(repr(content).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class DeferredCardList(MutableSequence):
+    """A list of cards which is only loaded when it is first used.
+
+    Behaves like a regular list of cards. The first operation that needs the
+    cards (e.g. `len()`, indexing, iteration or `append()`) calls the loader
+    function once and keeps its result.
+    """
+
+    def __init__(self, load, fingerprint=None):
+        """Initialize a new instance of the DeferredCardList class.
+
+        Args:
+            load (callable): Function without arguments which returns the
+                list of cards.
+            fingerprint (str): Optional fingerprint of the cards to be
+                loaded, see `Deck.cards_fingerprint()`. Lets decks check
+                for changes without loading the cards.
+        """
+        self._load = load
+        self._cards = None
+        self.fingerprint = fingerprint
+
+    @property
+    def loaded(self):
+        """Whether the cards have been loaded yet."""
+        return self._cards is not None
+
+    def _materialize(self):
+        if self._cards is None:
+            self._cards = list(self._load())
+            self._load = None
+        return self._cards
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __setitem__(self, index, card):
+        self._materialize()[index] = card
+
+    def __delitem__(self, index):
+        del self._materialize()[index]
+
+    def __len__(self):
+        return len(self._materialize())
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def insert(self, index, card):
+        self._materialize().insert(index, card)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, MutableSequence)):
+            return self._materialize() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        if self._cards is None:
+            return '<cards not loaded yet>'
+        return repr(self._cards)
+
+
+class LazyCardList(MutableSequence):
+    """A list of cards which are converted from raw data on first access.
+
+    Behaves like a regular list of cards. Each raw card (e.g. a JSON dict) is
+    only converted into a Card object when it is first accessed, and then
+    kept. Slicing returns a plain list, like it does for lists.
+    """
+
+    def __init__(self, raw_cards, convert, content=None, card_id=None):
+        """Initialize a new instance of the LazyCardList class.
+
+        Args:
+            raw_cards (list): The raw data of the cards.
+            convert (callable): Function which converts the raw data of a
+                card into a Card object.
+            content (callable): Optional function which gets the same value
+                as `Card.content()` from the raw data of a card, without
+                converting it.
+            card_id (callable): Optional function which gets the ID of a
+                card from its raw data, without converting it.
+        """
+        self._raw = list(raw_cards)
+        self._cards = [None] * len(self._raw)
+        self._convert = convert
+        self._content = content
+        self._card_id = card_id
+        # Whether no card has been converted or changed yet.
+        self._unchanged = True
+        self._track = False
+        self._original_fingerprint = None
+
+    @property
+    def converted(self):
+        """The number of cards converted so far."""
+        return sum(1 for card in self._cards if card is not None)
+
+    @property
+    def unchanged(self):
+        """Whether no card has been converted or changed yet."""
+        return self._unchanged
+
+    @property
+    def original_fingerprint(self):
+        """str: Fingerprint of the cards as given, or None if it is unknown.
+
+        Only known while the list is unchanged or if `track_changes()` was
+        called before it changed.
+        """
+        if self._unchanged and self._content is not None:
+            return contents_fingerprint(self.contents())
+        return self._original_fingerprint
+
+    def track_changes(self):
+        """Keep the fingerprint of the cards as given once they change.
+
+        The fingerprint is only computed right before the first card is
+        converted or the list is changed, see `original_fingerprint`.
+
+        Returns:
+            bool: Whether changes are tracked. This requires a `content`
+                function and an unchanged list.
+
+        """
+        if self._content is None or not self._unchanged:
+            return False
+        self._track = True
+        return True
+
+    def _changing(self):
+        if self._unchanged:
+            if self._track:
+                self._original_fingerprint = contents_fingerprint(
+                    self.contents())
+            self._unchanged = False
+
+    def _card(self, index):
+        card = self._cards[index]
+        if card is None:
+            self._changing()
+            card = self._cards[index] = self._convert(self._raw[index])
+            self._raw[index] = None
+        return card
+
+    def _convert_all(self):
+        for index in range(len(self._cards)):
+            self._card(index)
+
+    def contents(self):
+        """Iterate over the content of all cards, see `Card.content()`.
+
+        Cards which have not been accessed yet are not converted if a
+        `content` function was given.
+        """
+        for index, card in enumerate(self._cards):
+            if card is None and self._content is not None:
+                yield self._content(self._raw[index])
+            else:
+                yield self._card(index).content()
+
+    def ids(self):
+        """Iterate over the IDs of all cards.
+
+        Cards which have not been accessed yet are not converted if a
+        `card_id` function was given.
+        """
+        for index, card in enumerate(self._cards):
+            if card is None and self._card_id is not None:
+                yield self._card_id(self._raw[index])
+            else:
+                yield self._card(index).id
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._card(i)
+                    for i in range(*index.indices(len(self._cards)))]
+        if index < 0:
+            index += len(self._cards)
+        if not 0 <= index < len(self._cards):
+            raise IndexError('card index out of range')
+        return self._card(index)
+
+    def __setitem__(self, index, card):
+        self._changing()
+        if isinstance(index, slice):
+            self._convert_all()
+            self._cards[index] = card
+            self._raw = [None] * len(self._cards)
+        else:
+            self._cards[index] = card
+            self._raw[index] = None
+
+    def __delitem__(self, index):
+        self._changing()
+        del self._cards[index]
+        del self._raw[index]
+
+    def __len__(self):
+        return len(self._cards)
+
+    def __iter__(self):
+        index = 0
+        while index < len(self._cards):
+            yield self._card(index)
+            index += 1
+
+    def insert(self, index, card):
+        self._changing()
+        self._cards.insert(index, card)
+        self._raw.insert(index, None)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, MutableSequence)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class ColumnarCardList(MutableSequence):
+    """A compact list of simple text cards, stored column by column.
+
+    Keeps the front texts, back texts, IDs and creation timestamps of the
+    cards in parallel arrays instead of one Card object graph per card.
+    Card objects are only built when a card is accessed, and then kept so
+    changes to them are not lost. Any Card can be added, but only cards with
+    a single TEXT fact per side are stored compactly.
+
+    Example:
+        >>> deck = Deck('Large Deck', cards=ColumnarCardList())
+        >>> deck.add_card(('front', 'back'))
+    """
+
+    def __init__(self, fronts=(), backs=(), card_ids=None, timestamps=None):
+        """Initialize a new instance of the ColumnarCardList class.
+
+        Args:
+            fronts (iterable): The front texts of the cards.
+            backs (iterable): The back texts of the cards, in the same order.
+            card_ids (iterable): Optional IDs of the cards. New IDs are
+                generated when cards are accessed if not specified.
+            timestamps (iterable): Optional creation timestamps of the cards
+                (in milliseconds). Defaults to the current time.
+        """
+        self._fronts = list(fronts)
+        self._backs = list(backs)
+        if len(self._fronts) != len(self._backs):
+            raise ValueError("'fronts' and 'backs' must have the same length")
+        size = len(self._fronts)
+        self._ids = list(card_ids) if card_ids is not None else [None] * size
+        self._timestamps = array('q', timestamps if timestamps is not None
+                                 else [current_timestamp()] * size)
+        self._cards = [None] * size
+        if len(self._ids) != size or len(self._timestamps) != size:
+            raise ValueError('All columns must have the same length')
+
+    @property
+    def materialized(self):
+        """The number of cards accessed as Card objects so far."""
+        return sum(1 for card in self._cards if card is not None)
+
+    def append_text(self, front, back, card_id=None, timestamp=None):
+        """Add a text card without building a Card object."""
+        self._fronts.append(front)
+        self._backs.append(back)
+        self._ids.append(card_id)
+        self._timestamps.append(timestamp or current_timestamp())
+        self._cards.append(None)
+
+    def rows(self):
+        """Iterate over all cards without building Card objects.
+
+        Yields:
+            tuple: (card, front, back, timestamp) per card, where `card` is
+                the Card object if the card has been accessed or added as
+                such, and None otherwise.
+        """
+        for row in zip(self._cards, self._fronts, self._backs,
+                       self._timestamps):
+            yield row
+
+    def contents(self):
+        """Iterate over the content of all cards, see `Card.content()`."""
+        for card, front, back, _ in self.rows():
+            if card is not None:
+                yield card.content()
+            else:
+                yield ((('TEXT', front, None),), (('TEXT', back, None),))
+
+    def copy(self):
+        """Get a shallow copy which shares the accessed Card objects."""
+        copied = ColumnarCardList()
+        copied._fronts = list(self._fronts)
+        copied._backs = list(self._backs)
+        copied._ids = list(self._ids)
+        copied._timestamps = array('q', self._timestamps)
+        copied._cards = list(self._cards)
+        return copied
+
+    def _card(self, index):
+        card = self._cards[index]
+        if card is None:
+            card = Card(self._fronts[index], self._backs[index],
+                        card_id=self._ids[index],
+                        creation_timestamp=self._timestamps[index])
+            self._cards[index] = card
+            # The Card object is authoritative from now on.
+            self._fronts[index] = self._backs[index] = self._ids[index] = None
+        return card
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._card(i)
+                    for i in range(*index.indices(len(self._cards)))]
+        if index < 0:
+            index += len(self._cards)
+        if not 0 <= index < len(self._cards):
+            raise IndexError('card index out of range')
+        return self._card(index)
+
+    def __setitem__(self, index, card):
+        if not isinstance(index, slice):
+            self._cards[index] = card
+            return
+        cards = list(card)
+        start, stop, step = index.indices(len(self._cards))
+        if step == 1:
+            del self[index]
+            for offset, new_card in enumerate(cards):
+                self.insert(start + offset, new_card)
+        else:
+            indices = range(start, stop, step)
+            if len(indices) != len(cards):
+                raise ValueError('attempt to assign sequence of size %d to'
+                                 ' extended slice of size %d'
+                                 % (len(cards), len(indices)))
+            for i, new_card in zip(indices, cards):
+                self._cards[i] = new_card
+
+    def __delitem__(self, index):
+        for column in (self._fronts, self._backs, self._ids,
+                       self._timestamps, self._cards):
+            del column[index]
+
+    def __len__(self):
+        return len(self._cards)
+
+    def __iter__(self):
+        index = 0
+        while index < len(self._cards):
+            yield self._card(index)
+            index += 1
+
+    def insert(self, index, card):
+        self._fronts.insert(index, None)
+        self._backs.insert(index, None)
+        self._ids.insert(index, None)
+        self._timestamps.insert(index, card.creation_timestamp or 0)
+        self._cards.insert(index, card)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, MutableSequence)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,28 @@
+"""Helpers for the memory-efficient, slotted model classes."""
+import sys
+
+
+def public_attributes(obj):
+    """Get the public attributes of a slotted object as a dict.
+
+    Serves as replacement for `obj.__dict__`, which slotted objects lack.
+    Attributes are ordered as declared in `__slots__`.
+    """
+    return {name: getattr(obj, name)
+            for cls in reversed(type(obj).__mro__)
+            for name in cls.__dict__.get('__slots__', ())
+            if not name.startswith('_') and hasattr(obj, name)}
+
+
+def intern_strings(value):
+    """Intern a string or all strings in a (nested) list, in place.
+
+    Used for values repeated across many objects, like language codes and
+    question types, so all objects share a single copy of each string.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        for index, item in enumerate(value):
+            value[index] = intern_strings(item)
+    return value
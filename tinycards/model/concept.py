@@ -1,10 +1,14 @@
 from time import time
 from uuid import uuid4
 
+from .compact import public_attributes
+
 
 class Concept(object):
     """Data class for an Tinycards concept entity."""
 
+    __slots__ = ('fact', 'id', 'creation_timestamp', 'update_timestamp')
+
     def __init__(self,
                  fact,
                  concept_id=None,
@@ -19,7 +23,7 @@ class Concept(object):
                                  else self.creation_timestamp)
 
     def __str__(self):
-        return str(self.__dict__)
+        return str(public_attributes(self))
 
     def __repr__(self):
         return self.__str__()
@@ -0,0 +1,164 @@
+"""Streaming import of word pairs from large CSV and TSV files."""
+import csv
+import io
+
+try:
+    import pyarrow
+    from pyarrow import csv as pyarrow_csv
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+# Supported readers: the standard library's csv module, the vectorized
+# pyarrow reader, or pyarrow if it is installed and csv otherwise.
+CSV = 'csv'
+PYARROW = 'pyarrow'
+AUTO = 'auto'
+ENGINES = (CSV, PYARROW, AUTO)
+
+# Bytes read at once by the pyarrow reader.
+PYARROW_BLOCK_SIZE = 1 << 20
+
+
+class CsvImportReport(object):
+    """Summary of a CSV import.
+
+    Attributes:
+        added (int): Number of cards added.
+        bad_row_count (int): Number of rows which were skipped.
+        bad_rows (list): (line number, reason) tuples for the first
+            `max_bad_rows` skipped rows. The line number is None if the
+            reader could not determine it.
+    """
+
+    def __init__(self, max_bad_rows=100):
+        """Initialize a new instance of the CsvImportReport class."""
+        self.max_bad_rows = max_bad_rows
+        self.added = 0
+        self.bad_row_count = 0
+        self.bad_rows = []
+
+    def add_bad_row(self, line_number, reason):
+        self.bad_row_count += 1
+        if len(self.bad_rows) < self.max_bad_rows:
+            self.bad_rows.append((line_number, reason))
+
+    def __str__(self):
+        return ('%d cards added, %d bad rows skipped'
+                % (self.added, self.bad_row_count))
+
+
+def _iter_csv(csv_file, front_column, back_column, delimiter, chunk_size,
+              report):
+    reader = csv.reader(csv_file, delimiter=delimiter)
+    header = next(reader, [])
+    for column in (front_column, back_column):
+        if column not in header:
+            raise ValueError("Column '%s' not found in CSV header" % column)
+    front_index = header.index(front_column)
+    back_index = header.index(back_column)
+    # Like csv.DictReader, extra or missing fields are only a problem if
+    # they lack the front or back.
+    num_fields = max(front_index, back_index) + 1
+
+    chunk = []
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            report.add_bad_row(reader.line_num, str(e))
+            continue
+        if not row:
+            continue
+        if len(row) < num_fields:
+            report.add_bad_row(reader.line_num,
+                               'expected %d fields, saw %d'
+                               % (num_fields, len(row)))
+            continue
+        chunk.append((row[front_index], row[back_index]))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _binary_source(csv_file):
+    """Get a binary file object to read CSV data from with pyarrow."""
+    if isinstance(csv_file, io.TextIOBase):
+        if not hasattr(csv_file, 'buffer'):
+            return None
+        return csv_file.buffer
+    return csv_file
+
+
+def _iter_pyarrow(source, front_column, back_column, delimiter, report):
+    def on_invalid_row(row):
+        report.add_bad_row(row.number, 'expected %d fields, saw %d'
+                           % (row.expected_columns, row.actual_columns))
+        return 'skip'
+
+    reader = pyarrow_csv.open_csv(
+        source,
+        read_options=pyarrow_csv.ReadOptions(block_size=PYARROW_BLOCK_SIZE),
+        parse_options=pyarrow_csv.ParseOptions(
+            delimiter=delimiter, invalid_row_handler=on_invalid_row),
+        convert_options=pyarrow_csv.ConvertOptions(
+            include_columns=[front_column, back_column],
+            column_types={front_column: pyarrow.string(),
+                          back_column: pyarrow.string()},
+            strings_can_be_null=False)
+    )
+    for batch in reader:
+        chunk = list(zip(batch.column(0).to_pylist(),
+                         batch.column(1).to_pylist()))
+        if chunk:
+            yield chunk
+
+
+def iter_csv_chunks(csv_file, report, front_column='front',
+                    back_column='back', delimiter=',', chunk_size=10000,
+                    engine=CSV):
+    """Read word pairs from a CSV file in chunks of bounded size.
+
+    Rows without a front or back field or with malformed quoting are
+    skipped and recorded in the report. Like with csv.DictReader, extra
+    fields are ignored and empty fronts and backs are kept. The pyarrow
+    engine cannot read rows whose number of fields differs from the
+    header's, so it skips and reports all of them.
+
+    Args:
+        csv_file: The file buffer that contains the CSV data.
+        report (CsvImportReport): Collects the number of added and skipped
+            rows.
+        front_column (str): Name of the 'front' column.
+        back_column (str): Name of the 'back' column.
+        delimiter (str): The field delimiter, e.g. '\\t' for TSV files.
+        chunk_size (int): Maximum number of word pairs per chunk for the csv
+            engine. The pyarrow engine reads blocks of a fixed number of
+            bytes instead.
+        engine (str): 'csv', 'pyarrow', or 'auto' to use pyarrow if it is
+            installed and the file gives access to its bytes.
+
+    Yields:
+        list: Chunks of (front, back) tuples.
+    """
+    if engine not in ENGINES:
+        raise ValueError("'engine' must be one of %s" % ', '.join(ENGINES))
+    source = _binary_source(csv_file) if engine != CSV else None
+    if engine == PYARROW:
+        if pyarrow is None:
+            raise ImportError("The 'pyarrow' engine requires pyarrow")
+        if source is None:
+            raise ValueError("The 'pyarrow' engine requires a binary file")
+
+    if engine != CSV and pyarrow is not None and source is not None:
+        chunks = _iter_pyarrow(source, front_column, back_column, delimiter,
+                               report)
+    else:
+        chunks = _iter_csv(csv_file, front_column, back_column, delimiter,
+                           chunk_size, report)
+    for chunk in chunks:
+        report.added += len(chunk)
+        yield chunk
@@ -1,6 +1,11 @@
 import csv
+import hashlib
 
-from .card import Card
+from .card import Card, text_cards
+from .card_list import (ColumnarCardList, DeferredCardList, LazyCardList,
+                        contents_fingerprint)
+from .compact import intern_strings, public_attributes
+from .csv_import import CsvImportReport, iter_csv_chunks
 
 
 NO_TYPING = [['ASSISTED_PRODUCTION', 'PRODUCTION'],
@@ -11,6 +16,13 @@ NO_TYPOS = ['NO_TYPOS', 'NO_TYPOS']
 class Deck(object):
     """Data class for an Tinycards deck entity."""
 
+    __slots__ = ('id', 'slug', 'compact_id', 'creation_timestamp',
+                 'update_timestamp', 'title', 'description', 'cards', 'cover',
+                 'cover_image_url', 'image_url', 'private', 'shareable',
+                 'shareable_link', 'blacklisted_side_indices',
+                 'blacklisted_question_types', 'grading_modes',
+                 'tts_languages', '_server_fingerprint')
+
     def __init__(self,
                  title,
                  description=None,
@@ -134,9 +146,11 @@ class Deck(object):
         self.compact_id = compact_id
 
         self.creation_timestamp = None
+        # Only set upon response from Tinycards' API.
+        self.update_timestamp = None
         self.title = title
         self.description = description
-        self.cards = cards if cards else []
+        self.cards = cards if cards is not None else []
         # Cover:
         self.cover = cover
         # Only set upon response from Tinycards' API.
@@ -151,43 +165,161 @@ class Deck(object):
                                and compact_id and slug else '')
         # Knowledge testing:
         self.blacklisted_side_indices = blacklisted_side_indices or []
-        self.blacklisted_question_types = blacklisted_question_types or []
-        self.grading_modes = grading_modes or []
-        self.tts_languages = tts_languages or []
+        self.blacklisted_question_types = intern_strings(
+            blacklisted_question_types or [])
+        self.grading_modes = intern_strings(grading_modes or [])
+        self.tts_languages = intern_strings(tts_languages or [])
+        # Fingerprint of the deck as last seen on the server, or the
+        # settings' fingerprint and the cards if they are hashed lazily.
+        self._server_fingerprint = None
 
     def __str__(self):
-        return str(self.__dict__)
+        return str(public_attributes(self))
 
     def __repr__(self):
         return self.__str__()
 
+    def fingerprint(self):
+        """Compute a hash over all content sent to Tinycards on update.
+
+        Covers the deck's settings, its cover and the facts of all sides of
+        its cards, but no IDs or timestamps.
+
+        Returns:
+            str: The hex digest of the deck's content.
+
+        """
+        fingerprints = self._settings_fingerprint() + self.cards_fingerprint()
+        return hashlib.sha1(fingerprints.encode('utf-8')).hexdigest()
+
+    def _settings_fingerprint(self):
+        settings = (self.title, self.description, self.private,
+                    self.shareable, self.cover, self.cover_image_url,
+                    self.blacklisted_side_indices,
+                    self.blacklisted_question_types, self.grading_modes,
+                    self.tts_languages)
+        return hashlib.sha1(repr(settings).encode('utf-8')).hexdigest()
+
+    def cards_fingerprint(self):
+        """Compute a hash over the facts of all sides of the deck's cards.
+
+        Cards which have not been loaded from the server yet are not loaded
+        if their fingerprint is known already (see `DeferredCardList`).
+
+        Returns:
+            str: The hex digest of the cards' content.
+
+        """
+        cards = self.cards
+        if isinstance(cards, DeferredCardList) and not cards.loaded \
+                and cards.fingerprint is not None:
+            return cards.fingerprint
+        if isinstance(cards, (ColumnarCardList, LazyCardList)):
+            # Avoid building cards which have not been accessed yet.
+            return contents_fingerprint(cards.contents())
+        return contents_fingerprint(card.content() for card in cards)
+
+    def mark_clean(self):
+        """Remember the current content as the one stored on the server.
+
+        Cards of a `LazyCardList` which have not been accessed yet are only
+        hashed once they are first accessed or changed.
+        """
+        cards = self.cards
+        if isinstance(cards, LazyCardList) and cards.track_changes():
+            self._server_fingerprint = (self._settings_fingerprint(), cards)
+        else:
+            self._server_fingerprint = self.fingerprint()
+
+    def is_dirty(self):
+        """Check whether the deck changed since it was last synced.
+
+        Returns:
+            bool: True if the deck has local changes or has never been
+                retrieved from the server, False otherwise.
+
+        """
+        server_fingerprint = self._server_fingerprint
+        if server_fingerprint is None:
+            return True
+        if isinstance(server_fingerprint, tuple):
+            settings_fingerprint, server_cards = server_fingerprint
+            if settings_fingerprint != self._settings_fingerprint():
+                return True
+            if server_cards is self.cards and server_cards.unchanged:
+                return False
+            return (server_cards.original_fingerprint
+                    != self.cards_fingerprint())
+        return server_fingerprint != self.fingerprint()
+
     def add_card(self, card):
         """Add a new card to the deck."""
         if isinstance(card, tuple) and len(card) == 2:
+            if isinstance(self.cards, ColumnarCardList) \
+                    and isinstance(card[0], str) and isinstance(card[1], str):
+                self.cards.append_text(card[0], card[1])
+                return
             new_card = Card(front=card[0], back=card[1])
         else:
             raise ValueError("Invalid card used as argument")
         self.cards.append(new_card)
 
+    def add_cards(self, pairs):
+        """Add many new text cards to the deck at once.
+
+        Much faster than calling `add_card()` for each card, see
+        `tinycards.model.card.text_cards`.
+
+        Args:
+            pairs (iterable): (front text, back text) tuples.
+
+        """
+        if isinstance(self.cards, ColumnarCardList):
+            for pair in pairs:
+                self.add_card(pair)
+        else:
+            self.cards.extend(text_cards(pairs))
+
     def add_cards_from_csv(self, csv_file,
                            front_column='front',
-                           back_column='back'):
+                           back_column='back',
+                           delimiter=',',
+                           chunk_size=10000,
+                           engine='csv',
+                           max_bad_rows=100):
         """Add word pairs from a CSV file as cards to the deck.
 
+        The file is streamed in chunks, so arbitrarily large files can be
+        imported (combine with a ColumnarCardList to keep the deck itself
+        small). Rows without a front or back field are skipped and reported
+        instead of aborting the import, see `iter_csv_chunks()`.
+
         Args:
             csv_file: The file buffer that contains the CSV data.
             front_column (str): Optional name for the 'front' column.
             back_column (str): Optional name for the 'back' column.
+            delimiter (str): The field delimiter, e.g. '\\t' for TSV files.
+            chunk_size (int): Number of rows to process at once.
+            engine (str): 'csv' (default) to use Python's csv module,
+                'pyarrow' to use the faster pyarrow reader, or 'auto' to use
+                pyarrow when it is installed.
+            max_bad_rows (int): Maximum number of skipped rows to list in
+                the returned report (all of them are counted).
+
+        Returns:
+            CsvImportReport: The number of added cards and the skipped rows.
 
         Example:
             >>> with open(csv_path, 'r') as csv_file:
-            >>>     deck.add_cards_from_csv(csv_file)
+            >>>     report = deck.add_cards_from_csv(csv_file)
 
         """
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            current_word_pair = (row[front_column], row[back_column])
-            self.add_card(current_word_pair)
+        report = CsvImportReport(max_bad_rows)
+        for pairs in iter_csv_chunks(csv_file, report, front_column,
+                                     back_column, delimiter, chunk_size,
+                                     engine):
+            self.add_cards(pairs)
+        return report
 
     def save_cards_to_csv(self, csv_file,
                           front_column='front',
@@ -209,8 +341,14 @@ class Deck(object):
         # Add header row first.
         csv_writer.writeheader()
         # Then add all cards as rows.
-        for card in self.cards:
-            front_word = card.front.concepts[0].fact.text
-            back_word = card.back.concepts[0].fact.text
+        if isinstance(self.cards, ColumnarCardList):
+            rows = ((card, front, back)
+                    for card, front, back, _ in self.cards.rows())
+        else:
+            rows = ((card, None, None) for card in self.cards)
+        for card, front_word, back_word in rows:
+            if card is not None:
+                front_word = card.front.concepts[0].fact.text
+                back_word = card.back.concepts[0].fact.text
             csv_writer.writerow({front_column: front_word,
                                  back_column: back_word})
@@ -1,21 +1,25 @@
 """."""
 from uuid import uuid4
 
+from .compact import intern_strings, public_attributes
+
 
 class Fact(object):
     """Data class for an Tinycards fact entity."""
 
+    __slots__ = ('id', 'text', 'type', 'image_url', 'tts_url')
+
     def __init__(self, text=None, fact_id=None, fact_type=None, image_url=None,
                  tts_url=None):
         """Initialize a new instance of the Fact class."""
         self.id = fact_id or str(uuid4()).replace('-', '')
         self.text = text
-        self.type = fact_type or 'TEXT'
+        self.type = intern_strings(fact_type or 'TEXT')
         self.image_url = image_url
         self.tts_url = tts_url
 
     def __str__(self):
-        return str(self.__dict__)
+        return str(public_attributes(self))
 
     def __repr__(self):
         return self.__str__()
@@ -1,6 +1,8 @@
 class Favorite(object):
     """A `Favorite` hold a `Deck` object along with some meta data."""
 
+    __slots__ = ('id', 'deck')
+
     def __init__(self, id_, deck):
         """Initialize a new instance of the `Favorite` class.
 
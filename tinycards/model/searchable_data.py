@@ -1,6 +1,8 @@
 class SearchableData(object):
     """The most important data fields of the Searchable class."""
 
+    __slots__ = ('id', 'name', 'description', 'average_freshness')
+
     def __init__(self,
                  id_,
                  name,
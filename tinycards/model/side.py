@@ -1,11 +1,14 @@
 from uuid import uuid4
 
+from .compact import public_attributes
 from .concept import Concept
 
 
 class Side(object):
     """"Data class for an Tinycards side entity."""
 
+    __slots__ = ('side_id', 'concepts')
+
     def __init__(self,
                  side_id=None,
                  concepts=None):
@@ -20,7 +23,7 @@ class Side(object):
                              or list of Concepts")
 
     def __str__(self):
-        return str(self.__dict__)
+        return str(public_attributes(self))
 
     def __repr__(self):
         return self.__str__()
@@ -1,6 +1,11 @@
+from .compact import intern_strings
+
+
 class Trendable(object):
     """Represents a trending object on Tinycards."""
 
+    __slots__ = ('id', 'type', 'data')
+
     def __init__(self, id_, type_, data):
         """Initialize a new instance of the Trendable class.
 
@@ -10,5 +15,5 @@ class Trendable(object):
             data: All data fields of the Trendable.
         """
         self.id = id_
-        self.type = type_
+        self.type = intern_strings(type_)
         self.data = data
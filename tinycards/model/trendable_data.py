@@ -1,5 +1,17 @@
+from .compact import intern_strings
+
+
 class TrendableData(object):
     """All data fields of the Trendable class."""
+
+    __slots__ = ('blacklisted_question_types', 'blacklisted_side_indices',
+                 'card_count', 'compact_id', 'cover_image_url', 'created_at',
+                 'deck_groups', 'description', 'enabled', 'favorite_count',
+                 'from_language', 'fullname', 'grading_modes', 'hashes', 'id',
+                 'image_url', 'name', 'picture', 'private', 'shareable',
+                 'slug', 'tag_ids', 'tts_languages', 'ui_language',
+                 'updated_at', 'user_id', 'username')
+
     def __init__(self,
                  blacklisted_question_types,
                  blacklisted_side_indices,
@@ -60,7 +72,8 @@ class TrendableData(object):
             user_id (int): User ID of the deck's creator.
             username (str): Duolingo user name of the deck's creator.
         """
-        self.blacklisted_question_types = blacklisted_question_types
+        self.blacklisted_question_types = intern_strings(
+            blacklisted_question_types)
         self.blacklisted_side_indices = blacklisted_side_indices
         self.card_count = card_count
         self.compact_id = compact_id
@@ -70,9 +83,9 @@ class TrendableData(object):
         self.description = description
         self.enabled = enabled
         self.favorite_count = favorite_count
-        self.from_language = from_language
+        self.from_language = intern_strings(from_language)
         self.fullname = fullname
-        self.grading_modes = grading_modes
+        self.grading_modes = intern_strings(grading_modes)
         self.hashes = hashes
         self.id = id_
         self.image_url = image_url
@@ -82,8 +95,8 @@ class TrendableData(object):
         self.shareable = shareable
         self.slug = slug
         self.tag_ids = tag_ids
-        self.tts_languages = tts_languages
-        self.ui_language = ui_language
+        self.tts_languages = intern_strings(tts_languages)
+        self.ui_language = intern_strings(ui_language)
         self.updated_at = updated_at
         self.user_id = user_id
         self.username = username
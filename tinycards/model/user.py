@@ -1,3 +1,6 @@
+from .compact import intern_strings
+
+
 class User(object):
     """Data class for a Tinycards user entity.
 
@@ -19,6 +22,11 @@ class User(object):
         username (str): The user's unique username used by Tinycards/Duolingo.
     """
 
+    __slots__ = ('creation_date', 'email', 'fullname', 'id',
+                 'learning_language', 'picture_url', 'subscribed',
+                 'subscriber_count', 'subscription_count', 'ui_language',
+                 'username')
+
     def __init__(self,
                  creation_date,
                  email,
@@ -36,10 +44,10 @@ class User(object):
         self.email = email
         self.fullname = fullname
         self.id = user_id
-        self.learning_language = learning_language
+        self.learning_language = intern_strings(learning_language)
         self.picture_url = picture_url
         self.subscribed = subscribed
         self.subscriber_count = subscriber_count
         self.subscription_count = subscription_count
-        self.ui_language = ui_language
+        self.ui_language = intern_strings(ui_language)
         self.username = username
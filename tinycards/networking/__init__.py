@@ -1,4 +1,15 @@
+from .async_rest_api import AsyncRestApi
+from .image_cache import ImageCache
+from .image_utils import CoverPreprocessor
+from .metrics import MetricsRegistry
+from .rate_limiter import RateLimiter, TokenBucket
+from .response_cache import (MemoryCacheBackend, ResponseCache,
+                             SqliteCacheBackend)
 from .rest_api import RestApi
+from .retry_policy import RetryPolicy
 
 
-__all__ = ['RestApi']
+__all__ = ['AsyncRestApi', 'CoverPreprocessor', 'ImageCache',
+           'MemoryCacheBackend', 'MetricsRegistry', 'RateLimiter',
+           'ResponseCache', 'RestApi', 'RetryPolicy', 'SqliteCacheBackend',
+           'TokenBucket']
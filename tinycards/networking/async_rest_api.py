@@ -0,0 +1,567 @@
+import asyncio
+import os
+from types import ModuleType
+from typing import Optional
+
+from tinycards.model.card_list import ColumnarCardList
+
+from . import json_codec, json_converter
+from .error import InvalidResponseError, PartialResultError
+from .form_utils import deck_payload, remember_cover_image_url
+from .image_utils import MAX_IMAGE_SIZE
+from .pagination import aiter_pages
+from .rest_api import (API_URL, DEFAULT_HEADERS, REFRESH_FULL,
+                       REFRESH_LOCAL, _should_retry_login)
+from .rate_limiter import family_of
+from .retry_policy import RetryPolicy, RetryStats, retry_delay
+
+aiohttp: Optional[ModuleType]
+try:
+    import aiohttp  # type: ignore[no-redef]
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncResponse(object):
+    """The fully read response to a request sent by AsyncRestApi.
+
+    Mimics the parts of `requests.Response` used by the API wrappers.
+    """
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.retries = 0
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json_codec.loads(self.content)
+
+
+class AsyncRestApi(object):
+    """Awaitable counterpart of the RestApi class.
+
+    Sends all requests through a single `aiohttp.ClientSession`, so many
+    operations can run concurrently on one event loop. Responses are
+    converted with the same `json_converter` functions and return the same
+    model objects as RestApi.
+
+    Requires the optional `aiohttp` dependency (`pip install
+    tinycards[async]`).
+
+    Args:
+        jwt (str): The JSON web token of an already logged in user.
+        api_url (str): Base URL of the Tinycards API.
+        limit (int): Maximum number of simultaneous connections.
+        limit_per_host (int): Maximum number of simultaneous connections to
+            the same host.
+        keep_alive (bool): Reuse connections between requests when set to
+            True (as by default).
+        headers (dict): Additional headers sent along with every request.
+        retry_policy (RetryPolicy): When and how often to retry requests
+            which failed with a transient error. See `RestApi`.
+        rate_limiter (RateLimiter): Optional client-side rate limits, which
+            can be shared with other instances (including RestApi ones).
+        image_cache (ImageCache): Optional on-disk cache for downloaded
+            cover images and the URLs of uploaded ones. See `RestApi`.
+        max_image_size (int): Maximum size of cover images downloaded from
+            URLs in bytes. Larger images are rejected with a ValueError.
+        cover_preprocessor (CoverPreprocessor): Optional step which
+            downscales and recompresses covers before they are uploaded.
+    """
+
+    def __init__(self,
+                 jwt=None,
+                 api_url=API_URL,
+                 limit=100,
+                 limit_per_host=10,
+                 keep_alive=True,
+                 headers=None,
+                 retry_policy=None,
+                 rate_limiter=None,
+                 image_cache=None,
+                 max_image_size=MAX_IMAGE_SIZE,
+                 cover_preprocessor=None):
+        """Initialize a new instance of the AsyncRestApi class."""
+        if aiohttp is None:
+            raise ImportError("AsyncRestApi requires aiohttp. Install it "
+                              "with 'pip install tinycards[async]'.")
+        self.api_url = api_url
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats(self.retry_policy)
+        self.rate_limiter = rate_limiter
+        self.image_cache = image_cache
+        self.max_image_size = max_image_size
+        self.cover_preprocessor = cover_preprocessor
+        # Digests of uploaded cover images mapped to their URLs.
+        self.cover_image_urls = {}
+        # JSON web token
+        self.jwt = jwt
+
+        # The session is bound to an event loop and therefore only created
+        # once the first request is sent.
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                force_close=not self.keep_alive
+            )
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  headers=self.headers)
+        return self._session
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _request(self, method, url, **kwargs):
+        """Send a request through the pooled session and read its body.
+
+        Transient failures are retried according to the retry policy. Every
+        attempt is subject to the rate limiter.
+        """
+        if self.jwt:
+            kwargs['cookies'] = {'jwt_token': self.jwt}
+        session = self._get_session()
+        family = family_of(method, url)
+        self.retry_stats.record_request()
+        attempt = 1
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(family)
+            try:
+                async with session.request(method, url, **kwargs) as r:
+                    content = await r.read()
+                    response = AsyncResponse(r.status, r.headers, content)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = retry_delay(self.retry_policy, self.retry_stats,
+                                    method, attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = retry_delay(self.retry_policy, self.retry_stats,
+                                    method, attempt, response.status_code,
+                                    response.headers.get('Retry-After'))
+                if delay is None:
+                    response.retries = attempt - 1
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def login(self,
+                    identifier=None,
+                    password=None,
+                    silent=False):
+        """Log in an user with its Tinycards or Duolingo credentials.
+
+        See `RestApi.login` for details.
+        """
+        # Take credentials from ENV if not specified.
+        identifier = identifier or os.environ.get('TINYCARDS_IDENTIFIER')
+        password = password or os.environ.get('TINYCARDS_PASSWORD')
+
+        request_payload = {
+            'identifier': identifier,
+            'password': password
+        }
+        # Retry like RestApi.login when Tinycards returns its generic error.
+        attempt = 1
+        while True:
+            try:
+                return await self._login(request_payload, silent)
+            except InvalidResponseError as e:
+                if attempt == 5 or not _should_retry_login(e):
+                    raise
+            attempt += 1
+            await asyncio.sleep(0.5)
+
+    async def _login(self, request_payload, silent):
+        r = await self._request('POST', self.api_url + 'login',
+                                json=request_payload)
+        json_response = json_codec.loads(r.content)
+
+        set_cookie_headers = {
+            k: v for (k, v) in
+            [c.split('=') for c in r.headers['set-cookie'].split('; ')]
+        }
+        self.jwt = set_cookie_headers.get('jwt_token')
+
+        user_id = json_response.get('id')
+        if user_id:
+            if not silent:
+                print("Logged in as '%s' (%s)"
+                      % (json_response['username'], json_response['email']))
+        else:
+            raise InvalidResponseError("Error while trying to log in:\n%s"
+                                       % json_response)
+
+        return user_id
+
+    # --- Read user info.
+
+    async def get_user_info(self, user_id):
+        """Get info data about the given user."""
+        request_url = self.api_url + 'users/' + str(user_id)
+        r = await self._request('GET', request_url)
+
+        if r.status_code != 200:
+            raise ValueError(r.text)
+
+        json_response = json_codec.loads(r.content)
+        user_info = json_converter.json_to_user(json_response)
+
+        return user_info
+
+    # --- Get trends.
+
+    async def get_trends(self, types=None, limit=10, page=0,
+                         from_language='en'):
+        """Get Tinycards trends for the current user.
+
+        See `RestApi.get_trends` for details.
+        """
+        if not types:
+            types = ['DECK', 'DECK_GROUP']
+
+        request_url = self.api_url + 'trendables'
+        params = {'types': ','.join(types),
+                  'limit': limit,
+                  'page': page,
+                  'fromLanguage': from_language}
+        r = await self._request('GET', request_url, params=params)
+
+        if r.status_code != 200:
+            raise ValueError(r.text)
+
+        json_response = json_codec.loads(r.content)
+        json_trendables_list = json_response['trendables']
+        trendables = [json_converter.json_to_trendable(trendable)
+                      for trendable in json_trendables_list]
+
+        return trendables
+
+    def iter_trends(self, types=None, limit=10, from_language='en',
+                    start_page=0, max_items=None):
+        """Lazily iterate over Tinycards trends with `async for`.
+
+        See `RestApi.iter_trends` for details.
+        """
+        return aiter_pages(
+            lambda page: self.get_trends(types, limit, page, from_language),
+            start_page, max_items
+        )
+
+    # --- Subscriptions
+
+    async def subscribe(self, user_id):
+        """Subscribe to the given user."""
+        request_url = (self.api_url + 'users/' + str(user_id)
+                       + '/subscriptions')
+        r = await self._request('POST', request_url)
+
+        json_response = json_codec.loads(r.content)
+        added_subscription = json_response['addedSubscription']
+
+        return added_subscription
+
+    async def unsubscribe(self, user_id):
+        """Unsubscribe the given user."""
+        request_url = (self.api_url + 'users/' + str(user_id)
+                       + '/subscriptions')
+        r = await self._request('DELETE', request_url)
+
+        json_response = json_codec.loads(r.content)
+        removed_subscription = json_response['removedSubscription']
+
+        return removed_subscription
+
+    # --- Deck CRUD
+
+    async def get_decks(self, user_id, no_cards=False, max_workers=None):
+        """Get all Decks for the currently logged in user.
+
+        See `RestApi.get_decks` for details.
+        """
+        request_url = self.api_url + 'decks'
+        r = await self._request('GET', request_url,
+                                params={'userId': user_id})
+
+        if r.status_code != 200:
+            raise ValueError(r.text)
+
+        json_response = json_codec.loads(r.content)
+        decks = []
+        for d in json_response['decks']:
+            current_deck = json_converter.json_to_deck(d)
+            decks.append(current_deck)
+
+        if no_cards:
+            return decks
+        else:
+            return await self.get_decks_by_ids([d.id for d in decks],
+                                               user_id, max_workers)
+
+    async def get_decks_by_ids(self, deck_ids, user_id, max_workers=None):
+        """Get the Decks with the given IDs concurrently.
+
+        See `RestApi.get_decks_by_ids` for details.
+        """
+        semaphore = asyncio.Semaphore(max_workers or self.limit_per_host)
+
+        async def fetch(deck_id):
+            async with semaphore:
+                return await self.get_deck(deck_id, user_id)
+
+        results = await asyncio.gather(*[fetch(deck_id)
+                                         for deck_id in deck_ids],
+                                       return_exceptions=True)
+
+        decks = [r for r in results if not isinstance(r, Exception)]
+        failures = {deck_id: r for deck_id, r in zip(deck_ids, results)
+                    if isinstance(r, Exception)}
+        if failures:
+            raise PartialResultError("Failed to retrieve %d of %d decks"
+                                     % (len(failures), len(deck_ids)),
+                                     decks, failures)
+
+        return decks
+
+    async def get_deck(self, deck_id, user_id, include_cards=True):
+        """Get the Deck with the given ID.
+
+        See `RestApi.get_deck` for details.
+        """
+        request_url = self.api_url + 'decks/' + deck_id
+        params = {'expand': 'true'} if include_cards else None
+        r = await self._request('GET', request_url, params=params)
+
+        if r.status_code != 200:
+            raise ValueError(r.text)
+
+        json_response = json_codec.loads(r.content)
+        deck = json_converter.json_to_deck(json_response)
+        # Set additional properties.
+        deck.id = deck_id
+
+        return deck
+
+    def _encode_deck(self, deck, multipart):
+        """Encode a deck like `deck_payload`, reading its cover completely.
+
+        Opening, downloading and preprocessing the cover blocks, so this is
+        run in the loop's default executor rather than on the event loop.
+
+        Returns:
+            tuple: The payload as bytes, its content type, and the
+                CoverImage being uploaded (or None).
+
+        """
+        with deck_payload(deck, multipart, self.image_cache,
+                          self.cover_image_urls,
+                          self.max_image_size,
+                          self.cover_preprocessor) as payload:
+            request_payload, content_type, cover = payload
+            if not isinstance(request_payload, bytes):
+                request_payload = request_payload.to_string()
+            return request_payload, content_type, cover
+
+    async def _deck_payload(self, deck, multipart):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._encode_deck, deck,
+                                          multipart)
+
+    async def create_deck(self, deck):
+        """Create a new Deck for the currently logged in user."""
+        request_payload, content_type, cover = await self._deck_payload(
+            deck, True)
+        r = await self._request('POST', self.api_url + 'decks',
+                                data=request_payload,
+                                headers={'Content-Type': content_type})
+
+        json_data = json_codec.loads(r.content)
+        created_deck = json_converter.json_to_deck(json_data)
+        remember_cover_image_url(cover, created_deck, self.image_cache,
+                                 self.cover_image_urls)
+
+        return created_deck
+
+    async def update_deck(self, deck, user_id, refresh=REFRESH_FULL,
+                          force=False):
+        """Update an existing deck.
+
+        See `RestApi.update_deck` for details. Only the 'full' and 'local'
+        refresh modes are supported, since cards cannot be fetched lazily
+        without awaiting.
+        """
+        if refresh not in (REFRESH_FULL, REFRESH_LOCAL):
+            raise ValueError("'refresh' must be one of %s, %s"
+                             % (REFRESH_FULL, REFRESH_LOCAL))
+        if not force and not deck.is_dirty():
+            return deck
+
+        # A new cover which has not been uploaded yet is sent as part of a
+        # multipart-form. Otherwise, the PATCH request is sent as JSON.
+        request_payload, content_type, cover = await self._deck_payload(
+            deck, False)
+        r = await self._request('PATCH', self.api_url + 'decks/' + deck.id,
+                                data=request_payload,
+                                headers={'Content-Type': content_type})
+
+        if not r.ok:
+            raise Exception('Failure while sending updates to server: %s'
+                            % r.text)
+        # The server now stores the deck as it was sent.
+        deck.mark_clean()
+
+        if refresh == REFRESH_FULL:
+            # The response from the PATCH request does not contain cards.
+            # Therefore, we have to query the updated deck with an extra
+            # request.
+            updated_deck = await self.get_deck(deck.id, user_id)
+            remember_cover_image_url(cover, updated_deck, self.image_cache,
+                                     self.cover_image_urls)
+            return updated_deck
+
+        updated_deck = json_converter.json_to_deck(
+            json_codec.loads(r.content))
+        remember_cover_image_url(cover, updated_deck, self.image_cache,
+                                 self.cover_image_urls)
+        updated_deck.id = deck.id
+        updated_deck.cards = (deck.cards.copy()
+                              if isinstance(deck.cards, ColumnarCardList)
+                              else list(deck.cards))
+        updated_deck.mark_clean()
+
+        return updated_deck
+
+    async def delete_deck(self, deck_id):
+        """Delete an existing deck."""
+        if not isinstance(deck_id, str):
+            raise ValueError("'deck_id' parameter must be of type str")
+
+        r = await self._request('DELETE', self.api_url + 'decks/' + deck_id)
+
+        json_data = json_codec.loads(r.content)
+        deleted_deck = json_converter.json_to_deck(json_data)
+
+        return deleted_deck
+
+    # --- Favorites CR(U)D
+
+    async def get_favorites(self, user_id):
+        """Get all favorites for the given user."""
+        request_url = self.api_url + 'users/%d/favorites' % user_id
+        r = await self._request('GET', request_url)
+
+        if r.status_code != 200:
+            raise ValueError(r.text)
+
+        json_response = json_codec.loads(r.content)
+        json_favorite_decks = [fav for fav in json_response['favorites']
+                               if 'deck' in fav]
+        favorites = []
+        try:
+            for fav in json_favorite_decks:
+                current_favorite = json_converter.json_to_favorite(fav)
+                favorites.append(current_favorite)
+        except KeyError as ke:
+            raise Exception("Unexpected JSON format:\n%s" % ke)
+
+        return favorites
+
+    async def add_favorite(self, user_id, deck_id):
+        """Add a deck to the current user's favorites."""
+        request_url = self.api_url + 'users/%d/favorites' % user_id
+        request_payload = {'deckId': deck_id}
+        r = await self._request('POST', request_url, json=request_payload)
+
+        json_response = json_codec.loads(r.content)
+        added_favorite = json_converter.json_to_favorite(json_response)
+
+        return added_favorite
+
+    async def remove_favorite(self, user_id, favorite_id):
+        """Remove a deck from the current user's favorites."""
+        request_url = (self.api_url
+                       + 'users/%d/favorites/%s' % (user_id, favorite_id))
+        r = await self._request('DELETE', request_url)
+
+        json_response = json_codec.loads(r.content)
+        removed_favorite_id = json_response['removedFavoriteId']
+
+        return removed_favorite_id
+
+    # --- Search
+
+    async def search(self,
+                     query,
+                     use_fuzzy_search=True,
+                     types=None,
+                     limit=10,
+                     page=0):
+        """Searches for decks, deck groups, or users on Tinycards.
+
+        See `RestApi.search` for details.
+        """
+        if not types:
+            types = ['DECK', 'DECK_GROUP']
+
+        request_url = self.api_url + 'searchables'
+        params = {'query': query,
+                  'useFuzzySearch': str(use_fuzzy_search),
+                  'types': ','.join(types),
+                  'limit': limit,
+                  'page': page}
+        r = await self._request('GET', request_url, params=params)
+
+        if r.status_code != 200:
+            raise ValueError(r.text)
+
+        json_response = json_codec.loads(r.content)
+        json_searchables_list = json_response['searchables']
+        searchables = [json_converter.json_to_searchable(searchable)
+                       for searchable in json_searchables_list]
+
+        return searchables
+
+    def iter_search(self,
+                    query,
+                    use_fuzzy_search=True,
+                    types=None,
+                    limit=10,
+                    start_page=0,
+                    max_items=None):
+        """Lazily iterate over search results with `async for`.
+
+        See `RestApi.iter_search` for details.
+        """
+        return aiter_pages(
+            lambda page: self.search(query, use_fuzzy_search, types, limit,
+                                     page),
+            start_page, max_items
+        )
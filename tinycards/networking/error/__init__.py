@@ -1,4 +1,5 @@
 from .invalid_response import InvalidResponseError
+from .partial_result import PartialResultError
 
 
-__all__ = ['InvalidResponseError']
+__all__ = ['InvalidResponseError', 'PartialResultError']
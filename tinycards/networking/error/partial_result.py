@@ -0,0 +1,14 @@
+class PartialResultError(Exception):
+    """Raised when only some items of a batch operation could be retrieved.
+
+    Args:
+        results (list): The successfully retrieved items, in the original
+            order of the batch.
+        failures (dict): The exception raised for each failed item, keyed by
+            the item's ID.
+    """
+
+    def __init__(self, message, results, failures):
+        super(PartialResultError, self).__init__(message)
+        self.results = results
+        self.failures = failures
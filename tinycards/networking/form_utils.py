@@ -1,11 +1,15 @@
-import json
 import os
+from contextlib import contextmanager
+
 from requests_toolbelt.multipart.encoder import MultipartEncoder
-from .image_utils import get_image, mime_type_from_path
+from . import json_codec, json_converter
+from .image_cache import file_digest
+from .image_utils import MAX_IMAGE_SIZE, get_image, mime_type_from_path
 
 
 CARDS = 'cards'
 IMAGE_FILE = 'imageFile'
+COVER_IMAGE_URL = 'coverImageUrl'
 BLACKLISTED_QUESTION_TYPES = 'blacklistedQuestionTypes'
 GRADING_MODES = 'gradingModes'
 TTS_LANGUAGES = 'ttsLanguages'
@@ -16,39 +20,186 @@ JSON_KEYS = set([CARDS, BLACKLISTED_QUESTION_TYPES, GRADING_MODES,
 SPECIAL_KEYS = set([IMAGE_FILE]).union(JSON_KEYS)
 
 
-def to_multipart_form(data, boundary=None):
-    """Create a multipart form like produced by HTML forms from a dict."""
+class CoverImage(object):
+    """An opened cover image, ready to be uploaded.
+
+    Args:
+        file: Binary file object with the image's content.
+        mime_type (str): The image's MIME type.
+        digest (str): SHA-256 hex digest of the image's content.
+    """
+
+    def __init__(self, file, mime_type, digest):
+        """Initialize a new instance of the CoverImage class."""
+        self.file = file
+        self.mime_type = mime_type
+        self.digest = digest
+
+
+class _UploadFile(object):
+    """Read-only view of a binary file for MultipartEncoder.
+
+    MultipartEncoder copies objects with a `getvalue()` method (like BytesIO)
+    and calls `fileno()` on others to determine their size, which moves a
+    SpooledTemporaryFile to disk. This view only exposes `read()` and the
+    number of bytes left, so any file is streamed as it is.
+    """
+
+    def __init__(self, file):
+        self._file = file
+        start = file.tell()
+        self._end = file.seek(0, 2)
+        file.seek(start)
+
+    @property
+    def len(self):
+        return self._end - self._file.tell()
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+
+def to_multipart_form(data, boundary=None, cover=None):
+    """Create a multipart form like produced by HTML forms from a dict.
+
+    Args:
+        data (dict): The form fields.
+        boundary (str): Boundary between the form fields.
+        cover (CoverImage): The image to send as image file, if any (see
+            `open_cover()`). A path or URL in the data is not sent.
+    """
     fields = {}
     for k, v in data.items():
         if k not in SPECIAL_KEYS:
             fields[k] = str(v) if not isinstance(v, bool) else str(v).lower()
         if k in JSON_KEYS:
-            fields[k] = json.dumps(data[k])
-    if _has_image_file(data):
-        fields[IMAGE_FILE] = _get_image(data[IMAGE_FILE])
+            fields[k] = json_codec.dumps(data[k])
+    if cover is not None:
+        fields[IMAGE_FILE] = (_FILENAME, _UploadFile(cover.file),
+                              cover.mime_type)
     return MultipartEncoder(fields=fields, boundary=boundary)
 
 
-def _has_image_file(data):
-    return IMAGE_FILE in data and data[IMAGE_FILE]
-
-
 # The name seems irrelevant to Tinycards as it isn't used anywhere, doesn't
 # appear in the URL, and is always this regardless of the type of the image.
 _FILENAME = 'cover.jpg'
 
 
-def _get_image(path_or_url):
-    '''
-    Returns a tuple (filename, file, MIME type) compliant with
-        requests_toolbelt's MultipartEncoder.
-    See also: https://toolbelt.readthedocs.io/en/latest/uploading-data.html#uploading-data  # noqa
-    '''
+@contextmanager
+def open_cover(path_or_url, image_cache=None, max_size=MAX_IMAGE_SIZE):
+    """Open a cover image from a local path or URL.
+
+    The image is closed again when the context is left.
+
+    Args:
+        path_or_url (str): Local path or URL of the image.
+        image_cache (ImageCache): Where to look up and store downloaded
+            images. Images are downloaded on each call if not specified.
+        max_size (int): Maximum size of downloaded images in bytes.
+
+    Yields:
+        CoverImage: The opened image.
+
+    """
     if os.path.exists(path_or_url):
         mime_type = mime_type_from_path(path_or_url)
-        return (_FILENAME, open(path_or_url, 'rb'), mime_type)
+        with open(path_or_url, 'rb') as img:
+            yield CoverImage(img, mime_type, file_digest(img))
     elif path_or_url.startswith('http'):
-        img, mime_type = get_image(path_or_url)
-        return (_FILENAME, img, mime_type)
+        cached = image_cache.open(path_or_url) if image_cache else None
+        if cached is not None:
+            img, mime_type, digest = cached
+            with img:
+                yield CoverImage(img, mime_type, digest)
+            return
+        img, mime_type = get_image(path_or_url, max_size)
+        with img:
+            if image_cache is not None:
+                digest = image_cache.put(img, mime_type, path_or_url)
+            else:
+                digest = file_digest(img)
+            yield CoverImage(img, mime_type, digest)
     else:
         raise ValueError('Unknown image: %s' % path_or_url)
+
+
+@contextmanager
+def deck_payload(deck, multipart, image_cache=None, cover_image_urls=None,
+                 max_image_size=MAX_IMAGE_SIZE, preprocessor=None):
+    """Encode a deck for a create or update request.
+
+    A new cover set on the deck is uploaded as image file, unless an image
+    with the same content has been uploaded before. Then the URL of the
+    uploaded image is sent instead. Images are recognized by their original
+    content, before they are preprocessed.
+
+    Args:
+        deck (Deck): The deck to encode.
+        multipart (bool): Always encode the deck as multipart form when set
+            to True. Otherwise, only decks with a cover to upload are.
+        image_cache (ImageCache): Where to look up downloaded images and
+            the URLs of uploaded ones.
+        cover_image_urls (dict): Maps the digests of uploaded images to
+            their cover image URLs.
+        max_image_size (int): Maximum size of downloaded covers in bytes.
+        preprocessor (CoverPreprocessor): Downscales covers before they are
+            uploaded, if specified.
+
+    Yields:
+        tuple: The payload (a MultipartEncoder, or the JSON encoded as UTF-8
+            bytes), its content type, and the CoverImage being uploaded (or
+            None).
+
+    """
+    if deck.cover:
+        with open_cover(deck.cover, image_cache, max_image_size) as cover:
+            url = find_cover_image_url(cover.digest, image_cache,
+                                       cover_image_urls)
+            if url is None:
+                processed = (preprocessor.process(cover.file, cover.mime_type)
+                             if preprocessor is not None else None)
+                try:
+                    upload = (CoverImage(processed, cover.mime_type,
+                                         cover.digest)
+                              if processed is not None else cover)
+                    form = to_multipart_form(
+                        json_converter.deck_to_json(deck), cover=upload)
+                    yield form, form.content_type, cover
+                finally:
+                    if processed is not None:
+                        processed.close()
+                return
+    else:
+        url = None
+
+    json_data = json_converter.deck_to_json(deck, as_json_str=not multipart)
+    json_data[IMAGE_FILE] = None
+    if url is not None:
+        json_data[COVER_IMAGE_URL] = url
+    if multipart:
+        form = to_multipart_form(json_data)
+        yield form, form.content_type, None
+    else:
+        # Faster JSON backends keep non-ASCII characters, which must not be
+        # sent as a str body (http.client would encode it as Latin-1).
+        yield (json_codec.dumps(json_data).encode('utf-8'),
+               'application/json', None)
+
+
+def find_cover_image_url(digest, image_cache=None, cover_image_urls=None):
+    """Get the cover image URL an image has been uploaded as, or None."""
+    url = cover_image_urls.get(digest) if cover_image_urls else None
+    if url is None and image_cache is not None:
+        url = image_cache.get_cover_image_url(digest)
+    return url
+
+
+def remember_cover_image_url(cover, deck, image_cache=None,
+                             cover_image_urls=None):
+    """Remember the cover image URL an uploaded cover resulted in."""
+    if cover is None or not deck.cover_image_url:
+        return
+    if cover_image_urls is not None:
+        cover_image_urls[cover.digest] = deck.cover_image_url
+    if image_cache is not None:
+        image_cache.set_cover_image_url(cover.digest, deck.cover_image_url)
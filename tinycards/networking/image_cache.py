@@ -0,0 +1,201 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Bytes hashed or copied at once.
+_BLOCK_SIZE = 64 * 1024
+
+
+def file_digest(image_file):
+    """Get the SHA-256 hex digest of a binary file object's content.
+
+    Reads the file from its current position and seeks back to it
+    afterwards, so the file can be read again (e.g. to upload it).
+    """
+    start = image_file.tell()
+    digest = hashlib.sha256()
+    for block in iter(lambda: image_file.read(_BLOCK_SIZE), b''):
+        digest.update(block)
+    image_file.seek(start)
+    return digest.hexdigest()
+
+
+class ImageCache(object):
+    """Size-bounded, content-addressed on-disk storage for cover images.
+
+    Downloaded images are stored once per SHA-256 digest of their content
+    and looked up by the URL they were downloaded from. The least recently
+    used images are evicted once they take up more than `max_bytes`.
+
+    The cache also remembers which `cover_image_url` an uploaded image
+    content resulted in, so the same cover is not uploaded again.
+
+    Example:
+        >>> api = RestApi(image_cache=ImageCache('~/.cache/tinycards'))
+
+    Args:
+        directory (str): Where to store the images and their index.
+        max_bytes (int): Maximum total size of the stored images.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        """Initialize a new instance of the ImageCache class."""
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._connection = sqlite3.connect(
+            os.path.join(self.directory, 'index.sqlite'),
+            check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.executescript(
+                'CREATE TABLE IF NOT EXISTS images ('
+                ' digest TEXT PRIMARY KEY,'
+                ' mime_type TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' accessed_at REAL NOT NULL);'
+                'CREATE TABLE IF NOT EXISTS urls ('
+                ' url TEXT PRIMARY KEY,'
+                ' digest TEXT NOT NULL);'
+                'CREATE TABLE IF NOT EXISTS uploads ('
+                ' digest TEXT PRIMARY KEY,'
+                ' cover_image_url TEXT NOT NULL);'
+            )
+
+    def path(self, digest):
+        """Get the path an image with the given digest is stored at."""
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def open(self, url):
+        """Open the image downloaded from a URL.
+
+        The file is opened while no other thread can evict the image, so
+        it stays readable even if the image is evicted afterwards.
+
+        Returns:
+            tuple: The opened binary file, MIME type and digest of the
+                stored image, or None if it is not cached. The caller has
+                to close the file.
+
+        """
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT images.digest, mime_type FROM urls'
+                ' JOIN images ON images.digest = urls.digest'
+                ' WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            digest, mime_type = row
+            try:
+                image_file = open(self.path(digest), 'rb')
+            except FileNotFoundError:
+                return None
+            self._connection.execute(
+                'UPDATE images SET accessed_at = ? WHERE digest = ?',
+                (time.time(), digest))
+        return image_file, mime_type, digest
+
+    def put(self, image_file, mime_type, url=None):
+        """Store an image read from a binary file object.
+
+        The file is read from its current position and sought back to it
+        afterwards.
+
+        Args:
+            image_file: The image's content.
+            mime_type (str): The image's MIME type.
+            url (str): URL the image has been downloaded from, if any.
+
+        Returns:
+            str: The SHA-256 hex digest of the image.
+
+        """
+        start = image_file.tell()
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for block in iter(lambda: image_file.read(_BLOCK_SIZE), b''):
+                    digest.update(block)
+                    temp_file.write(block)
+                    size += len(block)
+            digest = digest.hexdigest()
+            os.makedirs(os.path.dirname(self.path(digest)), exist_ok=True)
+            os.replace(temp_path, self.path(digest))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        finally:
+            image_file.seek(start)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?)',
+                (digest, mime_type, size, time.time()))
+            if url is not None:
+                self._connection.execute(
+                    'INSERT OR REPLACE INTO urls VALUES (?, ?)',
+                    (url, digest))
+        self._evict()
+        return digest
+
+    def _evict(self):
+        """Delete the least recently used images exceeding `max_bytes`."""
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                'SELECT digest, size FROM images'
+                ' ORDER BY accessed_at DESC, rowid DESC').fetchall()
+            total = 0
+            for digest, size in rows:
+                total += size
+                if total <= self.max_bytes:
+                    continue
+                self._connection.execute(
+                    'DELETE FROM images WHERE digest = ?', (digest,))
+                self._connection.execute(
+                    'DELETE FROM urls WHERE digest = ?', (digest,))
+                try:
+                    os.remove(self.path(digest))
+                except OSError:
+                    # Already gone, or still opened on Windows.
+                    pass
+
+    def get_cover_image_url(self, digest):
+        """Get the cover image URL an image has been uploaded as, or None."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT cover_image_url FROM uploads WHERE digest = ?',
+                (digest,)).fetchone()
+        return row[0] if row is not None else None
+
+    def set_cover_image_url(self, digest, cover_image_url):
+        """Remember the cover image URL an image has been uploaded as."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO uploads VALUES (?, ?)',
+                (digest, cover_image_url))
+
+    def clear(self):
+        """Delete all images and remembered uploads."""
+        with self._lock, self._connection:
+            for (digest,) in self._connection.execute(
+                    'SELECT digest FROM images').fetchall():
+                shutil.rmtree(os.path.dirname(self.path(digest)),
+                              ignore_errors=True)
+            self._connection.executescript(
+                'DELETE FROM images; DELETE FROM urls; DELETE FROM uploads;')
+
+    def close(self):
+        self._connection.close()
+
+    @property
+    def size(self):
+        """int: Total size of all stored images in bytes."""
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM images').fetchone()[0]
@@ -1,29 +1,79 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from mimetypes import guess_type
+from tempfile import SpooledTemporaryFile
+from types import ModuleType
+from typing import Optional
 import requests
 
+Image: Optional[ModuleType]
+try:
+    from PIL import Image  # type: ignore[no-redef]
+except ImportError:  # pragma: no cover
+    Image = None
 
-def get_image(url):
+# Downloads of larger images are aborted.
+MAX_IMAGE_SIZE = 10 * 1024 * 1024
+# Downloaded images larger than this are spooled to a temporary file instead
+# of being kept in memory.
+SPOOL_SIZE = 1024 * 1024
+# Bytes read from the network at once.
+CHUNK_SIZE = 64 * 1024
+
+
+def get_image(url, max_size=MAX_IMAGE_SIZE, spool_size=SPOOL_SIZE):
     '''
     Get the image at the provided URL and returns a file-like buffer
     containing its bytes, and its MIME type.
+
+    The image is streamed into a buffer which is kept in memory up to
+    `spool_size` bytes and moved to a temporary file beyond. Images larger
+    than `max_size` bytes are rejected with a ValueError.
     '''
-    resp = requests.get(url)
-    if not resp.ok:
-        raise RuntimeError(
-            'Failed to download image from %s: %s - %s'
-            % (url, resp.status_code, resp.text)
-        )
-    img = BytesIO(resp.content)
-    mime_type = _mime_type(img, resp.headers, url)
+    with requests.get(url, stream=True) as resp:
+        if not resp.ok:
+            raise RuntimeError(
+                'Failed to download image from %s: %s - %s'
+                % (url, resp.status_code, resp.text)
+            )
+        content_length = resp.headers.get('Content-Length')
+        if content_length and int(content_length) > max_size:
+            raise _too_large(url, max_size)
+
+        img = SpooledTemporaryFile(max_size=spool_size)
+        try:
+            head = b''
+            mime_type = None
+            size = 0
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise _too_large(url, max_size)
+                if mime_type is None and len(head) < _LEN_HEADER:
+                    head += chunk[:_LEN_HEADER - len(head)]
+                if mime_type is None and len(head) == _LEN_HEADER:
+                    mime_type = _mime_type(head, resp.headers, url)
+                img.write(chunk)
+            if mime_type is None:
+                mime_type = _mime_type(head, resp.headers, url)
+        except BaseException:
+            img.close()
+            raise
+    img.seek(0)
     return img, mime_type
 
 
-def _mime_type(img, headers, url):
+def _too_large(url, max_size):
+    return ValueError('Image at %s is larger than %d bytes'
+                      % (url, max_size))
+
+
+def _mime_type(img_bytes, headers, url):
     '''
     Try to get the MIME type of the provided image using either the HTTP
-    response's headers, information available via its URL, or by reading the
-    beginning of the image's bytes.
+    response's headers, information available via its URL, or the first
+    bytes of the image.
     '''
     if ('Content-Type' in headers
             and headers['Content-Type'].startswith('image/')):
@@ -31,9 +81,7 @@ def _mime_type(img, headers, url):
     mime_type, _ = guess_type(url)
     if mime_type and mime_type.startswith('image/'):
         return mime_type
-    mime_type = mime_type_from_bytes(img.read())
-    img.seek(0)  # Reset the BytesIO object, so that it can be read again.
-    return mime_type
+    return mime_type_from_bytes(img_bytes)
 
 
 def mime_type_from_path(img_path):
@@ -58,3 +106,126 @@ def mime_type_from_bytes(img_bytes):
         return 'image/png'
     else:
         raise ValueError('Unsupported image type')
+
+
+# Pillow format names of the image types accepted by Tinycards.
+_PIL_FORMATS = {'image/jpeg': 'JPEG', 'image/png': 'PNG'}
+
+
+def preprocess_image(img, mime_type, max_dimension, quality):
+    '''
+    Downscale an image to at most `max_dimension` pixels in width and
+    height, and recompress it with the given JPEG quality. PNG images are
+    kept lossless, but optimized.
+
+    The image is given as path or binary file object, and decoded from it
+    without reading it into memory first. A file object is read from its
+    current position.
+
+    Returns the bytes of the new image, or None if it would not be smaller
+    than the given one. PNG images which need no downscaling are returned
+    as None right away. Requires Pillow.
+    '''
+    image_format = _PIL_FORMATS[mime_type]
+    if isinstance(img, str):
+        size = os.path.getsize(img)
+    else:
+        start = img.tell()
+        size = img.seek(0, 2) - start
+        img.seek(start)
+    with Image.open(img) as opened:
+        if (image_format == 'PNG' and opened.width <= max_dimension
+                and opened.height <= max_dimension):
+            return None
+        opened.thumbnail((max_dimension, max_dimension))
+        if image_format == 'JPEG' and opened.mode not in ('L', 'RGB'):
+            opened = opened.convert('RGB')
+        out = BytesIO()
+        if image_format == 'JPEG':
+            opened.save(out, image_format, quality=quality, optimize=True)
+        else:
+            opened.save(out, image_format, optimize=True)
+    if out.tell() >= size:
+        return None
+    return out.getvalue()
+
+
+def _file_path(img):
+    """Get the path of a binary file object, or None if it has none."""
+    path = getattr(img, 'name', None)
+    if isinstance(path, str) and os.path.isfile(path):
+        return path
+    return None
+
+
+class CoverPreprocessor(object):
+    '''
+    Downscales and recompresses cover images before they are uploaded.
+
+    Tinycards displays covers at a small size, so large images only cost
+    upload time. JPEG and PNG images stay of the same type. Covers stored on
+    disk are processed in a pool of worker processes, so covers of decks
+    created from several threads are processed in parallel.
+
+    Requires the optional Pillow dependency
+    (`pip install tinycards[images]`).
+
+    Example:
+        >>> with CoverPreprocessor(max_dimension=512) as preprocessor:
+        >>>     api = RestApi(cover_preprocessor=preprocessor)
+
+    Args:
+        max_dimension (int): Maximum width and height in pixels.
+        quality (int): JPEG quality between 1 and 95.
+        max_workers (int): Number of worker processes. Defaults to the
+            number of CPUs. With 0, images are processed in the calling
+            thread.
+    '''
+
+    def __init__(self, max_dimension=1024, quality=85, max_workers=None):
+        if Image is None:
+            raise ImportError("CoverPreprocessor requires Pillow. Install it "
+                              "with 'pip install tinycards[images]'.")
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self._executor = (ProcessPoolExecutor(max_workers)
+                          if max_workers != 0 else None)
+
+    def process(self, img, mime_type):
+        '''
+        Preprocess the image read from a binary file object. The file is
+        sought back to its position afterwards.
+
+        Only files stored on disk (like local covers and cached downloads)
+        are handed to a worker process, by their path. Other files cannot be
+        passed to another process without reading them into memory, so they
+        are processed in the calling thread.
+
+        Returns a file-like buffer containing the new image's bytes, or None
+        if the image cannot be made smaller.
+        '''
+        if mime_type not in _PIL_FORMATS:
+            return None
+        path = _file_path(img) if self._executor is not None else None
+        if path is not None and img.tell() == 0:
+            img_bytes = self._executor.submit(
+                preprocess_image, path, mime_type, self.max_dimension,
+                self.quality).result()
+        else:
+            start = img.tell()
+            try:
+                img_bytes = preprocess_image(img, mime_type,
+                                             self.max_dimension, self.quality)
+            finally:
+                img.seek(start)
+        return BytesIO(img_bytes) if img_bytes is not None else None
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,74 @@
+"""Pluggable JSON backend for encoding and decoding API data.
+
+Uses the fastest JSON library installed, in the order orjson, ujson and the
+standard library's json module. All JSON handled by this package goes
+through `dumps()` and `loads()`, so switching the backend with
+`use_backend()` affects every request. Only streamed responses are decoded
+with the json module, see `json_stream`.
+"""
+import json
+from types import ModuleType
+from typing import Callable, Dict, Optional, Tuple
+
+orjson: Optional[ModuleType]
+try:
+    import orjson  # type: ignore[no-redef]
+except ImportError:  # pragma: no cover
+    orjson = None
+
+ujson: Optional[ModuleType]
+try:
+    import ujson  # type: ignore[no-redef]
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj).decode('utf-8')
+
+
+def _ujson_dumps(obj):
+    return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+
+# Available backends as (dumps, loads) tuples, fastest first.
+BACKENDS: Dict[str, Tuple[Callable, Callable]] = {}
+if orjson is not None:
+    BACKENDS['orjson'] = (_orjson_dumps, orjson.loads)
+if ujson is not None:
+    BACKENDS['ujson'] = (_ujson_dumps, ujson.loads)
+BACKENDS['json'] = (json.dumps, json.loads)
+
+backend = None
+_dumps = None
+_loads = None
+
+
+def use_backend(name=None):
+    """Select the JSON library used by the package.
+
+    Args:
+        name (str): One of 'orjson', 'ujson' or 'json'. Selects the fastest
+            installed library if not specified.
+    """
+    global backend, _dumps, _loads
+    if name is None:
+        name = next(iter(BACKENDS))
+    if name not in BACKENDS:
+        raise ValueError("JSON backend '%s' is not installed, available: %s"
+                         % (name, ', '.join(BACKENDS)))
+    backend = name
+    _dumps, _loads = BACKENDS[name]
+
+
+def dumps(obj):
+    """Encode an object as a JSON string."""
+    return _dumps(obj)
+
+
+def loads(data):
+    """Decode a JSON document given as bytes or string."""
+    return _loads(data)
+
+
+use_backend()
@@ -1,9 +1,11 @@
 """Several helper functions to convert between data objects and JSON."""
-import json
-from tinycards.model import Card, Concept, Deck, Fact, Favorite
+from tinycards.model import Card, ColumnarCardList, Concept, Deck, Fact
+from tinycards.model import Favorite, LazyCardList
 from tinycards.model import SearchableData, Side, Trendable, TrendableData
 from tinycards.model import User
 
+from . import json_codec
+
 
 # --- User conversion
 
@@ -114,6 +116,20 @@ def json_to_card(json_data):
     return card_obj
 
 
+def json_to_card_content(json_data):
+    """Get the content of a card from its JSON dict, see `Card.content()`.
+    """
+    return tuple(tuple((c['fact']['type'], c['fact'].get('text'),
+                        c['fact'].get('imageUrl'))
+                       for c in side['concepts'])
+                 for side in json_data['sides'][:2])
+
+
+def json_to_card_id(json_data):
+    """Get the ID of a card from its JSON dict."""
+    return json_data['id']
+
+
 def card_to_json(card_obj):
     """Convert a Card object into a JSON dict."""
     json_data = {
@@ -132,18 +148,50 @@ def card_to_json(card_obj):
     return json_data
 
 
+def text_card_to_json(front, back, creation_timestamp):
+    """Build the JSON dict of a card with one text fact per side.
+
+    Produces the same as `card_to_json`, without building a Card object.
+    """
+    json_data = {
+        'creationTimestamp': creation_timestamp,
+        'sides': [
+            {'concepts': [{'fact': {'text': front, 'type': 'TEXT'}}]},
+            {'concepts': [{'fact': {'text': back, 'type': 'TEXT'}}]}
+        ],
+    }
+
+    return json_data
+
+
+def cards_to_json(cards):
+    """Convert a list of cards into a list of JSON dicts.
+
+    Cards of a ColumnarCardList which have not been accessed are serialized
+    straight from its columns.
+    """
+    if isinstance(cards, ColumnarCardList):
+        return [card_to_json(card) if card is not None
+                else text_card_to_json(front, back, timestamp)
+                for card, front, back, timestamp in cards.rows()]
+    return [card_to_json(c) for c in cards]
+
+
 # --- Deck conversion
 
 def json_to_deck(json_data):
-    """Convert a JSON dict into a Deck object."""
+    """Convert a JSON dict into a Deck object.
+
+    The cards of the deck are only converted when they are first accessed.
+    """
     deck = Deck(
         title=json_data['name'],
         description=json_data['description'],
         deck_id=json_data['id'],
         compact_id=json_data['compactId'],
         slug=json_data['slug'],
-        cards=([json_to_card(c) for c in json_data['cards']]
-               if 'cards' in json_data else []),
+        cards=LazyCardList(json_data.get('cards', []), json_to_card,
+                           json_to_card_content, json_to_card_id),
         private=bool(json_data['private']),
         shareable=bool(json_data['shareable']),
         blacklisted_side_indices=json_data['blacklistedSideIndices'],
@@ -153,6 +201,8 @@ def json_to_deck(json_data):
     )
     deck.image_url = json_data['imageUrl']
     deck.cover_image_url = json_data['coverImageUrl']
+    deck.update_timestamp = json_data.get('updatedAt')
+    deck.mark_clean()
     return deck
 
 
@@ -165,7 +215,7 @@ def deck_to_json(deck_obj, as_json_str=False):
         as_json_str (bool): Convert lists into a single JSON string (required
             for PATCH with content-type: application/json).
     """
-    cards = [card_to_json(c) for c in deck_obj.cards]
+    cards = cards_to_json(deck_obj.cards)
 
     json_data = {
         'name': deck_obj.title,
@@ -194,7 +244,7 @@ def deck_to_json(deck_obj, as_json_str=False):
 
 
 def as_obj_or_json_str(obj, as_json_str):
-    return json.dumps(obj) if as_json_str else obj
+    return json_codec.dumps(obj) if as_json_str else obj
 
 
 # --- Trendable conversion
@@ -0,0 +1,204 @@
+"""Incremental decoding of large JSON objects.
+
+Decodes the members of a JSON object while its bytes arrive, so the whole
+response never has to be held in memory at once. The elements of selected
+array members are produced one by one, e.g. the cards of an expanded deck.
+
+Unlike all other JSON handled by this package, the values are decoded with
+the standard library's json module instead of `json_codec.loads()`. Its
+`raw_decode()` finds where a value ends and decodes it in a single pass in
+C. None of the faster libraries can decode a prefix of the data, so the
+end of each value would have to be found in Python first, which makes
+streaming several times slower overall (see `benchmarks/json_backends.py`).
+"""
+import codecs
+import json
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+# Characters which may follow a complete key or value.
+_VALUE_DELIMITERS = _WHITESPACE + ',:]}'
+_INCOMPLETE = object()
+
+# Parser states.
+_OBJECT_START = 'object start'
+_KEY_OR_END = 'key or end'
+_KEY = 'key'
+_COLON = 'colon'
+_VALUE = 'value'
+_MEMBER_END = 'member end'
+_ARRAY_START = 'array start'
+_ITEM_OR_END = 'item or end'
+_ITEM = 'item'
+_ITEM_END = 'item end'
+_DONE = 'done'
+
+
+class JsonObjectStream(object):
+    """Push parser for a single JSON object.
+
+    Bytes are passed in with `feed()`, which returns all members completed
+    so far as (key, value) tuples. For members in `stream_keys`, whose values
+    must be arrays, one tuple is returned per array element instead.
+
+    Only the current member (or array element) is buffered, so the memory
+    needed does not depend on the size of the whole object.
+
+    Args:
+        stream_keys (iterable): Keys of array members whose elements should
+            be returned one by one.
+    """
+
+    def __init__(self, stream_keys=()):
+        """Initialize a new instance of the JsonObjectStream class."""
+        self.stream_keys = frozenset(stream_keys)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._state = _OBJECT_START
+        self._key = None
+        self._final = False
+
+    def feed(self, chunk):
+        """Parse the next chunk of bytes.
+
+        Returns:
+            list: The (key, value) tuples completed by this chunk.
+        """
+        self._buffer = self._buffer[self._pos:] + self._decoder.decode(chunk)
+        self._pos = 0
+        return list(self._parse())
+
+    def close(self):
+        """Signal the end of the data.
+
+        Returns:
+            list: The (key, value) tuples completed by the end of the data.
+
+        Raises:
+            ValueError: If the data did not contain a complete JSON object.
+        """
+        self._buffer = (self._buffer[self._pos:]
+                        + self._decoder.decode(b'', final=True))
+        self._pos = 0
+        self._final = True
+        members = list(self._parse())
+        if self._state != _DONE:
+            raise ValueError('Incomplete JSON object')
+        return members
+
+    def _next_char(self):
+        """Skip whitespace and peek at the next character, if available."""
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buffer[pos] if pos < len(buffer) else None
+
+    def _value(self):
+        """Decode the value at the current position if it is complete."""
+        try:
+            value, end = _DECODER.raw_decode(self._buffer, self._pos)
+        except ValueError:
+            if self._final:
+                raise
+            return _INCOMPLETE
+        if not self._final and (end == len(self._buffer)
+                                or self._buffer[end] not in _VALUE_DELIMITERS):
+            # A number might continue in the next chunk.
+            return _INCOMPLETE
+        self._pos = end
+        return value
+
+    def _expect(self, char, expected):
+        if char != expected:
+            raise ValueError("Expected '%s' at position %d but got '%s'"
+                             % (expected, self._pos, char))
+        self._pos += 1
+
+    def _parse(self):
+        while True:
+            char = self._next_char()
+            if char is None:
+                return
+            state = self._state
+            if state == _OBJECT_START:
+                self._expect(char, '{')
+                self._state = _KEY_OR_END
+            elif state == _KEY_OR_END:
+                if char == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                else:
+                    self._state = _KEY
+            elif state == _KEY:
+                key = self._value()
+                if key is _INCOMPLETE:
+                    return
+                if not isinstance(key, str):
+                    raise ValueError('Object keys must be strings')
+                self._key = key
+                self._state = _COLON
+            elif state == _COLON:
+                self._expect(char, ':')
+                self._state = (_ARRAY_START if self._key in self.stream_keys
+                               else _VALUE)
+            elif state == _VALUE:
+                value = self._value()
+                if value is _INCOMPLETE:
+                    return
+                yield self._key, value
+                self._state = _MEMBER_END
+            elif state == _MEMBER_END:
+                if char == ',':
+                    self._pos += 1
+                    self._state = _KEY
+                else:
+                    self._expect(char, '}')
+                    self._state = _DONE
+            elif state == _ARRAY_START:
+                self._expect(char, '[')
+                self._state = _ITEM_OR_END
+            elif state == _ITEM_OR_END:
+                if char == ']':
+                    self._pos += 1
+                    self._state = _MEMBER_END
+                else:
+                    self._state = _ITEM
+            elif state == _ITEM:
+                item = self._value()
+                if item is _INCOMPLETE:
+                    return
+                yield self._key, item
+                self._state = _ITEM_END
+            elif state == _ITEM_END:
+                if char == ',':
+                    self._pos += 1
+                    self._state = _ITEM
+                else:
+                    self._expect(char, ']')
+                    self._state = _MEMBER_END
+            else:
+                raise ValueError('Extra data after JSON object')
+
+
+def iter_object_members(chunks, stream_keys=()):
+    """Lazily decode the members of a JSON object from chunks of bytes.
+
+    Args:
+        chunks (iterable): The bytes of the JSON object, e.g. from
+            `Response.iter_content()`.
+        stream_keys (iterable): Keys of array members whose elements should
+            be yielded one by one.
+
+    Yields:
+        tuple: The key and value of each member, or the key and one element
+            for members in `stream_keys`.
+    """
+    stream = JsonObjectStream(stream_keys)
+    for chunk in chunks:
+        for member in stream.feed(chunk):
+            yield member
+    for member in stream.close():
+        yield member
@@ -0,0 +1,271 @@
+"""In-process request metrics with Prometheus text exposition."""
+import bisect
+import socketserver
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit
+
+# Upper bounds of the latency histogram buckets in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+
+# Status label of attempts which failed without a response.
+CONNECTION_ERROR = 'error'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def endpoint_of(method, url, api_url, params=None):
+    """Get the endpoint label of a request.
+
+    IDs in the path are replaced by '{id}', assuming paths alternate between
+    collection names and IDs (like 'users/1/favorites'). The 'expand'
+    parameter is kept, since it changes the response size considerably.
+
+    Example:
+        >>> endpoint_of('GET', API_URL + 'decks/abc', API_URL,
+        >>>             {'expand': 'true'})
+        'GET decks/{id}?expand=true'
+    """
+    path = url[len(api_url):] if url.startswith(api_url) \
+        else urlsplit(url).path
+    segments = path.strip('/').split('/')
+    for i in range(1, len(segments), 2):
+        segments[i] = '{id}'
+    label = '%s %s' % (method, '/'.join(segments))
+    if params and 'expand' in params:
+        label += '?expand=%s' % params['expand']
+    return label
+
+
+class Histogram(object):
+    """Counts observations per bucket, along with their sum."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize a new instance of the Histogram class."""
+        self.buckets = tuple(buckets)
+        # The last count is for observations above all buckets.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """Get (upper bound, count) tuples as exposed by Prometheus."""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),),
+                                self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class EndpointMetrics(object):
+    """Metrics of all requests sent to a single endpoint.
+
+    Attributes:
+        statuses (Counter): Number of attempts per status code, including
+            retries. Attempts which failed without a response are counted
+            as 'error'.
+        latency (Histogram): Seconds until the response headers arrived,
+            per attempt.
+        request_bytes (int): Size of all request bodies sent.
+        response_bytes (int): Size of all response bodies received.
+        retries (int): Number of retried attempts.
+        conversion (Histogram): Seconds spent decoding and converting
+            responses into model objects.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize a new instance of the EndpointMetrics class."""
+        self.statuses = Counter()
+        self.latency = Histogram(buckets)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.conversion = Histogram(buckets)
+
+    @property
+    def requests(self):
+        """int: Number of attempts sent, including retries."""
+        return sum(self.statuses.values())
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """Serves each scrape in its own thread.
+
+    `http.server.ThreadingHTTPServer` is only available from Python 3.7 on.
+    """
+
+    daemon_threads = True
+
+
+class MetricsRegistry(object):
+    """Collects per-endpoint request metrics of one or more RestApi objects.
+
+    Example:
+        >>> metrics = MetricsRegistry()
+        >>> api = RestApi(metrics=metrics)
+        >>> metrics.start_http_server(9100)
+        >>> print(metrics.to_prometheus())
+
+    Args:
+        buckets (tuple): Upper bounds of the histogram buckets in seconds.
+        prefix (str): Prefix of the exposed metric names.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix='tinycards'):
+        """Initialize a new instance of the MetricsRegistry class."""
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, endpoint):
+        metrics = self.endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self.endpoints[endpoint] = EndpointMetrics(self.buckets)
+        return metrics
+
+    def observe_request(self, endpoint, status, latency, request_bytes=0,
+                        response_bytes=0, retry=False):
+        """Record a single attempt of a request.
+
+        Args:
+            endpoint (str): The endpoint label, see `endpoint_of`.
+            status: The response's status code, or 'error' if the attempt
+                failed without a response.
+            latency (float): Seconds until the response arrived.
+            request_bytes (int): Size of the request body.
+            response_bytes (int): Size of the response body.
+            retry (bool): Whether the attempt is a retry.
+        """
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.statuses[status] += 1
+            metrics.latency.observe(latency)
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+            if retry:
+                metrics.retries += 1
+
+    def observe_response_bytes(self, endpoint, response_bytes):
+        """Record body bytes of a streamed response as they are read."""
+        with self._lock:
+            self._endpoint(endpoint).response_bytes += response_bytes
+
+    def observe_conversion(self, endpoint, seconds):
+        """Record the time spent converting a response of the endpoint."""
+        with self._lock:
+            self._endpoint(endpoint).conversion.observe(seconds)
+
+    @contextmanager
+    def time_conversion(self, endpoint):
+        """Measure the time spent in the context as conversion time."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_conversion(endpoint, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        name = self.prefix + '_requests_total'
+        lines.append('# HELP %s Requests sent, including retries.' % name)
+        lines.append('# TYPE %s counter' % name)
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            for endpoint, metrics in endpoints:
+                for status, count in sorted(metrics.statuses.items(),
+                                            key=lambda item: str(item[0])):
+                    lines.append('%s{endpoint="%s",status="%s"} %d'
+                                 % (name, _escape(endpoint),
+                                    _escape(status), count))
+
+            for suffix, attribute, help_text in (
+                    ('retries_total', 'retries', 'Retried requests.'),
+                    ('request_bytes_total', 'request_bytes',
+                     'Size of all request bodies.'),
+                    ('response_bytes_total', 'response_bytes',
+                     'Size of all response bodies.')):
+                name = '%s_%s' % (self.prefix, suffix)
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s counter' % name)
+                for endpoint, metrics in endpoints:
+                    lines.append('%s{endpoint="%s"} %d'
+                                 % (name, _escape(endpoint),
+                                    getattr(metrics, attribute)))
+
+            for suffix, attribute, help_text in (
+                    ('request_duration_seconds', 'latency',
+                     'Time until the response arrived.'),
+                    ('conversion_duration_seconds', 'conversion',
+                     'Time spent converting responses.')):
+                name = '%s_%s' % (self.prefix, suffix)
+                lines.append('# HELP %s %s' % (name, help_text))
+                lines.append('# TYPE %s histogram' % name)
+                for endpoint, metrics in endpoints:
+                    histogram = getattr(metrics, attribute)
+                    label = _escape(endpoint)
+                    for bound, count in histogram.cumulative_counts():
+                        lines.append('%s_bucket{endpoint="%s",le="%s"} %d'
+                                     % (name, label, _format_bound(bound),
+                                        count))
+                    lines.append('%s_sum{endpoint="%s"} %r'
+                                 % (name, label, histogram.sum))
+                    lines.append('%s_count{endpoint="%s"} %d'
+                                 % (name, label, histogram.count))
+        return '\n'.join(lines) + '\n'
+
+    def start_http_server(self, port=0, addr='127.0.0.1'):
+        """Serve the metrics for Prometheus from a background thread.
+
+        Args:
+            port (int): Port to listen on. A free port is picked with 0.
+            addr (str): Address to listen on.
+
+        Returns:
+            HTTPServer: The running server. Its `server_address`
+                holds the actual port; call `shutdown()` to stop it.
+
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = _ThreadingHTTPServer((addr, port), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
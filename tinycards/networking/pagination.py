@@ -0,0 +1,87 @@
+"""Helpers to iterate over paginated API results."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+def iter_pages(fetch_page, start_page=0, max_items=None):
+    """Lazily iterate over the items of all pages of a paginated endpoint.
+
+    While the items of one page are consumed, the next page is already
+    fetched in a background thread.
+
+    Args:
+        fetch_page (callable): Function which takes a page number and
+            returns the list of items on that page.
+        start_page (int): The first page to fetch (zero-indexed).
+        max_items (int): Stop after yielding this many items. Iterates until
+            the first empty page if not specified.
+
+    Yields:
+        The items of all pages, in order.
+    """
+    if max_items is not None and max_items <= 0:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        page = start_page
+        future = executor.submit(fetch_page, page)
+        yielded = 0
+        while True:
+            items = future.result()
+            if not items:
+                return
+            if max_items is None or yielded + len(items) < max_items:
+                page += 1
+                future = executor.submit(fetch_page, page)
+            else:
+                future = None
+            for item in items:
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+            if future is None:
+                return
+    finally:
+        executor.shutdown(wait=False)
+
+
+async def aiter_pages(fetch_page, start_page=0, max_items=None):
+    """Asynchronous counterpart of `iter_pages`.
+
+    Args:
+        fetch_page (callable): Coroutine function which takes a page number
+            and returns the list of items on that page.
+        start_page (int): The first page to fetch (zero-indexed).
+        max_items (int): Stop after yielding this many items.
+
+    Yields:
+        The items of all pages, in order.
+    """
+    if max_items is not None and max_items <= 0:
+        return
+
+    page = start_page
+    task = asyncio.ensure_future(fetch_page(page))
+    yielded = 0
+    try:
+        while True:
+            items = await task
+            if not items:
+                return
+            if max_items is None or yielded + len(items) < max_items:
+                page += 1
+                task = asyncio.ensure_future(fetch_page(page))
+            else:
+                task = None
+            for item in items:
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+            if task is None:
+                return
+    finally:
+        if task is not None and not task.done():
+            task.cancel()
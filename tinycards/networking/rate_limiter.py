@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+
+# Endpoint families which can be rate limited independently.
+READ = 'read'
+WRITE = 'write'
+LOGIN = 'login'
+SEARCH = 'search'
+
+
+class TokenBucket(object):
+    """A thread-safe token bucket.
+
+    Tokens are refilled continuously at `rate` tokens per second, up to
+    `capacity` tokens. Acquiring a token reserves it right away, even if the
+    bucket is empty, and tells the caller how long to wait for it. Since the
+    lock is never held while waiting, the same bucket can be used from
+    threads and event loops at the same time.
+
+    Args:
+        rate (float): Tokens added per second, i.e. the sustained request
+            rate.
+        capacity (float): Maximum number of tokens, i.e. the size of bursts
+            allowed after a quiet period. Defaults to `rate` (but at least 1).
+    """
+
+    def __init__(self, rate, capacity=None):
+        """Initialize a new instance of the TokenBucket class."""
+        if rate <= 0:
+            raise ValueError("'rate' must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take tokens from the bucket.
+
+        Returns:
+            float: The number of seconds to wait until the tokens are
+                available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens
+                               + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Take tokens from the bucket, blocking until they are available."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """Take tokens from the bucket without blocking the event loop."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RateLimiter(object):
+    """Client-side rate limits per endpoint family.
+
+    A single instance can be shared by any number of RestApi and
+    AsyncRestApi instances (and thereby Tinycards clients) in one process to
+    limit their combined request rate.
+
+    Example:
+        >>> limiter = RateLimiter(reads=10, writes=2)
+        >>> client_a = Tinycards(data_source=RestApi(rate_limiter=limiter))
+        >>> client_b = Tinycards(data_source=RestApi(rate_limiter=limiter))
+
+    Args:
+        reads (float or TokenBucket): Limit for reading requests.
+        writes (float or TokenBucket): Limit for requests which create,
+            update or delete data.
+        login (float or TokenBucket): Limit for login requests.
+        search (float or TokenBucket): Limit for search requests.
+
+        Each limit can either be given as the number of requests per second
+        or as a TokenBucket to also control the burst size. Families without
+        a limit are not throttled.
+    """
+
+    def __init__(self, reads=None, writes=None, login=None, search=None):
+        """Initialize a new instance of the RateLimiter class."""
+        limits = {READ: reads, WRITE: writes, LOGIN: login, SEARCH: search}
+        self.buckets = {
+            family: (limit if isinstance(limit, TokenBucket)
+                     else TokenBucket(limit))
+            for family, limit in limits.items() if limit
+        }
+
+    def acquire(self, family):
+        """Wait until a request of the given family may be sent."""
+        bucket = self.buckets.get(family)
+        if bucket is not None:
+            bucket.acquire()
+
+    async def acquire_async(self, family):
+        """Wait until a request of the given family may be sent."""
+        bucket = self.buckets.get(family)
+        if bucket is not None:
+            await bucket.acquire_async()
+
+
+def family_of(method, url):
+    """Get the endpoint family of a request based on its method and URL."""
+    if url.endswith('/login'):
+        return LOGIN
+    if url.endswith('/searchables'):
+        return SEARCH
+    return READ if method in ('GET', 'HEAD') else WRITE
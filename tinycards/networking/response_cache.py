@@ -0,0 +1,254 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCacheBackend(object):
+    """Size-bounded in-memory storage for cached responses.
+
+    Evicts the least recently used entry once more than `max_entries`
+    entries are stored.
+    """
+
+    def __init__(self, max_entries=1024):
+        """Initialize a new instance of the MemoryCacheBackend class."""
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get the (data, expires_at) tuple stored for the key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, data, expires_at):
+        """Store data for the key until the given time."""
+        with self._lock:
+            self._entries[key] = (data, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, key, expires_at):
+        """Change the expiry time of an existing entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], expires_at)
+
+    def delete_prefix(self, prefix):
+        """Delete all entries whose keys start with the given prefix."""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteCacheBackend(object):
+    """Size-bounded on-disk storage for cached responses.
+
+    Keeps the cache across processes and restarts. Evicts the least recently
+    used entries once more than `max_entries` entries are stored.
+
+    Only point this at files written by this class: cached objects are
+    stored pickled.
+    """
+
+    def __init__(self, path, max_entries=10000):
+        """Initialize a new instance of the SqliteCacheBackend class."""
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' key TEXT PRIMARY KEY,'
+                ' data BLOB NOT NULL,'
+                ' expires_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS entries_accessed_at'
+                ' ON entries (accessed_at)'
+            )
+
+    def get(self, key):
+        """Get the (data, expires_at) tuple stored for the key, or None."""
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT data, expires_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    'UPDATE entries SET accessed_at = ? WHERE key = ?',
+                    (time.time(), key)
+                )
+        return row
+
+    def set(self, key, data, expires_at):
+        """Store data for the key until the given time."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                (key, data, expires_at, time.time())
+            )
+            self._connection.execute(
+                'DELETE FROM entries WHERE key IN ('
+                ' SELECT key FROM entries ORDER BY accessed_at DESC'
+                ' LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def touch(self, key, expires_at):
+        """Change the expiry time of an existing entry."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'UPDATE entries SET expires_at = ? WHERE key = ?',
+                (expires_at, key)
+            )
+
+    def delete_prefix(self, prefix):
+        """Delete all entries whose keys start with the given prefix."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM entries WHERE substr(key, 1, ?) = ?',
+                (len(prefix), prefix)
+            )
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM entries')
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM entries').fetchone()[0]
+
+
+class ResponseCache(object):
+    """Read-through cache for the decoded responses of RestApi.
+
+    Entries are keyed by endpoint and request parameters and expire after a
+    per-endpoint time to live. Values are stored pickled, so every cache hit
+    returns fresh objects which callers may modify freely.
+
+    Values can be stored together with the HTTP validators (ETag and
+    Last-Modified) of their response. Such entries are kept after they
+    expired, so they can be revalidated with a conditional request.
+
+    Example:
+        >>> cache = ResponseCache(ttls={'get_deck': 300, 'search': 60})
+        >>> api = RestApi(cache=cache)
+        >>> cache.hits, cache.misses
+
+    Args:
+        backend: Where to store entries. Defaults to a MemoryCacheBackend
+            holding at most 1024 entries.
+        ttls (dict): Seconds to keep entries, per endpoint. Available
+            endpoints are 'get_deck', 'get_user_info', 'get_trends',
+            'search' and 'get_favorites'. Entries of endpoints with a TTL of
+            0 are only kept if they can be revalidated.
+        default_ttl (float): Seconds to keep entries of endpoints not listed
+            in `ttls`.
+    """
+
+    def __init__(self, backend=None, ttls=None, default_ttl=60):
+        """Initialize a new instance of the ResponseCache class."""
+        self.backend = backend if backend is not None \
+            else MemoryCacheBackend()
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint, *params):
+        """Build the cache key for an endpoint called with given params."""
+        return '/'.join([endpoint] + [str(p) for p in params]) + '/'
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint, *params):
+        """Get the cached value, or None if it is missing or expired."""
+        entry = self.backend.get(self.key(endpoint, *params))
+        hit = entry is not None and entry[1] > time.time()
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return pickle.loads(entry[0])[0] if hit else None
+
+    def get_stale(self, endpoint, *params):
+        """Get a value along with its validators, even if it has expired.
+
+        Returns:
+            tuple: The cached value and its validators as a dict, or None if
+                there is no entry with validators.
+        """
+        entry = self.backend.get(self.key(endpoint, *params))
+        if entry is None:
+            return None
+        value, validators = pickle.loads(entry[0])
+        return (value, validators) if validators else None
+
+    def set(self, endpoint, params, value, validators=None):
+        """Cache a value for an endpoint called with the given params.
+
+        Args:
+            endpoint (str): Name of the cached endpoint.
+            params (tuple): Parameters the endpoint was called with.
+            value: The value to cache.
+            validators (dict): Optional 'etag' and/or 'last_modified' values
+                of the response the value was decoded from.
+        """
+        ttl = self.ttl(endpoint)
+        if ttl or validators:
+            self.backend.set(self.key(endpoint, *params),
+                             pickle.dumps((value, validators),
+                                          pickle.HIGHEST_PROTOCOL),
+                             time.time() + ttl)
+
+    def revalidate(self, endpoint, *params):
+        """Mark an entry as fresh again after the server confirmed it."""
+        self.backend.touch(self.key(endpoint, *params),
+                           time.time() + self.ttl(endpoint))
+        with self._lock:
+            self.revalidations += 1
+
+    def invalidate(self, endpoint, *params):
+        """Drop all entries of an endpoint whose params start with `params`.
+        """
+        self.backend.delete_prefix(self.key(endpoint, *params))
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.revalidations = 0
+
+    @property
+    def stats(self):
+        """Get the hit, miss and revalidation counters as a dict."""
+        return {'hits': self.hits, 'misses': self.misses,
+                'revalidations': self.revalidations,
+                'entries': len(self.backend)}
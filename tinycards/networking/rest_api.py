@@ -1,15 +1,54 @@
-import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 from retrying import retry
 
-from . import json_converter
-from .form_utils import to_multipart_form
-from .error import InvalidResponseError
+from tinycards.model.card_list import ColumnarCardList, DeferredCardList
+
+from . import json_codec, json_converter
+from .form_utils import deck_payload, remember_cover_image_url
+from .image_utils import MAX_IMAGE_SIZE
+from .json_stream import iter_object_members
+from .metrics import CONNECTION_ERROR, endpoint_of
+from .pagination import iter_pages
+from .error import InvalidResponseError, PartialResultError
+from .rate_limiter import family_of
+from .response_cache import ResponseCache
+from .retry_policy import RetryPolicy, RetryStats, retry_delay
 
 API_URL = 'https://tinycards.duolingo.com/api/1/'
 
+# How update_deck builds the deck it returns:
+# Fetch the whole updated deck with an extra request.
+REFRESH_FULL = 'full'
+# Combine the PATCH response with the cards of the local deck.
+REFRESH_LOCAL = 'local'
+# Like REFRESH_LOCAL, but the cards are fetched when first accessed.
+REFRESH_LAZY = 'lazy'
+REFRESH_MODES = (REFRESH_FULL, REFRESH_LOCAL, REFRESH_LAZY)
+
+
+class _NotMeasured(object):
+    """Context of conversions when metrics are disabled.
+
+    Same as `contextlib.nullcontext()`, which requires Python 3.7.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOT_MEASURED = _NotMeasured()
+
+# Number of bytes read at once when decoding streamed responses.
+STREAM_CHUNK_SIZE = 16 * 1024
+
 DEFAULT_HEADERS = {
     'Accept': 'application/json, text/plain, */*',
     'Referer': 'https://tinycards.duolingo.com/',
@@ -26,18 +65,262 @@ def _should_retry_login(exception):
     return False
 
 
+def _validators(response):
+    """Extract the HTTP validators of a response as a dict."""
+    validators = {}
+    if response.headers.get('ETag'):
+        validators['etag'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        validators['last_modified'] = response.headers['Last-Modified']
+    return validators
+
+
 class RestApi(object):
     """Repository-like facade for the Tinycards API.
 
     Abstracts away all queries to the original Tinycards API and handles all
     JSON (un-)marshalling.
+
+    All requests go through a single `requests.Session`, so TCP and TLS
+    connections to the API are pooled and kept alive between calls. Call
+    `close()` (or use the instance as a context manager) to release them.
+
+    Args:
+        jwt (str): The JSON web token of an already logged in user.
+        api_url (str): Base URL of the Tinycards API.
+        pool_connections (int): Number of per-host connection pools to cache.
+        pool_maxsize (int): Maximum number of connections kept alive per
+            host. Should be at least the number of threads sharing this
+            instance.
+        keep_alive (bool): Reuse connections between requests when set to
+            True (as by default).
+        headers (dict): Additional headers sent along with every request.
+        retry_policy (RetryPolicy): When and how often to retry requests
+            which failed with a transient error. By default, idempotent
+            requests are retried with exponential backoff. Retries sent so
+            far can be inspected via the `retry_stats` attribute.
+        rate_limiter (RateLimiter): Optional client-side rate limits, which
+            can be shared with other instances.
+        cache (ResponseCache): Optional cache for the results of
+            `get_deck`, `get_user_info`, `get_trends`, `search` and
+            `get_favorites`. Entries are invalidated by the methods which
+            modify the corresponding data.
+        conditional_requests (bool): Revalidate expired decks and user infos
+            with conditional requests (using ETag and Last-Modified) instead
+            of downloading them again when set to True. Unchanged objects
+            are then served from the cache. Creates a cache which only keeps
+            entries for revalidation if no `cache` is given.
+        image_cache (ImageCache): Optional on-disk cache for downloaded
+            cover images and the URLs of uploaded ones. Covers are
+            downloaded for every request if not specified.
+        max_image_size (int): Maximum size of cover images downloaded from
+            URLs in bytes. Larger images are rejected with a ValueError.
+        cover_preprocessor (CoverPreprocessor): Optional step which
+            downscales and recompresses covers before they are uploaded.
+        metrics (MetricsRegistry): Optional registry to record the count,
+            latency, sizes, status codes and retries of requests, and the
+            time spent converting their responses, per endpoint.
     """
 
-    def __init__(self, jwt=None):
+    def __init__(self,
+                 jwt=None,
+                 api_url=API_URL,
+                 pool_connections=10,
+                 pool_maxsize=10,
+                 keep_alive=True,
+                 headers=None,
+                 retry_policy=None,
+                 rate_limiter=None,
+                 cache=None,
+                 conditional_requests=False,
+                 image_cache=None,
+                 max_image_size=MAX_IMAGE_SIZE,
+                 cover_preprocessor=None,
+                 metrics=None):
         """Initialize a new instance of the RestApi class."""
+        self.api_url = api_url
+        self.pool_maxsize = pool_maxsize
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats(self.retry_policy)
+        self.rate_limiter = rate_limiter
+        if cache is None and conditional_requests:
+            cache = ResponseCache(default_ttl=0)
+        self.cache = cache
+        self.conditional_requests = conditional_requests
+        self.image_cache = image_cache
+        self.max_image_size = max_image_size
+        self.cover_preprocessor = cover_preprocessor
+        self.metrics = metrics
+        # Digests of uploaded cover images mapped to their URLs, so the same
+        # image is not uploaded twice.
+        self.cover_image_urls = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+        if headers:
+            self.session.headers.update(headers)
+
         # JSON web token
+        self._jwt = None
         self.jwt = jwt
 
+    @property
+    def jwt(self):
+        """The JSON web token sent as 'jwt_token' cookie."""
+        return self._jwt
+
+    @jwt.setter
+    def jwt(self, value):
+        cookies = self.session.cookies
+        for cookie in [c for c in cookies if c.name == 'jwt_token']:
+            cookies.clear(cookie.domain, cookie.path, cookie.name)
+        if value:
+            cookies.set('jwt_token', value)
+        self._jwt = value
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, method, url, **kwargs):
+        """Send a request through the pooled session.
+
+        Transient failures are retried according to the retry policy. The
+        number of retries needed is stored in the `retries` attribute of the
+        returned response. Every attempt is subject to the rate limiter and
+        recorded in the metrics registry, if any.
+        """
+        family = family_of(method, url)
+        endpoint = None
+        if self.metrics is not None:
+            endpoint = endpoint_of(method, url, self.api_url,
+                                   kwargs.get('params'))
+        self.retry_stats.record_request()
+        attempt = 1
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(family)
+            start = time.perf_counter()
+            try:
+                r = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if endpoint is not None:
+                    self.metrics.observe_request(
+                        endpoint, CONNECTION_ERROR,
+                        time.perf_counter() - start, retry=attempt > 1)
+                delay = retry_delay(self.retry_policy, self.retry_stats,
+                                    method, attempt)
+                if delay is None:
+                    raise
+            else:
+                if endpoint is not None:
+                    self._observe_response(endpoint, r,
+                                           time.perf_counter() - start,
+                                           attempt, kwargs.get('stream'))
+                delay = retry_delay(self.retry_policy, self.retry_stats,
+                                    method, attempt, r.status_code,
+                                    r.headers.get('Retry-After'))
+                if delay is None:
+                    r.retries = attempt - 1
+                    r.endpoint = endpoint
+                    return r
+                r.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _observe_response(self, endpoint, r, latency, attempt, stream):
+        request_bytes = int(r.request.headers.get('Content-Length') or 0)
+        response_bytes = r.headers.get('Content-Length')
+        if response_bytes is not None:
+            response_bytes = int(response_bytes)
+        elif not stream:
+            response_bytes = len(r.content)
+        else:
+            # The body has not been downloaded yet, see `_iter_content()`.
+            response_bytes = 0
+        self.metrics.observe_request(endpoint, r.status_code, latency,
+                                     request_bytes, response_bytes,
+                                     retry=attempt > 1)
+
+    def _iter_content(self, r):
+        """Iterate over the body of a streamed response in chunks.
+
+        Without a Content-Length header, the size of the body is only known
+        once it has been read, so the bytes are recorded in the metrics as
+        they are consumed.
+        """
+        if (self.metrics is None or r.endpoint is None
+                or r.headers.get('Content-Length') is not None):
+            yield from r.iter_content(STREAM_CHUNK_SIZE)
+            return
+        response_bytes = 0
+        try:
+            for chunk in r.iter_content(STREAM_CHUNK_SIZE):
+                response_bytes += len(chunk)
+                yield chunk
+        finally:
+            self.metrics.observe_response_bytes(r.endpoint, response_bytes)
+
+    def _converting(self, r):
+        """Measure the time spent converting a response, if enabled."""
+        if self.metrics is None or r.endpoint is None:
+            return _NOT_MEASURED
+        return self.metrics.time_conversion(r.endpoint)
+
+    def _from_cache(self, endpoint, *params):
+        """Get a cached result, or None if there is no cache or entry."""
+        if self.cache is None:
+            return None
+        return self.cache.get(endpoint, *params)
+
+    def _to_cache(self, endpoint, params, value, response=None):
+        if self.cache is not None:
+            validators = None
+            if response is not None and self.conditional_requests:
+                validators = _validators(response)
+            self.cache.set(endpoint, params, value, validators)
+
+    def _conditional_get(self, endpoint, cache_params, url, **kwargs):
+        """Send a GET request, conditional on a stale cache entry if any.
+
+        Returns:
+            tuple: The response and the cached value, which is only set if
+                the server confirmed that it is still up to date.
+        """
+        stale = None
+        if self.conditional_requests:
+            stale = self.cache.get_stale(endpoint, *cache_params)
+        if stale is None:
+            return self._request('GET', url, **kwargs), None
+
+        value, validators = stale
+        headers = {}
+        if 'etag' in validators:
+            headers['If-None-Match'] = validators['etag']
+        if 'last_modified' in validators:
+            headers['If-Modified-Since'] = validators['last_modified']
+        r = self._request('GET', url, headers=headers, **kwargs)
+        if r.status_code == 304:
+            self.cache.revalidate(endpoint, *cache_params)
+            return r, value
+        return r, None
+
+    def _invalidate_cache(self, endpoint, *params):
+        if self.cache is not None:
+            self.cache.invalidate(endpoint, *params)
+
     @retry(stop_max_attempt_number=5, wait_fixed=500,
            retry_on_exception=_should_retry_login)
     def login(self,
@@ -65,8 +348,10 @@ class RestApi(object):
             'identifier': identifier,
             'password': password
         }
-        r = requests.post(url=API_URL + 'login', json=request_payload)
-        json_response = r.json()
+        r = self._request('POST', self.api_url + 'login',
+                          json=request_payload)
+        with self._converting(r):
+            json_response = json_codec.loads(r.content)
 
         set_cookie_headers = {
             k: v for (k, v) in
@@ -89,14 +374,23 @@ class RestApi(object):
 
     def get_user_info(self, user_id):
         """Get info data about the given user."""
-        request_url = API_URL + 'users/' + str(user_id)
-        r = requests.get(url=request_url)
+        cached = self._from_cache('get_user_info', user_id)
+        if cached is not None:
+            return cached
+
+        request_url = self.api_url + 'users/' + str(user_id)
+        r, not_modified = self._conditional_get('get_user_info', (user_id,),
+                                                request_url)
+        if not_modified is not None:
+            return not_modified
 
         if r.status_code != 200:
             raise ValueError(r.text)
 
-        json_response = r.json()
-        user_info = json_converter.json_to_user(json_response)
+        with self._converting(r):
+            json_response = json_codec.loads(r.content)
+            user_info = json_converter.json_to_user(json_response)
+        self._to_cache('get_user_info', (user_id,), user_info, r)
 
         return user_info
 
@@ -119,24 +413,52 @@ class RestApi(object):
         if not types:
             types = ['DECK', 'DECK_GROUP']
 
-        request_url = API_URL + 'trendables'
+        cache_params = (','.join(types), limit, page, from_language)
+        cached = self._from_cache('get_trends', *cache_params)
+        if cached is not None:
+            return cached
+
+        request_url = self.api_url + 'trendables'
         params = {'types': ','.join(types),
                   'limit': limit,
                   'page': page,
                   'fromLanguage': from_language}
-        r = requests.get(url=request_url, params=params,
-                         cookies={'jwt_token': self.jwt})
+        r = self._request('GET', request_url, params=params)
 
         if r.status_code != 200:
             raise ValueError(r.text)
 
-        json_response = r.json()
-        json_trendables_list = json_response['trendables']
-        trendables = [json_converter.json_to_trendable(trendable)
-                      for trendable in json_trendables_list]
+        with self._converting(r):
+            json_response = json_codec.loads(r.content)
+            json_trendables_list = json_response['trendables']
+            trendables = [json_converter.json_to_trendable(trendable)
+                          for trendable in json_trendables_list]
+        self._to_cache('get_trends', cache_params, trendables)
 
         return trendables
 
+    def iter_trends(self, types=None, limit=10, from_language='en',
+                    start_page=0, max_items=None):
+        """Lazily iterate over Tinycards trends, page by page.
+
+        The next page is fetched in the background while the current one is
+        consumed. Iteration stops at the first empty page.
+
+        Args:
+            types (list): What entities to retrieve.
+            limit (int): Number of results per page.
+            from_language: The language used for learning.
+            start_page (int): The first page to fetch (zero-indexed).
+            max_items (int): Maximum number of results to yield.
+
+        Returns: A generator of Trendable objects.
+
+        """
+        return iter_pages(
+            lambda page: self.get_trends(types, limit, page, from_language),
+            start_page, max_items
+        )
+
     # --- Subscriptions
 
     def subscribe(self, user_id):
@@ -148,10 +470,11 @@ class RestApi(object):
         Returns: If successful, returns the ID of the user subscribed to.
 
         """
-        request_url = API_URL + 'users/' + str(user_id) + '/subscriptions'
-        r = requests.post(url=request_url, cookies={'jwt_token': self.jwt})
+        request_url = (self.api_url + 'users/' + str(user_id)
+                       + '/subscriptions')
+        r = self._request('POST', request_url)
 
-        json_response = r.json()
+        json_response = json_codec.loads(r.content)
         added_subscription = json_response['addedSubscription']
 
         return added_subscription
@@ -165,39 +488,93 @@ class RestApi(object):
         Returns: If successful, returns the ID of the unsubscribed user.
 
         """
-        request_url = API_URL + 'users/' + str(user_id) + '/subscriptions'
-        r = requests.delete(url=request_url, cookies={'jwt_token': self.jwt})
+        request_url = (self.api_url + 'users/' + str(user_id)
+                       + '/subscriptions')
+        r = self._request('DELETE', request_url)
 
-        json_response = r.json()
+        json_response = json_codec.loads(r.content)
         removed_subscription = json_response['removedSubscription']
 
         return removed_subscription
 
     # --- Deck CRUD
 
-    def get_decks(self, user_id, no_cards=False):
+    def get_decks(self, user_id, no_cards=False, max_workers=None):
         """Get all Decks for the currently logged in user.
 
+        Args:
+            user_id (int): ID of the user to get the decks for.
+            no_cards (bool): Only retrieve the deck previews without cards
+                when set to True. Defaults to False.
+            max_workers (int): Maximum number of decks to fetch concurrently
+                when retrieving cards. Defaults to the connection pool size.
+
         Returns:
             list: The list of retrieved decks.
 
+        Raises:
+            PartialResultError: If some of the decks could not be retrieved.
+                The decks retrieved successfully are available from its
+                `results` attribute.
+
         """
-        request_url = API_URL + 'decks?userId=' + str(user_id)
-        r = requests.get(request_url, cookies={'jwt_token': self.jwt})
+        request_url = self.api_url + 'decks'
+        r = self._request('GET', request_url, params={'userId': user_id})
 
         if r.status_code != 200:
             raise ValueError(r.text)
 
-        json_response = r.json()
-        decks = []
-        for d in json_response['decks']:
-            current_deck = json_converter.json_to_deck(d)
-            decks.append(current_deck)
+        with self._converting(r):
+            json_response = json_codec.loads(r.content)
+            decks = []
+            for d in json_response['decks']:
+                current_deck = json_converter.json_to_deck(d)
+                decks.append(current_deck)
 
         if no_cards:
             return decks
         else:
-            return [self.get_deck(d.id, user_id) for d in decks]
+            return self.get_decks_by_ids([d.id for d in decks], user_id,
+                                         max_workers)
+
+    def get_decks_by_ids(self, deck_ids, user_id, max_workers=None):
+        """Get the Decks with the given IDs concurrently.
+
+        Args:
+            deck_ids (list): The IDs of the decks to retrieve.
+            user_id (int): ID of the user the decks belong to.
+            max_workers (int): Maximum number of decks to fetch concurrently.
+                Defaults to the connection pool size.
+
+        Returns:
+            list: The retrieved decks, in the same order as `deck_ids`.
+
+        Raises:
+            PartialResultError: If some of the decks could not be retrieved.
+
+        """
+        if not deck_ids:
+            return []
+        max_workers = min(max_workers or self.pool_maxsize, len(deck_ids))
+
+        def fetch(deck_id):
+            try:
+                return self.get_deck(deck_id, user_id), None
+            except Exception as e:
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(fetch, deck_ids))
+
+        decks = [deck for deck, _ in results if deck is not None]
+        failures = {deck_id: error for deck_id, (_, error)
+                    in zip(deck_ids, results) if error is not None}
+        if failures:
+            raise PartialResultError("Failed to retrieve %d of %d decks"
+                                     % (len(failures), len(deck_ids)),
+                                     decks, failures)
+
+        return decks
 
     def get_deck(self, deck_id, user_id, include_cards=True):
         """Get the Deck with the given ID.
@@ -211,18 +588,78 @@ class RestApi(object):
             Deck: The retrieved deck.
 
         """
-        request_url = API_URL + 'decks/' + deck_id
-        if include_cards:
-            request_url += '?expand=true'
-        r = requests.get(url=request_url, cookies={'jwt_token': self.jwt})
-        json_response = r.json()
-
-        deck = json_converter.json_to_deck(json_response)
+        cached = self._from_cache('get_deck', deck_id, include_cards)
+        if cached is not None:
+            return cached
+
+        request_url = self.api_url + 'decks/' + deck_id
+        params = {'expand': 'true'} if include_cards else None
+        r, not_modified = self._conditional_get('get_deck',
+                                                (deck_id, include_cards),
+                                                request_url, params=params,
+                                                stream=True)
+        with r:
+            if not_modified is not None:
+                return not_modified
+
+            if r.status_code != 200:
+                raise ValueError(r.text)
+
+            # Decode the response while it is downloaded instead of holding
+            # all of its bytes in memory first.
+            json_data = {}
+            for key, value in iter_object_members(self._iter_content(r),
+                                                  ['cards']):
+                if key == 'cards':
+                    json_data.setdefault('cards', []).append(value)
+                else:
+                    json_data[key] = value
+        # The JSON is decoded while it is downloaded, so only the conversion
+        # into model objects can be measured separately.
+        with self._converting(r):
+            deck = json_converter.json_to_deck(json_data)
         # Set additional properties.
         deck.id = deck_id
+        self._to_cache('get_deck', (deck_id, include_cards), deck, r)
 
         return deck
 
+    def iter_deck_cards(self, deck_id):
+        """Lazily iterate over the cards of a deck while it is downloaded.
+
+        Each card is yielded as soon as it has been received, so processing
+        can start before the whole deck has been downloaded.
+
+        Args:
+            deck_id (str): The ID of the deck whose cards to retrieve.
+
+        Yields:
+            Card: The cards of the deck, in order.
+
+        """
+        request_url = self.api_url + 'decks/' + deck_id
+        r = self._request('GET', request_url, params={'expand': 'true'},
+                          stream=True)
+        with r:
+            if r.status_code != 200:
+                raise ValueError(r.text)
+
+            # The time spent converting all cards is recorded as a single
+            # conversion, like for the other requests.
+            measured = self.metrics is not None and r.endpoint is not None
+            seconds = 0.0
+            try:
+                for key, value in iter_object_members(self._iter_content(r),
+                                                      ['cards']):
+                    if key == 'cards':
+                        start = time.perf_counter()
+                        card = json_converter.json_to_card(value)
+                        seconds += time.perf_counter() - start
+                        yield card
+            finally:
+                if measured:
+                    self.metrics.observe_conversion(r.endpoint, seconds)
+
     def create_deck(self, deck):
         """Create a new Deck for the currently logged in user.
 
@@ -233,55 +670,98 @@ class RestApi(object):
             Deck: The created Deck object if creation was successful.
 
         """
-        request_payload = json_converter.deck_to_json(deck)
-        request_payload = to_multipart_form(request_payload)
-        # Clone headers to not modify the global variable.
-        headers = dict(DEFAULT_HEADERS)
-        headers['Content-Type'] = request_payload.content_type
-        r = requests.post(url=API_URL + 'decks', data=request_payload,
-                          headers=headers, cookies={'jwt_token': self.jwt})
-
-        json_data = r.json()
-        created_deck = json_converter.json_to_deck(json_data)
+        with deck_payload(deck, True, self.image_cache,
+                          self.cover_image_urls,
+                          self.max_image_size,
+                          self.cover_preprocessor) as payload:
+            request_payload, content_type, cover = payload
+            r = self._request('POST', self.api_url + 'decks',
+                              data=request_payload,
+                              headers={'Content-Type': content_type})
+
+        with self._converting(r):
+            json_data = json_codec.loads(r.content)
+            created_deck = json_converter.json_to_deck(json_data)
+        remember_cover_image_url(cover, created_deck, self.image_cache,
+                                 self.cover_image_urls)
+        self._invalidate_cache('get_deck', created_deck.id)
 
         return created_deck
 
-    def update_deck(self, deck, user_id):
+    def update_deck(self, deck, user_id, refresh=REFRESH_FULL, force=False):
         """Update an existing deck.
 
+        Decks which did not change since they were retrieved from the server
+        are returned as is, without sending any request.
+
         Args:
             deck (Deck): The Deck object to update.
+            user_id (int): ID of the user the deck belongs to.
+            refresh (str): How to build the returned deck. The response to
+                the update contains all deck fields, but no cards:
+                - 'full' (default): Fetch the updated deck with its cards
+                    using an extra request.
+                - 'local': Use the cards of the given deck instead. Saves
+                    the extra request, but the cards keep the IDs and
+                    timestamps assigned locally.
+                - 'lazy': Only fetch the cards from the server once they
+                    are first accessed on the returned deck.
+            force (bool): Send the update even if the deck did not change.
 
         Returns:
             Deck: The updated Deck object if update was successful.
 
         """
-        # Clone headers to not modify the global variable.
-        headers = dict(DEFAULT_HEADERS)
-        if deck.cover:
-            # A new cover has been set on the deck, send the PATCH request as a
-            # multipart-form:
-            request_payload = json_converter.deck_to_json(deck)
-            request_payload = to_multipart_form(request_payload)
-            headers['Content-Type'] = request_payload.content_type
-        else:
-            # Otherwise, send the PATCH request as JSON:
-            request_payload = json_converter.deck_to_json(deck,
-                                                          as_json_str=True)
-            request_payload = json.dumps(request_payload)
-            headers['Content-Type'] = 'application/json'
-
-        r = requests.patch(url=API_URL + 'decks/' + deck.id,
-                           data=request_payload, headers=headers,
-                           cookies={'jwt_token': self.jwt})
+        if refresh not in REFRESH_MODES:
+            raise ValueError("'refresh' must be one of %s"
+                             % ', '.join(REFRESH_MODES))
+        if not force and not deck.is_dirty():
+            return deck
+
+        # A new cover which has not been uploaded yet is sent as part of a
+        # multipart-form. Otherwise, the PATCH request is sent as JSON.
+        with deck_payload(deck, False, self.image_cache,
+                          self.cover_image_urls,
+                          self.max_image_size,
+                          self.cover_preprocessor) as payload:
+            request_payload, content_type, cover = payload
+            r = self._request('PATCH', self.api_url + 'decks/' + deck.id,
+                              data=request_payload,
+                              headers={'Content-Type': content_type})
 
         if not r.ok:
             raise Exception('Failure while sending updates to server: %s'
                             % r.text)
-
-        # The response from the PATCH request does not contain cards.
-        # Therefore, we have to query the updated deck with an extra request.
-        updated_deck = self.get_deck(deck.id, user_id)
+        self._invalidate_cache('get_deck', deck.id)
+        # The server now stores the deck as it was sent.
+        deck.mark_clean()
+
+        if refresh == REFRESH_FULL:
+            # The response from the PATCH request does not contain cards.
+            # Therefore, we have to query the updated deck with an extra
+            # request.
+            updated_deck = self.get_deck(deck.id, user_id)
+            remember_cover_image_url(cover, updated_deck, self.image_cache,
+                                     self.cover_image_urls)
+            return updated_deck
+
+        with self._converting(r):
+            updated_deck = json_converter.json_to_deck(
+                json_codec.loads(r.content))
+        remember_cover_image_url(cover, updated_deck, self.image_cache,
+                                 self.cover_image_urls)
+        updated_deck.id = deck.id
+        # The server now stores the local cards.
+        if refresh == REFRESH_LAZY:
+            deck_id = deck.id
+            updated_deck.cards = DeferredCardList(
+                lambda: self.get_deck(deck_id, user_id).cards,
+                deck.cards_fingerprint())
+        else:
+            updated_deck.cards = (deck.cards.copy()
+                                  if isinstance(deck.cards, ColumnarCardList)
+                                  else list(deck.cards))
+        updated_deck.mark_clean()
 
         return updated_deck
 
@@ -298,13 +778,12 @@ class RestApi(object):
         if not isinstance(deck_id, str):
             raise ValueError("'deck_id' parameter must be of type str")
 
-        headers = DEFAULT_HEADERS
-
-        r = requests.delete(url=API_URL + 'decks/' + deck_id, headers=headers,
-                            cookies={'jwt_token': self.jwt})
+        r = self._request('DELETE', self.api_url + 'decks/' + deck_id)
+        self._invalidate_cache('get_deck', deck_id)
 
-        json_data = r.json()
-        deleted_deck = json_converter.json_to_deck(json_data)
+        with self._converting(r):
+            json_data = json_codec.loads(r.content)
+            deleted_deck = json_converter.json_to_deck(json_data)
 
         return deleted_deck
 
@@ -320,22 +799,28 @@ class RestApi(object):
             list: The list of favorites.
 
         """
-        request_url = API_URL + 'users/%d/favorites' % user_id
-        r = requests.get(url=request_url, cookies={'jwt_token': self.jwt})
+        cached = self._from_cache('get_favorites', user_id)
+        if cached is not None:
+            return cached
+
+        request_url = self.api_url + 'users/%d/favorites' % user_id
+        r = self._request('GET', request_url)
 
         if r.status_code != 200:
             raise ValueError(r.text)
 
-        json_response = r.json()
-        json_favorite_decks = [fav for fav in json_response['favorites']
-                               if 'deck' in fav]
-        favorites = []
-        try:
-            for fav in json_favorite_decks:
-                current_favorite = json_converter.json_to_favorite(fav)
-                favorites.append(current_favorite)
-        except KeyError as ke:
-            raise Exception("Unexpected JSON format:\n%s" % ke)
+        with self._converting(r):
+            json_response = json_codec.loads(r.content)
+            json_favorite_decks = [fav for fav in json_response['favorites']
+                                   if 'deck' in fav]
+            favorites = []
+            try:
+                for fav in json_favorite_decks:
+                    current_favorite = json_converter.json_to_favorite(fav)
+                    favorites.append(current_favorite)
+            except KeyError as ke:
+                raise Exception("Unexpected JSON format:\n%s" % ke)
+        self._to_cache('get_favorites', (user_id,), favorites)
 
         return favorites
 
@@ -350,13 +835,14 @@ class RestApi(object):
             Favorite: The added favorite.
 
         """
-        request_url = API_URL + 'users/%d/favorites' % user_id
+        request_url = self.api_url + 'users/%d/favorites' % user_id
         request_payload = {'deckId': deck_id}
-        r = requests.post(url=request_url, json=request_payload,
-                          cookies={'jwt_token': self.jwt})
+        r = self._request('POST', request_url, json=request_payload)
+        self._invalidate_cache('get_favorites', user_id)
 
-        json_response = r.json()
-        added_favorite = json_converter.json_to_favorite(json_response)
+        with self._converting(r):
+            json_response = json_codec.loads(r.content)
+            added_favorite = json_converter.json_to_favorite(json_response)
 
         return added_favorite
 
@@ -371,11 +857,12 @@ class RestApi(object):
             str: The ID of the removed favorite.
 
         """
-        request_url = API_URL + 'users/%d/favorites/%s' % (user_id,
-                                                           favorite_id)
-        r = requests.delete(url=request_url, cookies={'jwt_token': self.jwt})
+        request_url = (self.api_url
+                       + 'users/%d/favorites/%s' % (user_id, favorite_id))
+        r = self._request('DELETE', request_url)
+        self._invalidate_cache('get_favorites', user_id)
 
-        json_response = r.json()
+        json_response = json_codec.loads(r.content)
         removed_favorite_id = json_response['removedFavoriteId']
 
         return removed_favorite_id
@@ -405,21 +892,56 @@ class RestApi(object):
         if not types:
             types = ['DECK', 'DECK_GROUP']
 
-        request_url = API_URL + 'searchables'
+        cache_params = (query, use_fuzzy_search, ','.join(types), limit, page)
+        cached = self._from_cache('search', *cache_params)
+        if cached is not None:
+            return cached
+
+        request_url = self.api_url + 'searchables'
         params = {'query': query,
                   'useFuzzySearch': use_fuzzy_search,
                   'types': ','.join(types),
                   'limit': limit,
                   'page': page}
-        r = requests.get(url=request_url, params=params,
-                         cookies={'jwt_token': self.jwt})
+        r = self._request('GET', request_url, params=params)
 
         if r.status_code != 200:
             raise ValueError(r.text)
 
-        json_response = r.json()
-        json_searchables_list = json_response['searchables']
-        searchables = [json_converter.json_to_searchable(searchable)
-                       for searchable in json_searchables_list]
+        with self._converting(r):
+            json_response = json_codec.loads(r.content)
+            json_searchables_list = json_response['searchables']
+            searchables = [json_converter.json_to_searchable(searchable)
+                           for searchable in json_searchables_list]
+        self._to_cache('search', cache_params, searchables)
 
         return searchables
+
+    def iter_search(self,
+                    query,
+                    use_fuzzy_search=True,
+                    types=None,
+                    limit=10,
+                    start_page=0,
+                    max_items=None):
+        """Lazily iterate over search results, page by page.
+
+        The next page is fetched in the background while the current one is
+        consumed. Iteration stops at the first empty page.
+
+        Args:
+            query (str): The used search term(s).
+            use_fuzzy_search (bool): Whether or not to use fuzzy search.
+            types (list): What entity to search for.
+            limit (int): Number of results per page.
+            start_page (int): The first page to fetch (zero-indexed).
+            max_items (int): Maximum number of results to yield.
+
+        Returns: A generator of Trendable objects.
+
+        """
+        return iter_pages(
+            lambda page: self.search(query, use_fuzzy_search, types, limit,
+                                     page),
+            start_page, max_items
+        )
@@ -0,0 +1,206 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+# Methods which can safely be sent again without changing the outcome.
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+# Status codes which indicate a transient server-side problem.
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class RetryPolicy(object):
+    """Configuration for retrying failed requests.
+
+    Waits between attempts grow exponentially with full jitter, unless the
+    server specifies the wait itself with a `Retry-After` header.
+
+    Args:
+        max_attempts (int): Maximum number of attempts per request,
+            including the first one. Set to 1 to disable retries.
+        backoff_factor (float): Base wait in seconds. The n-th retry waits
+            up to `backoff_factor * 2 ** (n - 1)` seconds.
+        max_backoff (float): Upper bound in seconds for a single wait.
+        jitter (bool): Wait a random fraction of the computed backoff when
+            set to True (as by default), which spreads out retries of
+            concurrent requests.
+        retry_on_status (set): Status codes for which to retry.
+        retry_methods (set): HTTP methods for which to retry. Defaults to
+            idempotent methods only.
+        respect_retry_after (bool): Wait as long as the server asks for via
+            the `Retry-After` header when set to True (as by default).
+        max_retry_after (float): Give up instead of waiting when the server
+            asks to wait longer than this many seconds.
+        budget_ratio (float): Number of retries each request adds to the
+            per-client retry budget.
+        budget_initial (float): Number of retries available in a new client's
+            retry budget.
+        budget_max (float): Maximum number of retries the budget can hold.
+    """
+
+    def __init__(self,
+                 max_attempts=4,
+                 backoff_factor=0.5,
+                 max_backoff=30.0,
+                 jitter=True,
+                 retry_on_status=RETRY_STATUS_CODES,
+                 retry_methods=IDEMPOTENT_METHODS,
+                 respect_retry_after=True,
+                 max_retry_after=120.0,
+                 budget_ratio=0.2,
+                 budget_initial=10.0,
+                 budget_max=100.0):
+        """Initialize a new instance of the RetryPolicy class."""
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on_status = frozenset(retry_on_status)
+        self.retry_methods = frozenset(m.upper() for m in retry_methods)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.budget_ratio = budget_ratio
+        self.budget_initial = budget_initial
+        self.budget_max = budget_max
+
+    def is_retryable(self, method, status_code=None):
+        """Check whether a request may be retried at all.
+
+        Args:
+            method (str): The HTTP method of the request.
+            status_code (int): The status code of the response, or None if
+                the request failed without a response.
+        """
+        if method.upper() not in self.retry_methods:
+            return False
+        return status_code is None or status_code in self.retry_on_status
+
+    def backoff(self, retry_number, retry_after=None):
+        """Get the number of seconds to wait before the given retry.
+
+        Args:
+            retry_number (int): The number of the upcoming retry (1-indexed).
+            retry_after (str): Value of the response's `Retry-After` header.
+
+        Returns:
+            float: The seconds to wait, or None if the server asks to wait
+                longer than `max_retry_after`.
+        """
+        if retry_after is not None and self.respect_retry_after:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return delay if delay <= self.max_retry_after else None
+
+        delay = min(self.max_backoff,
+                    self.backoff_factor * 2 ** (retry_number - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+def parse_retry_after(value):
+    """Parse a `Retry-After` header into a number of seconds to wait.
+
+    Supports both the delay-seconds and the HTTP-date format. Returns None
+    for values which cannot be parsed.
+    """
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_date is None:
+        return None
+    return max(0.0, retry_date.timestamp() - time.time())
+
+
+def retry_delay(policy, stats, method, attempt, status_code=None,
+                retry_after=None):
+    """Decide whether and when to retry a failed request.
+
+    Args:
+        policy (RetryPolicy): The policy to apply.
+        stats (RetryStats): The retry budget and counters of the client.
+        method (str): The HTTP method of the failed request.
+        attempt (int): The number of attempts made so far.
+        status_code (int): The status code of the response, or None if the
+            request failed without a response.
+        retry_after (str): Value of the response's `Retry-After` header.
+
+    Returns:
+        float: The seconds to wait before retrying, or None to not retry.
+    """
+    if not policy.is_retryable(method, status_code):
+        return None
+    if attempt >= policy.max_attempts:
+        stats.record_give_up()
+        return None
+    delay = policy.backoff(attempt, retry_after)
+    if delay is None:
+        stats.record_give_up()
+        return None
+    if not stats.try_retry():
+        return None
+    return delay
+
+
+class RetryStats(object):
+    """Retry budget and counters of a single client.
+
+    The budget grows by `RetryPolicy.budget_ratio` for every request sent
+    and every retry spends one unit of it. This caps retries at a fraction
+    of the overall traffic, so a struggling server is not flooded with
+    retries on top of regular requests.
+
+    Attributes:
+        requests (int): Number of requests sent, excluding retries.
+        retries (int): Number of retries sent.
+        gave_up (int): Number of requests which were not retried any further
+            although they failed with a retryable error.
+        budget (float): Number of retries currently available.
+    """
+
+    def __init__(self, policy):
+        """Initialize a new instance of the RetryStats class."""
+        self.policy = policy
+        self.requests = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.budget = policy.budget_initial
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        """Record a new (non-retry) request and top up the budget."""
+        with self._lock:
+            self.requests += 1
+            self.budget = min(self.policy.budget_max,
+                              self.budget + self.policy.budget_ratio)
+
+    def try_retry(self):
+        """Spend one retry from the budget if possible.
+
+        Returns:
+            bool: Whether the retry may be sent.
+        """
+        with self._lock:
+            if self.budget < 1:
+                self.gave_up += 1
+                return False
+            self.budget -= 1
+            self.retries += 1
+            return True
+
+    def record_give_up(self):
+        """Record a request which failed although it was retryable."""
+        with self._lock:
+            self.gave_up += 1
+
+    def __str__(self):
+        return str({'requests': self.requests, 'retries': self.retries,
+                    'gave_up': self.gave_up, 'budget': self.budget})
+
+    def __repr__(self):
+        return self.__str__()